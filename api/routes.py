@@ -1,5 +1,7 @@
 from flask import Blueprint, render_template, jsonify, request
 import logging
+import threading
+import time
 from datetime import datetime
 try:
     from zoneinfo import ZoneInfo
@@ -7,6 +9,7 @@ except ImportError:
     from backports.zoneinfo import ZoneInfo
 
 from scheduler.daily_scheduler import DailyScheduler
+from config import Config
 
 logger = logging.getLogger(__name__)
 
@@ -29,6 +32,71 @@ turtle_data_store = {
     'status': 'waiting'
 }
 
+# 프로세스당 스케줄러 1개 재사용 (토큰/세션/지표 상태 유지)
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+def get_scheduler() -> DailyScheduler:
+    """공용 DailyScheduler (최초 호출시 생성)"""
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = DailyScheduler()
+            logger.info("📡 DailyScheduler 초기화 완료")
+        return _scheduler
+
+# 마지막으로 불러온 조건검색 스냅샷 (재시작 후 첫 요청에서 DB의 최신 스냅샷을 읽음)
+_snapshot_state = {'id': None, 'checked_at': 0.0}
+_snapshot_lock = threading.Lock()
+_snapshot_dao = None
+
+def load_latest_snapshot(force: bool = False) -> None:
+    """DB에 더 최신 스냅샷이 있으면 turtle_data_store에 반영 (재계산 없음)"""
+    global _snapshot_dao
+    
+    # 수집/실시간 구독 중에는 메모리 결과가 더 최신
+    if turtle_data_store.get('status') in ('initializing', 'collecting', 'streaming'):
+        return
+    
+    with _snapshot_lock:
+        now = time.monotonic()
+        if not force and now - _snapshot_state['checked_at'] < Config.SNAPSHOT_CHECK_INTERVAL:
+            return
+        _snapshot_state['checked_at'] = now
+        
+        try:
+            if _snapshot_dao is None:
+                from database.snapshot_dao import ConditionSnapshotDAO
+                _snapshot_dao = ConditionSnapshotDAO()
+            
+            latest_id = _snapshot_dao.get_latest_snapshot_id()
+            if latest_id is None or latest_id == _snapshot_state['id']:
+                return
+            
+            snapshot = _snapshot_dao.get_snapshot(latest_id)
+            if snapshot is None:
+                return
+        except Exception as e:
+            logger.warning(f"조건검색 스냅샷 조회 실패: {e}")
+            return
+        
+        turtle_data_store['system1'] = snapshot.system1
+        turtle_data_store['system2'] = snapshot.system2
+        turtle_data_store['last_updated'] = snapshot.taken_at.replace(tzinfo=KST)
+        turtle_data_store['status'] = 'updated'
+        _snapshot_state['id'] = snapshot.id
+        logger.info(f"📦 조건검색 스냅샷 {snapshot.id} 불러옴: System1={len(snapshot.system1)}개, System2={len(snapshot.system2)}개")
+
+def start_realtime_updates():
+    """실시간 조건검색 구독 시작 (편입/이탈시 turtle_data_store 갱신)"""
+    def on_update(results):
+        turtle_data_store['system1'] = results.get('1', [])
+        turtle_data_store['system2'] = results.get('2', [])
+        turtle_data_store['last_updated'] = get_kst_now()
+        turtle_data_store['status'] = 'streaming'
+    
+    return get_scheduler().start_condition_stream(on_update)
+
 def update_turtle_data():
     """실제 키움 API 터틀 데이터 업데이트"""
     global turtle_data_store
@@ -42,8 +110,7 @@ def update_turtle_data():
         scheduler = None
         
         try:
-            scheduler = DailyScheduler()
-            logger.info("📡 DailyScheduler 초기화 완료")
+            scheduler = get_scheduler()
         except Exception as init_error:
             logger.error(f"DailyScheduler 초기화 실패: {init_error}")
             raise Exception(f"Scheduler initialization failed: {init_error}")
@@ -78,6 +145,8 @@ def update_turtle_data():
             turtle_data_store['system2'] = system2_data
             turtle_data_store['last_updated'] = kst_now
             turtle_data_store['status'] = 'updated'
+            if scheduler.last_snapshot_id is not None:
+                _snapshot_state['id'] = scheduler.last_snapshot_id
             
             logger.info(f"✅ 터틀 데이터 업데이트 완료: System1={len(system1_data)}개, System2={len(system2_data)}개")
             
@@ -108,6 +177,7 @@ def update_turtle_data():
 def index():
     """메인 페이지"""
     logger.info("메인 페이지 요청")
+    load_latest_snapshot()
     
     # 현재 데이터 가져오기
     system1 = turtle_data_store.get('system1', [])
@@ -156,9 +226,20 @@ def debug_ip():
         'client_ip': request.remote_addr if hasattr(request, 'remote_addr') else 'Unknown'
     })
 
+@api_bp.route('/debug/db-pool')
+def debug_db_pool():
+    """DB 커넥션 풀 사용 지표 (대기 시간, 대여 수, 사용 중 연결 수, 실패 수)"""
+    from database.backends import get_backend
+    
+    try:
+        return jsonify(get_backend().pool_stats())
+    except Exception as e:
+        return jsonify({'error': str(e)}), 503
+
 @api_bp.route('/turtle-data')
 def turtle_data():
     """터틀 데이터 API"""
+    load_latest_snapshot()
     status = turtle_data_store.get('status', 'waiting')
     
     # 상태별 메시지
@@ -167,6 +248,7 @@ def turtle_data():
         'initializing': 'Initializing Kiwoom API...',
         'collecting': 'Collecting condition results...',
         'updated': 'Data updated successfully',
+        'streaming': 'Real-time condition stream active',
         'error': 'Update failed - check logs'
     }
     
@@ -176,7 +258,8 @@ def turtle_data():
         'last_updated': turtle_data_store.get('last_updated').isoformat() if turtle_data_store.get('last_updated') else None,
         'status': status,
         'status_message': status_messages.get(status, status),
-        'total_count': len(turtle_data_store.get('system1', [])) + len(turtle_data_store.get('system2', []))
+        'total_count': len(turtle_data_store.get('system1', [])) + len(turtle_data_store.get('system2', [])),
+        'snapshot_id': _snapshot_state['id']
     })
 
 @api_bp.route('/manual-update', methods=['POST'])
@@ -9,7 +9,8 @@ except ImportError:
     from backports.zoneinfo import ZoneInfo
 
 from flask import Flask
-from api.routes import api_bp, main_bp, update_turtle_data
+from api.routes import api_bp, main_bp, update_turtle_data, start_realtime_updates
+from config import Config
 
 # 로깅 설정
 logging.basicConfig(
@@ -56,6 +57,13 @@ def create_app():
     except Exception as e:
         logger.error(f"스케줄러 시작 실패 (앱은 계속 실행): {e}")
     
+    # 실시간 조건검색 구독 (CONDITION_REALTIME=true)
+    if Config.CONDITION_REALTIME:
+        try:
+            start_realtime_updates()
+        except Exception as e:
+            logger.error(f"실시간 조건검색 시작 실패 (앱은 계속 실행): {e}")
+    
     logger.info("터틀 대시보드 앱 설정 완료")
     return app
 
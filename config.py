@@ -7,8 +7,17 @@ class Config:
     # 키움 API 설정
     KIWOOM_APP_KEY = os.getenv('KIWOOM_APP_KEY')
     KIWOOM_APP_SECRET = os.getenv('KIWOOM_APP_SECRET')
-    KIWOOM_BASE_URL = 'https://api.kiwoom.com'
-    KIWOOM_WSS_URL = 'wss://api.kiwoom.com:10000'
+    KIWOOM_BASE_URL = os.getenv('KIWOOM_BASE_URL', 'https://api.kiwoom.com')  # 가짜 서버 사용시 변경
+    KIWOOM_WSS_URL = os.getenv('KIWOOM_WSS_URL', 'wss://api.kiwoom.com:10000')
+    KIWOOM_MAX_CONCURRENCY = int(os.getenv('KIWOOM_MAX_CONCURRENCY', '4'))  # REST 동시 요청 수
+    KIWOOM_RATE_LIMITS = os.getenv('KIWOOM_RATE_LIMITS', 'ka10081=5,au10001=1,CNSRLST=1,CNSRREQ=5,*=10')  # 초당 요청 수 (api-id/trnm별, *: 전체)
+    KIWOOM_MAX_RETRIES = int(os.getenv('KIWOOM_MAX_RETRIES', '5'))  # 한도 초과/일시 오류 재시도 횟수
+    KIWOOM_TOKEN_CACHE_FILE = os.getenv('KIWOOM_TOKEN_CACHE_FILE', 'data/kiwoom_token.json')  # 워커 공용 토큰 캐시
+    KIWOOM_WS_MAX_INFLIGHT = int(os.getenv('KIWOOM_WS_MAX_INFLIGHT', '4'))  # WebSocket 동시 요청 수
+    
+    # 저장소 백엔드 (mysql: Azure MySQL, sqlite: 내장 SQLite 파일 - 단일 노드/오프라인용)
+    DB_BACKEND = os.getenv('DB_BACKEND', 'mysql').lower()
+    SQLITE_PATH = os.getenv('SQLITE_PATH', 'data/turtle.db')
     
     # MySQL 데이터베이스 설정 (Azure Web App + Database)
     DB_HOST = os.getenv('AZURE_MYSQL_HOST')
@@ -16,9 +25,37 @@ class Config:
     DB_DATABASE = os.getenv('AZURE_MYSQL_NAME')
     DB_USERNAME = os.getenv('AZURE_MYSQL_USER')
     DB_PASSWORD = os.getenv('AZURE_MYSQL_PASSWORD')
+    DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', '5'))  # 보관하는 연결 수
+    DB_POOL_MAX_OVERFLOW = int(os.getenv('DB_POOL_MAX_OVERFLOW', '5'))  # 가득 찼을 때 추가로 여는 임시 연결 수
+    DB_POOL_TIMEOUT = float(os.getenv('DB_POOL_TIMEOUT', '30'))  # 연결 대기 최대 시간(초)
+    DB_POOL_RECYCLE = float(os.getenv('DB_POOL_RECYCLE', '1800'))  # 이보다 오래된 연결은 새로 연결(초, 0: 사용 안 함)
+    DB_POOL_PRE_PING = os.getenv('DB_POOL_PRE_PING', 'true').lower() == 'true'  # 오래 쉰 연결은 꺼낼 때 ping 확인
+    DB_POOL_RESET_SESSION = os.getenv('DB_POOL_RESET_SESSION', 'true').lower() == 'true'  # 반납시 세션 초기화 (읽기 전용 제외)
+    DB_LOCAL_INFILE = os.getenv('DB_LOCAL_INFILE', 'false').lower() == 'true'  # LOAD DATA LOCAL INFILE 허용 (서버 local_infile=ON 필요)
+    POSITION_SUMMARY_CACHE_TTL = float(os.getenv('POSITION_SUMMARY_CACHE_TTL', '60'))  # 포지션 요약 캐시 유지 시간(초, 다른 프로세스 쓰기 반영 주기)
     
     # 스케줄링 설정
     DATA_COLLECTION_TIME = "16:00"  # 오후 4시
+    CONDITION_REALTIME = os.getenv('CONDITION_REALTIME', 'false').lower() == 'true'  # 실시간 조건검색 구독
+    CONDITION_MAX_STOCKS = int(os.getenv('CONDITION_MAX_STOCKS', '0'))  # 조건식당 처리 종목 수 (0: 전체)
+    
+    # 수집 파이프라인 (수집 -> 계산 단계별 동시성, DB 기록은 후행 기록 큐)
+    PIPELINE_FETCH_WORKERS = int(os.getenv('PIPELINE_FETCH_WORKERS', os.getenv('KIWOOM_MAX_CONCURRENCY', '4')))  # 일봉 수집 스레드 수
+    PIPELINE_CALC_WORKERS = int(os.getenv('PIPELINE_CALC_WORKERS', '1'))  # 터틀 계산 스레드 수 (지표 상태는 저장소 잠금으로 보호)
+    PIPELINE_QUEUE_SIZE = int(os.getenv('PIPELINE_QUEUE_SIZE', '32'))  # 단계 사이 큐 크기 (backpressure)
+    PIPELINE_WRITE_BATCH = int(os.getenv('PIPELINE_WRITE_BATCH', '1000'))  # 트랜잭션당 기록 행 수
+    DB_WRITE_FLUSH_INTERVAL = float(os.getenv('DB_WRITE_FLUSH_INTERVAL', '1.0'))  # 후행 기록 주기(초)
+    DB_WRITE_FLUSH_TIMEOUT = float(os.getenv('DB_WRITE_FLUSH_TIMEOUT', '120'))  # 실행 끝 기록 완료 대기 최대 시간(초)
+    DB_WRITE_SPOOL_FILE = os.getenv('DB_WRITE_SPOOL_FILE', 'data/db_write_spool.jsonl')  # 미기록 쓰기 보존 기준 경로 (프로세스마다 .<pid>, 죽은 프로세스 스풀은 다음 시작시 복구)
+    SNAPSHOT_CHECK_INTERVAL = float(os.getenv('SNAPSHOT_CHECK_INTERVAL', '30'))  # 웹의 최신 조건검색 스냅샷 확인 주기(초)
+    
+    # 증분 지표 상태 파일 (종목별 ATR/돈치안 상태)
+    CANDLE_STORE_DIR = os.getenv('CANDLE_STORE_DIR', 'data/candles')  # 종목별 일봉 .npy 저장소
+    TURTLE_STATE_FILE = os.getenv('TURTLE_STATE_FILE', 'data/turtle_state.json')
+    
+    # 일봉 백필 (python -m database.backfill)
+    BACKFILL_CHUNK_ROWS = int(os.getenv('BACKFILL_CHUNK_ROWS', '200000'))  # 트랜잭션당 적재 행 수
+    BACKFILL_PROGRESS_FILE = os.getenv('BACKFILL_PROGRESS_FILE', 'data/backfill_progress.json')  # 재개용 진행 기록
     
     # 로깅 설정
     LOG_LEVEL = 'INFO'
@@ -0,0 +1,354 @@
+# 저장소 백엔드 (MySQL / 내장 SQLite) - 연결 제공 + SQL 방언 차이
+import logging
+import os
+import sqlite3
+import threading
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Dict, List, Optional, Tuple
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+MYSQL_CANDLE_UPSERT = """
+    INSERT INTO daily_candle
+    (stock_code, date, open_price, high_price, low_price, close_price, volume, amount)
+    VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+    ON DUPLICATE KEY UPDATE
+        open_price = VALUES(open_price),
+        high_price = VALUES(high_price),
+        low_price = VALUES(low_price),
+        close_price = VALUES(close_price),
+        volume = VALUES(volume),
+        amount = VALUES(amount)
+"""
+
+SQLITE_CANDLE_UPSERT = """
+    INSERT INTO daily_candle
+    (stock_code, date, open_price, high_price, low_price, close_price, volume, amount)
+    VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+    ON CONFLICT (stock_code, date) DO UPDATE SET
+        open_price = excluded.open_price,
+        high_price = excluded.high_price,
+        low_price = excluded.low_price,
+        close_price = excluded.close_price,
+        volume = excluded.volume,
+        amount = excluded.amount
+"""
+
+CANDLE_COLUMNS = "stock_code, date, open_price, high_price, low_price, close_price, volume, amount"
+
+# 스테이징 테이블 -> daily_candle 집합 병합 (PK 순서로 읽어 클러스터드 인덱스에 순차 삽입)
+MYSQL_CANDLE_MERGE = f"""
+    INSERT INTO daily_candle ({CANDLE_COLUMNS})
+    SELECT {CANDLE_COLUMNS} FROM {{stage}} ORDER BY stock_code, date
+    ON DUPLICATE KEY UPDATE
+        open_price = VALUES(open_price),
+        high_price = VALUES(high_price),
+        low_price = VALUES(low_price),
+        close_price = VALUES(close_price),
+        volume = VALUES(volume),
+        amount = VALUES(amount)
+"""
+
+# WHERE true: INSERT ... SELECT 뒤 ON CONFLICT 구문 모호성 회피 (SQLite 문법 요구)
+SQLITE_CANDLE_MERGE = f"""
+    INSERT INTO daily_candle ({CANDLE_COLUMNS})
+    SELECT {CANDLE_COLUMNS} FROM {{stage}} WHERE true ORDER BY stock_code, date
+    ON CONFLICT (stock_code, date) DO UPDATE SET
+        open_price = excluded.open_price,
+        high_price = excluded.high_price,
+        low_price = excluded.low_price,
+        close_price = excluded.close_price,
+        volume = excluded.volume,
+        amount = excluded.amount
+"""
+
+
+class StorageBackend:
+    """DatabaseHandler / PositionDAO가 쓰는 저장소 인터페이스
+
+    - get_connection(read_only, timeout): DB-API 연결 (cursor(dictionary=...), commit, rollback, close=반납)
+    - 쿼리는 %s 자리표시자를 쓰고, 백엔드마다 다른 구문만 아래 속성으로 제공한다.
+    """
+
+    name = ''
+    candle_upsert_query = ''
+    candle_merge_query = ''  # {stage} 테이블의 일봉을 daily_candle에 병합
+    for_update = ''  # 행 잠금 접미사 (지원하지 않으면 빈 문자열)
+    bulk_session_statements: List[str] = []  # 대량 적재 연결에서 먼저 실행할 세션 설정
+    bulk_session_reset_statements: List[str] = []  # 적재가 끝나면 (실패해도) 되돌릴 세션 설정
+
+    def get_connection(self, read_only: bool = False, timeout: Optional[float] = None):
+        raise NotImplementedError
+
+    def pool_stats(self) -> Dict[str, float]:
+        raise NotImplementedError
+
+    def migrations(self) -> List:
+        """이 백엔드용 스키마 마이그레이션 목록"""
+        raise NotImplementedError
+
+    def acquire_migration_lock(self, cursor):
+        """동시 마이그레이션 방지 잠금 (필요 없으면 아무것도 안 함)"""
+
+    def release_migration_lock(self, cursor):
+        pass
+
+    def secondary_indexes(self, cursor, table: str) -> List[Tuple[str, str]]:
+        """PK/UNIQUE가 아닌 보조 인덱스 [(이름, 생성 DDL)]"""
+        raise NotImplementedError
+
+    def drop_index_statement(self, table: str, index_name: str) -> str:
+        raise NotImplementedError
+
+
+class MySQLBackend(StorageBackend):
+    """Azure MySQL (DatabaseConnection 커넥션 풀)"""
+
+    name = 'mysql'
+    candle_upsert_query = MYSQL_CANDLE_UPSERT
+    candle_merge_query = MYSQL_CANDLE_MERGE
+    for_update = 'FOR UPDATE'
+    # 보조 UNIQUE/외래키 검사 생략 (PK 중복은 병합 쿼리가 처리)
+    # 반납시 세션 초기화에 기대지 않고 직접 원복 (DB_POOL_RESET_SESSION=false여도 풀에 꺼진 채 돌아가지 않도록)
+    bulk_session_statements = ["SET SESSION unique_checks = 0", "SET SESSION foreign_key_checks = 0"]
+    bulk_session_reset_statements = ["SET SESSION unique_checks = 1", "SET SESSION foreign_key_checks = 1"]
+
+    def __init__(self):
+        from .connection import DatabaseConnection
+        self.db_conn = DatabaseConnection()
+
+    def get_connection(self, read_only: bool = False, timeout: Optional[float] = None):
+        return self.db_conn.get_connection(read_only=read_only, timeout=timeout)
+
+    def pool_stats(self) -> Dict[str, float]:
+        return {'backend': self.name, **self.db_conn.pool_stats()}
+
+    def migrations(self) -> List:
+        from .migrations import MIGRATIONS
+        return MIGRATIONS
+
+    def acquire_migration_lock(self, cursor):
+        from .migrations import LOCK_NAME, LOCK_TIMEOUT
+        cursor.execute("SELECT GET_LOCK(%s, %s)", (LOCK_NAME, LOCK_TIMEOUT))
+        if cursor.fetchone()[0] != 1:
+            raise RuntimeError(f"마이그레이션 잠금 획득 실패 ({LOCK_TIMEOUT}초)")
+
+    def release_migration_lock(self, cursor):
+        from .migrations import LOCK_NAME
+        cursor.execute("SELECT RELEASE_LOCK(%s)", (LOCK_NAME,))
+        cursor.fetchall()
+
+    def secondary_indexes(self, cursor, table: str) -> List[Tuple[str, str]]:
+        cursor.execute("""
+            SELECT index_name, GROUP_CONCAT(column_name ORDER BY seq_in_index SEPARATOR ', ')
+            FROM information_schema.statistics
+            WHERE table_schema = DATABASE() AND table_name = %s
+              AND index_name <> 'PRIMARY' AND non_unique = 1
+            GROUP BY index_name
+            ORDER BY index_name
+        """, (table,))
+        return [(name, f"ALTER TABLE {table} ADD INDEX {name} ({columns})")
+                for name, columns in cursor.fetchall()]
+
+    def drop_index_statement(self, table: str, index_name: str) -> str:
+        return f"ALTER TABLE {table} DROP INDEX {index_name}"
+
+
+_sqlite_types_registered = False
+_sqlite_types_lock = threading.Lock()
+
+
+def _register_sqlite_types():
+    """
+    SQLite 값 변환 등록 (sqlite3 모듈 전역 설정이므로 SQLite 백엔드를 만들 때 한 번만)
+
+    쓰기는 MySQL 드라이버가 받는 타입 그대로, 읽기는 선언 타입으로 MySQL과 같은 파이썬 타입 반환
+    """
+    global _sqlite_types_registered
+    with _sqlite_types_lock:
+        if _sqlite_types_registered:
+            return
+        sqlite3.register_adapter(Decimal, str)
+        sqlite3.register_adapter(date, lambda value: value.isoformat())
+        sqlite3.register_adapter(datetime, lambda value: value.isoformat(' '))
+        sqlite3.register_converter('DATE', lambda raw: date.fromisoformat(raw.decode()))
+        sqlite3.register_converter('TIMESTAMP', lambda raw: datetime.fromisoformat(raw.decode()))
+        sqlite3.register_converter('DECIMAL', lambda raw: Decimal(raw.decode()))
+        _sqlite_types_registered = True
+
+
+class _SQLiteCursor:
+    """mysql.connector 커서처럼 쓰는 SQLite 커서 (%s 자리표시자, dictionary 행)"""
+
+    def __init__(self, raw: sqlite3.Cursor, dictionary: bool):
+        self._raw = raw
+        self._dictionary = dictionary
+
+    def _row(self, row):
+        if row is None or not self._dictionary:
+            return row
+        return dict(zip([column[0] for column in self._raw.description], row))
+
+    @staticmethod
+    def _translate(query: str, has_params: bool) -> str:
+        # mysql.connector처럼 파라미터가 있을 때만 %s / %% 해석
+        return query.replace('%s', '?').replace('%%', '%') if has_params else query
+
+    def execute(self, query: str, params=()):
+        self._raw.execute(self._translate(query, bool(params)), tuple(params or ()))
+        return self
+
+    def executemany(self, query: str, seq_of_params):
+        self._raw.executemany(self._translate(query, True), [tuple(params) for params in seq_of_params])
+        return self
+
+    def fetchone(self):
+        return self._row(self._raw.fetchone())
+
+    def fetchmany(self, size: int = 1):
+        return [self._row(row) for row in self._raw.fetchmany(size)]
+
+    def fetchall(self):
+        return [self._row(row) for row in self._raw.fetchall()]
+
+    @property
+    def description(self):
+        return self._raw.description
+
+    @property
+    def rowcount(self) -> int:
+        return self._raw.rowcount
+
+    @property
+    def lastrowid(self):
+        return self._raw.lastrowid
+
+    def close(self):
+        self._raw.close()
+
+
+class _SQLiteConnection:
+    """풀에서 빌린 SQLite 연결 (close()하면 롤백 후 반납)"""
+
+    def __init__(self, backend: 'SQLiteBackend', raw: sqlite3.Connection):
+        self._backend = backend
+        self._raw = raw
+
+    def cursor(self, dictionary: bool = False, **kwargs) -> _SQLiteCursor:
+        return _SQLiteCursor(self._raw.cursor(), dictionary)
+
+    def commit(self):
+        self._raw.commit()
+
+    def rollback(self):
+        self._raw.rollback()
+
+    def close(self):
+        raw, self._raw = self._raw, None
+        if raw is not None:
+            self._backend._release(raw)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class SQLiteBackend(StorageBackend):
+    """내장 SQLite (WAL 모드, 단일 노드/오프라인 벤치마크용)
+
+    MySQL과 같은 테이블/컬럼과 업서트 동작을 갖는다. 연결은 파일 하나를 여러 스레드가 나눠 쓰도록
+    풀로 재사용하고, 쓰기 경합은 busy_timeout 동안 기다린다. 처음 열 때 마이그레이션을 적용한다.
+    """
+
+    name = 'sqlite'
+    candle_upsert_query = SQLITE_CANDLE_UPSERT
+    candle_merge_query = SQLITE_CANDLE_MERGE
+
+    def __init__(self, path: str, busy_timeout: float = 30.0, migrate: bool = True):
+        _register_sqlite_types()
+        self.path = path
+        self.busy_timeout = busy_timeout
+        self._idle: List[sqlite3.Connection] = []
+        self._lock = threading.Lock()
+        self._stats: Dict[str, float] = {'checkouts': 0, 'created': 0, 'in_use': 0}
+        if path != ':memory:' and os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        if migrate:
+            from .migrations import MigrationRunner
+            MigrationRunner(self).migrate()
+
+    def _connect(self) -> sqlite3.Connection:
+        raw = sqlite3.connect(self.path, timeout=self.busy_timeout, check_same_thread=False,
+                              detect_types=sqlite3.PARSE_DECLTYPES)
+        raw.execute("PRAGMA journal_mode=WAL")
+        raw.execute("PRAGMA synchronous=NORMAL")
+        with self._lock:
+            self._stats['created'] += 1
+        return raw
+
+    def get_connection(self, read_only: bool = False, timeout: Optional[float] = None) -> _SQLiteConnection:
+        with self._lock:
+            raw = self._idle.pop() if self._idle else None
+            self._stats['checkouts'] += 1
+            self._stats['in_use'] += 1
+        if raw is None:
+            try:
+                raw = self._connect()
+            except Exception:
+                with self._lock:
+                    self._stats['in_use'] -= 1
+                raise
+        return _SQLiteConnection(self, raw)
+
+    def _release(self, raw: sqlite3.Connection):
+        try:
+            raw.rollback()
+        except sqlite3.Error:
+            raw.close()
+            raw = None
+        with self._lock:
+            self._stats['in_use'] -= 1
+            if raw is not None:
+                self._idle.append(raw)
+
+    def pool_stats(self) -> Dict[str, float]:
+        with self._lock:
+            return {'backend': self.name, 'idle': len(self._idle), **self._stats}
+
+    def migrations(self) -> List:
+        from .migrations import SQLITE_MIGRATIONS
+        return SQLITE_MIGRATIONS
+
+    def secondary_indexes(self, cursor, table: str) -> List[Tuple[str, str]]:
+        # sql이 NULL인 항목은 PK/UNIQUE 제약이 만든 자동 인덱스
+        cursor.execute("""
+            SELECT name, sql FROM sqlite_master
+            WHERE type = 'index' AND tbl_name = %s AND sql IS NOT NULL AND sql NOT LIKE 'CREATE UNIQUE%%'
+            ORDER BY name
+        """, (table,))
+        return [(name, sql) for name, sql in cursor.fetchall()]
+
+    def drop_index_statement(self, table: str, index_name: str) -> str:
+        return f"DROP INDEX IF EXISTS {index_name}"
+
+
+_backend: Optional[StorageBackend] = None
+_backend_lock = threading.Lock()
+
+
+def get_backend() -> StorageBackend:
+    """설정된 저장소 백엔드 (프로세스당 1개, Config.DB_BACKEND: mysql | sqlite)"""
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            if Config.DB_BACKEND == 'sqlite':
+                _backend = SQLiteBackend(Config.SQLITE_PATH, busy_timeout=Config.DB_POOL_TIMEOUT)
+                logger.info(f"SQLite 저장소 사용: {Config.SQLITE_PATH}")
+            else:
+                _backend = MySQLBackend()
+        return _backend
@@ -0,0 +1,408 @@
+# daily_candle 대량 초기 적재 (python -m database.backfill)
+import argparse
+import json
+import logging
+import os
+import tempfile
+import time
+from datetime import datetime
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from config import Config
+from services.candle_store import CANDLE_DTYPE, CandleStore
+from .backends import CANDLE_COLUMNS, StorageBackend, get_backend
+
+logger = logging.getLogger(__name__)
+
+STAGE_TABLE = 'daily_candle_stage'
+
+# 연결(세션) 전용 임시 테이블 - 키 없이 쌓기만 하고 병합시 PK 순서로 읽음
+STAGE_TABLE_DDL = f"""
+    CREATE TEMPORARY TABLE IF NOT EXISTS {STAGE_TABLE} (
+        stock_code VARCHAR(10) NOT NULL,
+        date DATE NOT NULL,
+        open_price BIGINT NOT NULL,
+        high_price BIGINT NOT NULL,
+        low_price BIGINT NOT NULL,
+        close_price BIGINT NOT NULL,
+        volume BIGINT NOT NULL,
+        amount BIGINT NOT NULL
+    )
+"""
+
+STAGE_INSERT_ROWS = 1000  # 다중 행 INSERT 한 문장의 행 수
+
+# 종목코드 -> 일봉 레코드 (CANDLE_DTYPE: date YYYYMMDD 정수, 가격 float, 날짜 오름차순)
+RecordLoader = Callable[[str], np.ndarray]
+
+
+def _stage_rows(stock_code: str, records: np.ndarray) -> List[Tuple]:
+    """레코드 -> 스테이징 행 (날짜 'YYYY-MM-DD', 가격은 원 단위 정수)"""
+    if not len(records):
+        return []
+    dates = [f"{d // 10000:04d}-{d // 100 % 100:02d}-{d % 100:02d}" for d in records['date'].tolist()]
+    columns = [np.rint(records[field]).astype(np.int64).tolist() for field in ('open', 'high', 'low', 'close')]
+    columns += [records['volume'].astype(np.int64).tolist(), records['amount'].astype(np.int64).tolist()]
+    return list(zip([stock_code] * len(dates), dates, *columns))
+
+
+def kiwoom_loader(service, since: str, base_dt: Optional[str] = None) -> RecordLoader:
+    """
+    ka10081 연속조회로 since부터 전체 이력을 받는 로더 (수정주가, 새 환경 시딩용)
+
+    조회 결과가 없으면 예외로 중단한다 (조회 실패가 빈 종목으로 완료 처리되지 않도록,
+    다시 실행하면 그 종목부터 이어서 적재).
+
+    :param service: KiwoomAPIService (요청 한도/재시도는 서비스의 rate limiter가 처리)
+    :param since: 시작일 (YYYYMMDD)
+    :param base_dt: 기준일 (None이면 당일)
+    """
+    def load(stock_code: str) -> np.ndarray:
+        columns = service.get_daily_candle_arrays(stock_code, since=since, base_dt=base_dt)
+        if not len(columns['date']):
+            raise RuntimeError(f"{stock_code}: ka10081 조회 결과 없음")
+        records = np.empty(len(columns['date']), dtype=CANDLE_DTYPE)
+        for name in CANDLE_DTYPE.names:
+            records[name] = columns[name]
+        return records
+
+    return load
+
+
+def import_csv(store: CandleStore, path: str, chunksize: int = 1_000_000) -> List[str]:
+    """
+    CSV 덤프를 종목별 .npy 저장소로 가져오기 (chunksize행씩 읽어 메모리 사용 제한)
+
+    컬럼: stock_code, date (YYYYMMDD 또는 YYYY-MM-DD), open, high, low, close[, volume, amount]
+
+    :return: 가져온 종목코드 (처음 나온 순서)
+    """
+    codes: Dict[str, None] = {}
+    rows = 0
+    for chunk in pd.read_csv(path, dtype={'stock_code': str, 'date': str}, chunksize=chunksize):
+        chunk['date'] = pd.to_datetime(chunk['date'].str.replace('-', '', regex=False), format='%Y%m%d')
+        for stock_code, group in chunk.groupby('stock_code', sort=False):
+            store.merge(stock_code, group)
+            codes[stock_code] = None
+        rows += len(chunk)
+        logger.info(f"CSV 가져오기: {rows:,}행, {len(codes)}종목")
+    return list(codes)
+
+
+class CandleBackfill:
+    """과거 일봉 대량 적재 (10년+ x 전 종목 시딩용)
+
+    - 종목 단위로 chunk_rows행씩 모아 (연결 없이) 청크마다 연결을 빌려 임시 스테이징 테이블에 넣고 (LOAD DATA LOCAL INFILE 또는
+      다중 행 INSERT), INSERT ... SELECT 한 번으로 daily_candle에 병합한 뒤 커밋한다.
+    - 커밋된 종목은 진행 파일에 기록한다. 중단 후 다시 실행하면 남은 종목부터 이어서 적재한다.
+    - 적재 동안 daily_candle의 보조 인덱스를 삭제하고 끝나면 다시 만든다 (DDL은 삭제 전에 진행 파일에 보관).
+    같은 날짜가 이미 있으면 새 값으로 덮어쓰므로 청크를 다시 적재해도 결과는 같다.
+    """
+
+    def __init__(self, backend: Optional[StorageBackend] = None, progress_path: Optional[str] = None,
+                 chunk_rows: int = 200000, method: str = 'auto', drop_indexes: bool = True):
+        """
+        :param progress_path: 진행 파일 (기본 Config.BACKFILL_PROGRESS_FILE)
+        :param chunk_rows: 트랜잭션당 적재 행 수 (종목 경계에서 끊음)
+        :param method: 'infile' (LOAD DATA LOCAL INFILE, MySQL + DB_LOCAL_INFILE 필요), 'insert', 'auto'
+        :param drop_indexes: 적재 동안 보조 인덱스 삭제
+        """
+        self.backend = backend or get_backend()
+        self.progress_path = progress_path or Config.BACKFILL_PROGRESS_FILE
+        self.chunk_rows = max(1, chunk_rows)
+        if method == 'auto':
+            method = 'infile' if self.backend.name == 'mysql' and Config.DB_LOCAL_INFILE else 'insert'
+        if method not in ('infile', 'insert'):
+            raise ValueError(f"알 수 없는 적재 방식: {method}")
+        if method == 'infile' and self.backend.name != 'mysql':
+            raise ValueError("LOAD DATA LOCAL INFILE은 MySQL 백엔드에서만 사용 가능")
+        self.method = method
+        self.drop_indexes = drop_indexes
+        self.logger = logging.getLogger(__name__)
+
+    # 진행 파일
+
+    def load_progress(self) -> Dict:
+        try:
+            with open(self.progress_path, 'r', encoding='utf-8') as f:
+                progress = json.load(f)
+        except FileNotFoundError:
+            progress = {}
+        except (OSError, ValueError) as e:
+            self.logger.warning(f"백필 진행 파일 손상 - 처음부터 적재 ({e})")
+            progress = {}
+        progress.setdefault('done', [])
+        progress.setdefault('rows', 0)
+        progress.setdefault('indexes', [])
+        progress.setdefault('started_at', datetime.now().isoformat())
+        return progress
+
+    def _save_progress(self, progress: Dict):
+        directory = os.path.dirname(self.progress_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.progress_path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(progress, f)
+        os.replace(tmp_path, self.progress_path)
+
+    def reset_progress(self):
+        """진행 기록 삭제 (처음부터 다시 적재)"""
+        try:
+            os.remove(self.progress_path)
+        except FileNotFoundError:
+            pass
+
+    # 인덱스
+
+    def _drop_secondary_indexes(self, conn, cursor, progress: Dict):
+        indexes = self.backend.secondary_indexes(cursor, 'daily_candle')
+        if not indexes:
+            return
+        saved = {name for name, _ in progress['indexes']}
+        progress['indexes'].extend([name, ddl] for name, ddl in indexes if name not in saved)
+        self._save_progress(progress)
+        for name, _ in indexes:
+            cursor.execute(self.backend.drop_index_statement('daily_candle', name))
+            self.logger.info(f"보조 인덱스 삭제: daily_candle.{name}")
+        conn.commit()
+
+    def restore_indexes(self, progress: Optional[Dict] = None) -> List[str]:
+        """
+        진행 파일에 보관한 보조 인덱스 중 없는 것 다시 생성
+
+        :return: 생성한 인덱스 이름
+        """
+        progress = progress if progress is not None else self.load_progress()
+        if not progress['indexes']:
+            return []
+        conn = self.backend.get_connection()
+        cursor = conn.cursor()
+        created: List[str] = []
+
+        try:
+            existing = {name for name, _ in self.backend.secondary_indexes(cursor, 'daily_candle')}
+            for name, ddl in progress['indexes']:
+                if name in existing:
+                    continue
+                started = time.monotonic()
+                cursor.execute(ddl)
+                created.append(name)
+                self.logger.info(f"보조 인덱스 재생성: daily_candle.{name} ({time.monotonic() - started:.1f}초)")
+            conn.commit()
+            progress['indexes'] = []
+            self._save_progress(progress)
+            return created
+
+        except Exception as e:
+            self.logger.error(f"보조 인덱스 재생성 실패: {e}")
+            conn.rollback()
+            raise
+        finally:
+            cursor.close()
+            conn.close()
+
+    # 적재
+
+    def _load_stage(self, cursor, rows: List[Tuple]):
+        if self.method == 'infile':
+            fd, path = tempfile.mkstemp(prefix='candle_backfill_', suffix='.tsv')
+            try:
+                with os.fdopen(fd, 'w', encoding='utf-8', newline='\n') as f:
+                    f.writelines('\t'.join(map(str, row)) + '\n' for row in rows)
+                cursor.execute(f"""
+                    LOAD DATA LOCAL INFILE '{path.replace(os.sep, '/')}' INTO TABLE {STAGE_TABLE}
+                    FIELDS TERMINATED BY '\\t' LINES TERMINATED BY '\\n'
+                    ({CANDLE_COLUMNS})
+                """)
+            finally:
+                os.remove(path)
+            return
+
+        row_values = f"({', '.join(['%s'] * 8)})"
+        for start in range(0, len(rows), STAGE_INSERT_ROWS):
+            chunk = rows[start:start + STAGE_INSERT_ROWS]
+            cursor.execute(
+                f"INSERT INTO {STAGE_TABLE} ({CANDLE_COLUMNS}) VALUES {', '.join([row_values] * len(chunk))}",
+                tuple(value for row in chunk for value in row)
+            )
+
+    def _reset_session(self, cursor):
+        """bulk_session_statements로 끈 검사를 다시 켬 (연결이 풀로 돌아가기 전)"""
+        for statement in self.backend.bulk_session_reset_statements:
+            try:
+                cursor.execute(statement)
+            except Exception as e:
+                self.logger.warning(f"적재 세션 설정 원복 실패 ({statement}): {e}")
+
+    def _write_chunk(self, rows: List[Tuple]):
+        """
+        청크 하나를 새로 빌린 연결로 적재: 스테이징 적재 -> daily_candle 병합 -> 커밋 (청크 하나가 트랜잭션 하나)
+
+        종목 조회(키움 연속조회 등) 동안 연결을 잡아 두지 않도록 청크마다 빌리고 반납한다
+        (오래 쉰 연결은 꺼낼 때 풀이 점검하므로 wait_timeout으로 끊긴 연결을 쓰지 않음).
+        """
+        conn = self.backend.get_connection()
+        cursor = conn.cursor()
+
+        try:
+            for statement in self.backend.bulk_session_statements:
+                cursor.execute(statement)
+            cursor.execute(STAGE_TABLE_DDL)
+            cursor.execute(f"DELETE FROM {STAGE_TABLE}")
+            self._load_stage(cursor, rows)
+            cursor.execute(self.backend.candle_merge_query.format(stage=STAGE_TABLE))
+            conn.commit()
+            cursor.execute(f"DROP TABLE IF EXISTS {STAGE_TABLE}")
+            conn.commit()
+
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            self._reset_session(cursor)
+            cursor.close()
+            conn.close()
+
+    def _prepare(self, progress: Dict):
+        """적재 전 보조 인덱스 삭제 (별도 연결)"""
+        conn = self.backend.get_connection()
+        cursor = conn.cursor()
+
+        try:
+            self._drop_secondary_indexes(conn, cursor, progress)
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            cursor.close()
+            conn.close()
+
+    def run(self, stock_codes: Iterable[str], load: RecordLoader) -> Dict[str, float]:
+        """
+        종목들의 일봉을 daily_candle에 적재 (진행 파일에 완료된 종목은 건너뜀)
+
+        :param load: 종목코드 -> 일봉 레코드
+        :return: {'symbols', 'skipped', 'rows', 'seconds'}
+        """
+        progress = self.load_progress()
+        done = set(progress['done'])
+        codes = [code for code in dict.fromkeys(stock_codes) if code]
+        todo = [code for code in codes if code not in done]
+        if len(todo) < len(codes):
+            self.logger.info(f"이전 진행 이어서 적재: 완료 {len(codes) - len(todo)}종목, 남은 {len(todo)}종목")
+
+        started = time.monotonic()
+        loaded_rows = 0
+        loaded_symbols = 0
+
+        try:
+            if self.drop_indexes:
+                self._prepare(progress)
+
+            rows: List[Tuple] = []
+            chunk_codes: List[str] = []
+            for position, code in enumerate(todo, 1):
+                # 조회/변환은 연결 없이 하고, 청크가 차면 그때 연결을 빌려 적재
+                rows.extend(_stage_rows(code, load(code)))
+                chunk_codes.append(code)
+                if len(rows) < self.chunk_rows and position < len(todo):
+                    continue
+
+                self._write_chunk(rows)
+                loaded_rows += len(rows)
+                loaded_symbols += len(chunk_codes)
+                progress['done'].extend(chunk_codes)
+                progress['rows'] += len(rows)
+                self._save_progress(progress)
+
+                elapsed = time.monotonic() - started
+                self.logger.info(
+                    f"백필 진행: {position}/{len(todo)}종목, {loaded_rows:,}행 "
+                    f"({loaded_rows / elapsed if elapsed else 0:,.0f}행/초)"
+                )
+                rows, chunk_codes = [], []
+
+        except Exception as e:
+            self.logger.error(f"백필 중단 ({loaded_symbols}종목 커밋됨, 다시 실행하면 이어서 적재): {e}")
+            raise
+
+        self.restore_indexes(progress)
+        elapsed = time.monotonic() - started
+        self.logger.info(f"백필 완료: {loaded_symbols}종목, {loaded_rows:,}행, {elapsed:.1f}초 (방식: {self.method})")
+        self.reset_progress()
+        return {'symbols': loaded_symbols, 'skipped': len(codes) - len(todo),
+                'rows': loaded_rows, 'seconds': elapsed}
+
+
+def _requested_codes(args) -> List[str]:
+    """--codes와 --codes-file로 지정한 종목코드"""
+    codes = [code.strip() for code in args.codes.split(',') if code.strip()]
+    if args.codes_file:
+        with open(args.codes_file, 'r', encoding='utf-8') as f:
+            codes.extend(line.strip() for line in f if line.strip())
+    return codes
+
+
+def main():
+    """
+    일봉 백필 CLI -> daily_candle
+
+    - store: 종목별 .npy 저장소 (NPY 덤프는 --store-dir로 지정)
+    - csv: CSV 덤프를 --store-dir로 가져온 뒤 적재
+    - kiwoom: ka10081 연속조회로 --since부터 전체 이력 조회 (--codes/--codes-file 필요)
+    """
+    parser = argparse.ArgumentParser(description='daily_candle 대량 초기 적재')
+    parser.add_argument('--source', choices=('store', 'csv', 'kiwoom'), default='store', help='이력 출처')
+    parser.add_argument('--store-dir', default=Config.CANDLE_STORE_DIR, help='종목별 .npy 캔들 저장소')
+    parser.add_argument('--csv', help='CSV 덤프 경로 (--source csv)')
+    parser.add_argument('--codes', default='', help='적재할 종목코드 (쉼표 구분, 기본: 저장소/CSV 전체)')
+    parser.add_argument('--codes-file', help='적재할 종목코드 파일 (한 줄에 하나)')
+    parser.add_argument('--since', type=int, default=None,
+                        help='이 날짜(YYYYMMDD)부터만 적재 (kiwoom은 조회 시작일, 필수)')
+    parser.add_argument('--chunk-rows', type=int, default=Config.BACKFILL_CHUNK_ROWS, help='트랜잭션당 행 수')
+    parser.add_argument('--method', choices=('auto', 'infile', 'insert'), default='auto', help='스테이징 적재 방식')
+    parser.add_argument('--keep-indexes', action='store_true', help='보조 인덱스를 삭제하지 않음')
+    parser.add_argument('--restart', action='store_true', help='진행 기록을 지우고 처음부터 적재')
+    parser.add_argument('--restore-indexes', action='store_true', help='삭제해 둔 보조 인덱스만 다시 만들고 종료')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s [%(levelname)s] %(name)s - %(message)s')
+    backfill = CandleBackfill(chunk_rows=args.chunk_rows, method=args.method, drop_indexes=not args.keep_indexes)
+    if args.restore_indexes:
+        backfill.restore_indexes()
+        return
+    if args.restart:
+        backfill.reset_progress()
+
+    codes = _requested_codes(args)
+    if args.source == 'kiwoom':
+        from services.kiwoom_service import KiwoomAPIService
+
+        if args.since is None or not codes:
+            parser.error('--source kiwoom은 --since와 --codes(또는 --codes-file)가 필요합니다')
+        backfill.run(codes, kiwoom_loader(KiwoomAPIService(), str(args.since)))
+        return
+
+    store = CandleStore(args.store_dir)
+    if args.source == 'csv':
+        if not args.csv:
+            parser.error('--source csv는 --csv가 필요합니다')
+        imported = import_csv(store, args.csv)
+        codes = codes or imported
+    codes = codes or store.stock_codes()
+
+    def load(stock_code: str) -> np.ndarray:
+        records = store.load(stock_code)
+        if args.since is not None:
+            records = records[np.searchsorted(records['date'], args.since):]
+        return records
+
+    backfill.run(codes, load)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,19 +1,224 @@
 # DB 연결 관리 파일
 import mysql.connector
-from mysql.connector import pooling
+from mysql.connector.errors import PoolError
 import logging
+import threading
+import time
+from collections import deque
+from typing import Dict, Optional
 from config import Config
 
+
+class _PooledEntry:
+    """풀이 관리하는 실제 연결 + 생성/반납 시각"""
+
+    def __init__(self, raw):
+        self.raw = raw
+        self.created_at = time.monotonic()
+        self.returned_at = self.created_at
+
+
+class PooledConnection:
+    """풀에서 빌린 연결 (close()하면 닫지 않고 풀에 반납, 나머지는 실제 연결에 위임)"""
+
+    def __init__(self, pool: 'ConnectionPool', entry: _PooledEntry, read_only: bool):
+        self._pool = pool
+        self._entry = entry
+        self._read_only = read_only
+
+    def __getattr__(self, name):
+        entry = self.__dict__.get('_entry')
+        if entry is None:
+            raise PoolError("이미 풀에 반납된 연결입니다")
+        return getattr(entry.raw, name)
+
+    def close(self):
+        entry, self._entry = self._entry, None
+        if entry is not None:
+            self._pool._release(entry, self._read_only)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class ConnectionPool:
+    """크기/오버플로 설정, 대기 획득, 유휴 연결 점검/재생성, 사용 지표를 갖춘 커넥션 풀
+
+    - pool_size개까지는 반납된 연결을 보관하고, 추가로 max_overflow개까지 임시 연결을 만든다.
+    - 모두 사용 중이면 timeout초까지 반납을 기다린 뒤 PoolError를 낸다.
+    - 꺼낼 때 recycle초보다 오래된 연결은 새로 만들고, pre_ping이면 ping_interval초 이상 쉰 연결을 점검한다.
+    - 반납할 때 세션을 초기화한다 (reset_session). 읽기 전용으로 빌린 연결은 롤백만 한다.
+    """
+
+    def __init__(self, connect_args: Dict, pool_size: int = 5, max_overflow: int = 5,
+                 timeout: float = 30.0, recycle: float = 1800.0, pre_ping: bool = True,
+                 ping_interval: float = 30.0, reset_session: bool = True):
+        self.connect_args = dict(connect_args)
+        self.pool_size = max(1, pool_size)
+        self.max_overflow = max(0, max_overflow)
+        self.timeout = timeout
+        self.recycle = recycle
+        self.pre_ping = pre_ping
+        self.ping_interval = ping_interval
+        self.reset_session = reset_session
+        self.logger = logging.getLogger(__name__)
+
+        self._idle: deque = deque()
+        self._total = 0  # 생성되어 있는 연결 수 (사용 중 + 유휴)
+        self._cond = threading.Condition()
+        self._stats: Dict[str, float] = {
+            'checkouts': 0,
+            'wait_time_total': 0.0,
+            'wait_time_max': 0.0,
+            'timeouts': 0,
+            'failures': 0,
+            'created': 0,
+            'recycled': 0,
+        }
+
+    def _connect(self) -> _PooledEntry:
+        try:
+            entry = _PooledEntry(mysql.connector.connect(**self.connect_args))
+        except Exception:
+            with self._cond:
+                self._stats['failures'] += 1
+            raise
+        with self._cond:
+            self._stats['created'] += 1
+        return entry
+
+    def _discard(self, entry: _PooledEntry):
+        try:
+            entry.raw.close()
+        except Exception:
+            pass
+
+    def _is_usable(self, entry: _PooledEntry) -> bool:
+        """재사용 전 점검 (오래된 연결 재생성, 오래 쉰 연결 ping)"""
+        now = time.monotonic()
+        if self.recycle and now - entry.created_at > self.recycle:
+            with self._cond:
+                self._stats['recycled'] += 1
+            return False
+        if self.pre_ping and now - entry.returned_at > self.ping_interval:
+            try:
+                entry.raw.ping(reconnect=False)
+            except Exception as e:
+                self.logger.info(f"유휴 DB 연결 끊김 감지 - 재연결 ({e})")
+                with self._cond:
+                    self._stats['failures'] += 1
+                return False
+        return True
+
+    def get_connection(self, read_only: bool = False, timeout: Optional[float] = None) -> PooledConnection:
+        """
+        연결 빌리기 (모두 사용 중이면 반납될 때까지 대기)
+
+        :param read_only: 조회 전용 (반납시 세션 초기화 생략)
+        :param timeout: 최대 대기 시간 (None이면 풀 기본값)
+        """
+        timeout = self.timeout if timeout is None else timeout
+        started = time.monotonic()
+        deadline = started + timeout
+
+        while True:
+            entry = None
+            create = False
+            with self._cond:
+                while not self._idle and self._total >= self.pool_size + self.max_overflow:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._stats['timeouts'] += 1
+                        self._stats['failures'] += 1
+                        raise PoolError(f"DB 커넥션 풀 대기 시간 초과 ({timeout:.1f}초, 사용 중 {self._total}개)")
+                    self._cond.wait(remaining)
+                if self._idle:
+                    entry = self._idle.pop()  # 최근 반납된 연결부터 (LIFO)
+                else:
+                    self._total += 1
+                    create = True
+
+            if create:
+                try:
+                    entry = self._connect()
+                except Exception:
+                    self._forget()
+                    raise
+            elif not self._is_usable(entry):
+                self._discard(entry)
+                self._forget()
+                continue
+
+            waited = time.monotonic() - started
+            with self._cond:
+                self._stats['checkouts'] += 1
+                self._stats['wait_time_total'] += waited
+                self._stats['wait_time_max'] = max(self._stats['wait_time_max'], waited)
+            return PooledConnection(self, entry, read_only)
+
+    def _forget(self):
+        """연결 하나를 폐기했음을 반영하고 대기자 깨우기"""
+        with self._cond:
+            self._total -= 1
+            self._cond.notify()
+
+    def _release(self, entry: _PooledEntry, read_only: bool):
+        """반납 (세션 정리 실패시 또는 보관 한도를 넘으면 닫음)"""
+        try:
+            if self.reset_session and not read_only:
+                entry.raw.reset_session()
+            else:
+                entry.raw.rollback()
+        except Exception as e:
+            self.logger.warning(f"DB 연결 반납 중 세션 정리 실패 - 연결 폐기 ({e})")
+            self._discard(entry)
+            self._forget()
+            return
+
+        entry.returned_at = time.monotonic()
+        with self._cond:
+            if len(self._idle) < self.pool_size:
+                self._idle.append(entry)
+                self._cond.notify()
+                return
+        # 오버플로 연결은 보관하지 않음
+        self._discard(entry)
+        self._forget()
+
+    def stats(self) -> Dict[str, float]:
+        """풀 사용 지표 (checkouts, 평균/최대 대기 시간, in_use, failures 등)"""
+        with self._cond:
+            stats = dict(self._stats)
+            stats['in_use'] = self._total - len(self._idle)
+            stats['idle'] = len(self._idle)
+            stats['pool_size'] = self.pool_size
+            stats['max_overflow'] = self.max_overflow
+        stats['wait_time_avg'] = stats['wait_time_total'] / stats['checkouts'] if stats['checkouts'] else 0.0
+        return stats
+
+    def close_idle(self):
+        """보관 중인 유휴 연결 모두 닫기"""
+        with self._cond:
+            idle, self._idle = list(self._idle), deque()
+            self._total -= len(idle)
+            self._cond.notify_all()
+        for entry in idle:
+            self._discard(entry)
+
+
 class DatabaseConnection:
     _instance = None
     _pool = None
-    
+
     def __new__(cls):
         if cls._instance is None:
             cls._instance = super(DatabaseConnection, cls).__new__(cls)
             cls._instance._initialize_pool()
         return cls._instance
-    
+
     def _initialize_pool(self):
         """Azure MySQL 서버용 커넥션 풀 초기화"""
         try:
@@ -23,7 +228,7 @@ class DatabaseConnection:
                 # Azure MySQL은 보통 username@servername 형식 필요
                 server_name = Config.DB_HOST.split('.')[0]  # turtledashboard-server
                 username = f"{Config.DB_USERNAME}@{server_name}"
-            
+
             config = {
                 'user': username,
                 'password': Config.DB_PASSWORD,
@@ -32,27 +237,45 @@ class DatabaseConnection:
                 'database': Config.DB_DATABASE,
                 'charset': 'utf8mb4',
                 'autocommit': False,
-                'pool_name': 'turtle_pool',
-                'pool_size': 3,
-                'pool_reset_session': True,
                 'ssl_verify_cert': False,  # Azure MySQL SSL 문제 해결
                 'ssl_verify_identity': False,
                 'ssl_disabled': False,
                 'use_unicode': True,
                 'sql_mode': 'TRADITIONAL',
                 'connect_timeout': 30,
-                'auth_plugin': 'mysql_native_password'
+                'auth_plugin': 'mysql_native_password',
+                'allow_local_infile': Config.DB_LOCAL_INFILE  # 일봉 백필 LOAD DATA LOCAL INFILE
             }
-            self._pool = pooling.MySQLConnectionPool(**config)
-            logging.info("Azure MySQL 커넥션 풀 초기화 완료")
+            self._pool = ConnectionPool(
+                config,
+                pool_size=Config.DB_POOL_SIZE,
+                max_overflow=Config.DB_POOL_MAX_OVERFLOW,
+                timeout=Config.DB_POOL_TIMEOUT,
+                recycle=Config.DB_POOL_RECYCLE,
+                pre_ping=Config.DB_POOL_PRE_PING,
+                reset_session=Config.DB_POOL_RESET_SESSION
+            )
+            # 첫 연결로 접속 정보 확인 (실패시 기존처럼 초기화 단계에서 예외)
+            self._pool.get_connection(read_only=True).close()
+            logging.info(f"Azure MySQL 커넥션 풀 초기화 완료 (크기 {Config.DB_POOL_SIZE}, 오버플로 {Config.DB_POOL_MAX_OVERFLOW})")
         except Exception as e:
             logging.error(f"Azure MySQL 커넥션 풀 초기화 실패: {e}")
+            DatabaseConnection._instance = None
             raise
-    
-    def get_connection(self):
-        """커넥션 풀에서 연결 반환"""
+
+    def get_connection(self, read_only: bool = False, timeout: Optional[float] = None):
+        """
+        커넥션 풀에서 연결 반환 (close()하면 풀에 반납)
+
+        :param read_only: 조회 전용 (반납시 세션 초기화 생략)
+        :param timeout: 풀이 가득 찼을 때 최대 대기 시간
+        """
         try:
-            return self._pool.get_connection()
+            return self._pool.get_connection(read_only=read_only, timeout=timeout)
         except Exception as e:
             logging.error(f"데이터베이스 연결 실패: {e}")
             raise
+
+    def pool_stats(self) -> Dict[str, float]:
+        """커넥션 풀 사용 지표"""
+        return self._pool.stats()
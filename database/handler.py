@@ -1,161 +1,51 @@
 import mysql.connector
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
 from datetime import datetime, timedelta
 import logging
 from decimal import Decimal
+import numpy as np
 import pandas as pd
 
-from .connection import DatabaseConnection  # Azure MySQL 연결
-from .models import StockInfo, DailyCandle, TurtleSignal
+from .backends import StorageBackend, get_backend  # 저장소 (Azure MySQL 또는 내장 SQLite)
+from .migrations import MigrationRunner
+from .models import StockInfo, DailyCandle, TurtleSignal, TurtleSignalBatch, PRICE_SCALE, ATR_SCALE
 
 # DB 핸들러(쿼리 등) 관리 파일
 
+def _candle_tuples(candle_data: List[Dict]) -> List[Tuple]:
+    return [
+        (
+            data['stock_code'],
+            data['date'],
+            data['open'],
+            data['high'],
+            data['low'],
+            data['close'],
+            data['volume'],
+            data['amount']
+        ) for data in candle_data
+    ]
+
 class DatabaseHandler:
-    def __init__(self):
-        self.db_conn = DatabaseConnection()  # Azure MySQL 연결 사용
+    def __init__(self, backend: Optional[StorageBackend] = None):
+        self.backend = backend or get_backend()  # Config.DB_BACKEND (기본 Azure MySQL)
         self.logger = logging.getLogger(__name__)
     
     def create_tables(self):
-        """테이블 생성"""
-        conn = self.db_conn.get_connection()
-        cursor = conn.cursor()
-        
-        tables = {
-            'stock_info': """
-                CREATE TABLE IF NOT EXISTS stock_info (
-                    stock_code VARCHAR(10) PRIMARY KEY,
-                    stock_name VARCHAR(100) NOT NULL,
-                    market_type VARCHAR(20),
-                    sector VARCHAR(50),
-                    market_cap BIGINT,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
-                ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
-            """,
-            
-            'daily_candle': """
-                CREATE TABLE IF NOT EXISTS daily_candle (
-                    id INT AUTO_INCREMENT PRIMARY KEY,
-                    stock_code VARCHAR(10) NOT NULL,
-                    date DATE NOT NULL,
-                    open_price DECIMAL(12,2) NOT NULL,
-                    high_price DECIMAL(12,2) NOT NULL,
-                    low_price DECIMAL(12,2) NOT NULL,
-                    close_price DECIMAL(12,2) NOT NULL,
-                    volume BIGINT NOT NULL,
-                    amount BIGINT NOT NULL,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    UNIQUE KEY unique_stock_date (stock_code, date),
-                    INDEX idx_stock_code (stock_code),
-                    INDEX idx_date (date)
-                ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
-            """,
-            
-            'turtle_signals': """
-                CREATE TABLE IF NOT EXISTS turtle_signals (
-                    id INT AUTO_INCREMENT PRIMARY KEY,
-                    stock_code VARCHAR(10) NOT NULL,
-                    signal_date DATE NOT NULL,
-                    system_type TINYINT NOT NULL COMMENT '1:시스템1(단기), 2:시스템2(장기)',
-                    signal_type VARCHAR(10) NOT NULL COMMENT 'BUY, SELL',
-                    entry_price DECIMAL(12,2) NOT NULL,
-                    stop_loss DECIMAL(12,2) NOT NULL,
-                    take_profit DECIMAL(12,2) NOT NULL,
-                    add_position DECIMAL(12,2) NOT NULL,
-                    atr_20 DECIMAL(12,4) NOT NULL,
-                    donchian_high_20 DECIMAL(12,2) NOT NULL,
-                    donchian_low_20 DECIMAL(12,2) NOT NULL,
-                    is_active BOOLEAN DEFAULT TRUE,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
-                    INDEX idx_stock_code (stock_code),
-                    INDEX idx_signal_date (signal_date),
-                    INDEX idx_system_type (system_type),
-                    INDEX idx_is_active (is_active)
-                ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
-            """,
-            
-            'turtle_positions': """
-                CREATE TABLE IF NOT EXISTS turtle_positions (
-                    id INT AUTO_INCREMENT PRIMARY KEY,
-                    stock_code VARCHAR(10) NOT NULL,
-                    signal_id INT NOT NULL,
-                    entry_date DATE NOT NULL,
-                    entry_price DECIMAL(12,2) NOT NULL,
-                    entry_atr DECIMAL(12,4) NOT NULL COMMENT '진입시 ATR (고정)',
-                    fixed_stop_loss DECIMAL(12,2) NOT NULL COMMENT '진입시 계산된 고정 손절가',
-                    system_type TINYINT NOT NULL COMMENT '1:시스템1, 2:시스템2',
-                    quantity INT DEFAULT 0,
-                    current_trailing_stop DECIMAL(12,2) NULL COMMENT '현재 트레일링 스탑',
-                    current_add_position DECIMAL(12,2) NULL COMMENT '현재 추가매수가',
-                    is_closed BOOLEAN DEFAULT FALSE,
-                    exit_date DATE NULL,
-                    exit_price DECIMAL(12,2) NULL,
-                    exit_reason VARCHAR(20) NULL COMMENT 'STOP_LOSS, TRAILING, MANUAL',
-                    profit_loss DECIMAL(15,2) NULL,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
-                    FOREIGN KEY (signal_id) REFERENCES turtle_signals(id),
-                    INDEX idx_stock_code (stock_code),
-                    INDEX idx_entry_date (entry_date),
-                    INDEX idx_is_closed (is_closed),
-                    INDEX idx_system_type (system_type)
-                ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
-            """
-        }
-        
-        try:
-            for table_name, create_sql in tables.items():
-                cursor.execute(create_sql)
-                self.logger.info(f"{table_name} 테이블 생성/확인 완료")
-            
-            conn.commit()
-            self.logger.info("모든 테이블 생성 완료")
-            
-        except Exception as e:
-            self.logger.error(f"테이블 생성 실패: {e}")
-            conn.rollback()
-            raise
-        finally:
-            cursor.close()
-            conn.close()
+        """테이블 생성/스키마 갱신 (버전 마이그레이션 실행, database/migrations.py)"""
+        applied = MigrationRunner(self.backend).migrate()
+        self.logger.info(f"스키마 최신 상태 (이번에 적용: {applied or '없음'})")
     
     def upsert_candle_data(self, candle_data: List[Dict]):
         """일봉 데이터 업서트"""
         if not candle_data:
             return
             
-        conn = self.db_conn.get_connection()
+        conn = self.backend.get_connection()
         cursor = conn.cursor()
         
-        upsert_query = """
-            INSERT INTO daily_candle 
-            (stock_code, date, open_price, high_price, low_price, close_price, volume, amount)
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-            ON DUPLICATE KEY UPDATE
-                open_price = VALUES(open_price),
-                high_price = VALUES(high_price),
-                low_price = VALUES(low_price),
-                close_price = VALUES(close_price),
-                volume = VALUES(volume),
-                amount = VALUES(amount)
-        """
-        
         try:
-            data_tuples = [
-                (
-                    data['stock_code'],
-                    data['date'],
-                    data['open'],
-                    data['high'],
-                    data['low'],
-                    data['close'],
-                    data['volume'],
-                    data['amount']
-                ) for data in candle_data
-            ]
-            
-            cursor.executemany(upsert_query, data_tuples)
+            cursor.executemany(self.backend.candle_upsert_query, _candle_tuples(candle_data))
             conn.commit()
             self.logger.info(f"{len(candle_data)}개 일봉 데이터 업서트 완료")
             
@@ -169,7 +59,7 @@ class DatabaseHandler:
     
     def get_candle_data_for_turtle(self, stock_code: str, days: int = 60) -> pd.DataFrame:
         """터틀 계산용 캔들 데이터 조회"""
-        conn = self.db_conn.get_connection()
+        conn = self.backend.get_connection(read_only=True)
         
         query = """
             SELECT date, open_price, high_price, low_price, close_price, volume
@@ -190,20 +80,165 @@ class DatabaseHandler:
         finally:
             conn.close()
     
+    def get_recent_candle_block(self, stock_codes: Optional[List[str]] = None, days: int = 60,
+                                end_date=None, calendar_days: Optional[int] = None,
+                                fetch_size: int = 10000) -> Tuple[List[str], Dict[str, np.ndarray], np.ndarray]:
+        """
+        여러 종목의 최근 days개 봉을 (종목 x days) 블록으로 조회 (단일 쿼리, 재계산용)
+
+        ROW_NUMBER() 윈도우로 종목별 최근 봉만 남기고, 날짜 하한을 두어 (stock_code, date) 키 범위 스캔으로 읽는다.
+        행은 fetch_size개씩 받아 바로 블록에 채운다.
+
+        :param stock_codes: 조회할 종목 (None이면 기간 내 전체 종목, 이 경우 코드 순 정렬)
+        :param end_date: 기준일 (None이면 최신 봉까지)
+        :param calendar_days: 날짜 하한 (기준일 - calendar_days), None이면 days의 2배 + 14일
+        :return: (종목코드 리스트, date(YYYYMMDD int32)/open/high/low/close/volume 블록, 유효 마스크)
+                 블록은 오름차순이고 마지막 열이 최신 봉, 이력이 짧으면 왼쪽이 비어 있다 (가격 NaN, mask False)
+        """
+        if stock_codes is not None:
+            stock_codes = list(dict.fromkeys(code for code in stock_codes if code))
+            if not stock_codes:
+                return [], self._empty_candle_block(0, days), np.zeros((0, days), dtype=bool)
+        
+        end = pd.Timestamp(end_date).date() if end_date else datetime.now().date()
+        start = end - timedelta(days=calendar_days if calendar_days is not None else days * 2 + 14)
+        
+        conditions = ["date BETWEEN %s AND %s"]
+        params: List = [start, end]
+        if stock_codes is not None:
+            conditions.append(f"stock_code IN ({', '.join(['%s'] * len(stock_codes))})")
+            params.extend(stock_codes)
+        params.append(days)
+        
+        query = f"""
+            SELECT stock_code, rn, date, open_price, high_price, low_price, close_price, volume
+            FROM (
+                SELECT stock_code, date, open_price, high_price, low_price, close_price, volume,
+                       ROW_NUMBER() OVER (PARTITION BY stock_code ORDER BY date DESC) AS rn
+                FROM daily_candle 
+                WHERE {' AND '.join(conditions)}
+            ) recent
+            WHERE rn <= %s
+            ORDER BY stock_code, rn
+        """
+        
+        conn = self.backend.get_connection(read_only=True)
+        cursor = conn.cursor()
+        
+        try:
+            cursor.execute(query, tuple(params))
+            
+            if stock_codes is not None:
+                row_index = {code: i for i, code in enumerate(stock_codes)}
+                block = self._empty_candle_block(len(stock_codes), days)
+            else:
+                # 종목 수를 모르므로 코드 순으로 들어오는 대로 행을 늘림
+                stock_codes, row_index = [], {}
+                block = self._empty_candle_block(64, days)
+            
+            while True:
+                rows = cursor.fetchmany(fetch_size)
+                if not rows:
+                    break
+                for code in dict.fromkeys(row[0] for row in rows):
+                    if code not in row_index:
+                        row_index[code] = len(stock_codes)
+                        stock_codes.append(code)
+                if len(stock_codes) > len(block['date']):
+                    capacity = max(len(stock_codes), len(block['date']) * 2)
+                    grown = self._empty_candle_block(capacity, days)
+                    for key, values in block.items():
+                        grown[key][:len(values)] = values
+                    block = grown
+                
+                sym = np.fromiter((row_index[row[0]] for row in rows), dtype=np.intp, count=len(rows))
+                col = days - np.fromiter((row[1] for row in rows), dtype=np.intp, count=len(rows))
+                block['date'][sym, col] = [row[2].year * 10000 + row[2].month * 100 + row[2].day for row in rows]
+                for i, key in enumerate(('open', 'high', 'low', 'close'), start=3):
+                    block[key][sym, col] = np.fromiter((row[i] for row in rows), dtype=np.float64, count=len(rows))
+                block['volume'][sym, col] = np.fromiter((row[7] for row in rows), dtype=np.int64, count=len(rows))
+            
+            block = {key: values[:len(stock_codes)] for key, values in block.items()}
+            mask = block['date'] > 0
+            self.logger.info(f"최근 일봉 블록 조회 완료: {len(stock_codes)}종목 x {days}일 (유효 {int(mask.sum())}개)")
+            return stock_codes, block, mask
+            
+        except Exception as e:
+            self.logger.error(f"최근 일봉 블록 조회 실패: {e}")
+            raise
+        finally:
+            cursor.close()
+            conn.close()
+    
+    @staticmethod
+    def _empty_candle_block(rows: int, days: int) -> Dict[str, np.ndarray]:
+        block = {'date': np.zeros((rows, days), dtype=np.int32)}
+        for key in ('open', 'high', 'low', 'close'):
+            block[key] = np.full((rows, days), np.nan)
+        block['volume'] = np.zeros((rows, days), dtype=np.int64)
+        return block
+    
+    def get_candle_history_block(self, start_date=None, end_date=None) -> Tuple[List[str], np.ndarray, Dict[str, np.ndarray]]:
+        """
+        전체 종목 일봉 이력을 (종목 x 일자) 블록으로 조회 (백테스트용, 단일 쿼리)
+
+        :return: (종목코드 리스트, 일자 배열, high/low/close 블록 - 거래 없는 날은 NaN)
+        """
+        conn = self.backend.get_connection(read_only=True)
+        
+        conditions = []
+        params = []
+        if start_date:
+            conditions.append("date >= %s")
+            params.append(start_date)
+        if end_date:
+            conditions.append("date <= %s")
+            params.append(end_date)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        
+        query = f"""
+            SELECT stock_code, date, high_price, low_price, close_price
+            FROM daily_candle 
+            {where}
+        """
+        
+        try:
+            df = pd.read_sql(query, conn, params=tuple(params))
+            if df.empty:
+                return [], np.array([]), {key: np.empty((0, 0)) for key in ('high', 'low', 'close')}
+            
+            stock_codes, symbol_idx = np.unique(df['stock_code'].to_numpy(), return_inverse=True)
+            dates, date_idx = np.unique(df['date'].to_numpy(), return_inverse=True)
+            
+            block = {}
+            for key, column in (('high', 'high_price'), ('low', 'low_price'), ('close', 'close_price')):
+                values = np.full((len(stock_codes), len(dates)), np.nan)
+                values[symbol_idx, date_idx] = df[column].to_numpy(dtype=float)
+                block[key] = values
+            
+            self.logger.info(f"일봉 이력 블록 조회 완료: {len(stock_codes)}종목 x {len(dates)}일")
+            return list(stock_codes), dates, block
+            
+        except Exception as e:
+            self.logger.error(f"일봉 이력 블록 조회 실패: {e}")
+            raise
+        finally:
+            conn.close()
+    
     def get_all_active_stocks(self) -> List[str]:
         """활성 종목 코드 리스트 조회"""
-        conn = self.db_conn.get_connection()
+        conn = self.backend.get_connection(read_only=True)
         cursor = conn.cursor()
         
         query = """
             SELECT DISTINCT stock_code 
             FROM daily_candle 
-            WHERE date >= DATE_SUB(CURDATE(), INTERVAL 7 DAY)
+            WHERE date >= %s
             ORDER BY stock_code
         """
         
         try:
-            cursor.execute(query)
+            cursor.execute(query, (datetime.now().date() - timedelta(days=7),))
             results = cursor.fetchall()
             return [row[0] for row in results]
             
@@ -219,7 +254,7 @@ class DatabaseHandler:
         if not signals:
             return
             
-        conn = self.db_conn.get_connection()
+        conn = self.backend.get_connection()
         cursor = conn.cursor()
         
         insert_query = """
@@ -257,3 +292,32 @@ class DatabaseHandler:
         finally:
             cursor.close()
             conn.close()
+    
+    def save_signal_batch(self, batch: TurtleSignalBatch):
+        """터틀 신호 배치 저장 (고정소수점 정수를 SQL에서 DECIMAL로 복원, 단일 executemany - .0은 SQLite 정수 나눗셈 방지)"""
+        if len(batch) == 0:
+            return
+            
+        conn = self.backend.get_connection()
+        cursor = conn.cursor()
+        
+        insert_query = f"""
+            INSERT INTO turtle_signals 
+            (stock_code, signal_date, system_type, signal_type, entry_price, 
+             stop_loss, take_profit, add_position, atr_20, donchian_high_20, donchian_low_20)
+            VALUES (%s, %s, %s, %s, %s / {PRICE_SCALE}.0, %s / {PRICE_SCALE}.0, %s / {PRICE_SCALE}.0,
+                    %s / {PRICE_SCALE}.0, %s / {ATR_SCALE}.0, %s / {PRICE_SCALE}.0, %s / {PRICE_SCALE}.0)
+        """
+        
+        try:
+            cursor.executemany(insert_query, batch.to_rows())
+            conn.commit()
+            self.logger.info(f"{len(batch)}개 터틀 신호 배치 저장 완료")
+            
+        except Exception as e:
+            self.logger.error(f"터틀 신호 배치 저장 실패: {e}")
+            conn.rollback()
+            raise
+        finally:
+            cursor.close()
+            conn.close()
@@ -0,0 +1,494 @@
+# DB 스키마 마이그레이션 (버전별 DDL 순서 적용)
+import argparse
+import logging
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# 다른 워커가 동시에 마이그레이션하지 않도록 잡는 MySQL 이름 잠금
+LOCK_NAME = 'turtle_dashboard_migrations'
+LOCK_TIMEOUT = 300
+
+# daily_candle 연도별 파티션 범위 (이전은 p_old, 이후는 p_future에 들어감 - 새 연도는 파티션 분할 마이그레이션으로 추가)
+CANDLE_PARTITION_FIRST_YEAR = 2000
+CANDLE_PARTITION_LAST_YEAR = 2030
+
+
+@dataclass
+class Migration:
+    """스키마 버전 하나 (statements를 순서대로 실행)"""
+    version: int
+    description: str
+    statements: List[str] = field(default_factory=list)
+
+
+# 버전 1: 기존 create_tables와 같은 초기 스키마
+BASELINE_TABLES = {
+    'stock_info': """
+        CREATE TABLE IF NOT EXISTS stock_info (
+            stock_code VARCHAR(10) PRIMARY KEY,
+            stock_name VARCHAR(100) NOT NULL,
+            market_type VARCHAR(20),
+            sector VARCHAR(50),
+            market_cap BIGINT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+    """,
+    
+    'daily_candle': """
+        CREATE TABLE IF NOT EXISTS daily_candle (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            stock_code VARCHAR(10) NOT NULL,
+            date DATE NOT NULL,
+            open_price DECIMAL(12,2) NOT NULL,
+            high_price DECIMAL(12,2) NOT NULL,
+            low_price DECIMAL(12,2) NOT NULL,
+            close_price DECIMAL(12,2) NOT NULL,
+            volume BIGINT NOT NULL,
+            amount BIGINT NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            UNIQUE KEY unique_stock_date (stock_code, date),
+            INDEX idx_stock_code (stock_code),
+            INDEX idx_date (date)
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+    """,
+    
+    'turtle_signals': """
+        CREATE TABLE IF NOT EXISTS turtle_signals (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            stock_code VARCHAR(10) NOT NULL,
+            signal_date DATE NOT NULL,
+            system_type TINYINT NOT NULL COMMENT '1:시스템1(단기), 2:시스템2(장기)',
+            signal_type VARCHAR(10) NOT NULL COMMENT 'BUY, SELL',
+            entry_price DECIMAL(12,2) NOT NULL,
+            stop_loss DECIMAL(12,2) NOT NULL,
+            take_profit DECIMAL(12,2) NOT NULL,
+            add_position DECIMAL(12,2) NOT NULL,
+            atr_20 DECIMAL(12,4) NOT NULL,
+            donchian_high_20 DECIMAL(12,2) NOT NULL,
+            donchian_low_20 DECIMAL(12,2) NOT NULL,
+            is_active BOOLEAN DEFAULT TRUE,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+            INDEX idx_stock_code (stock_code),
+            INDEX idx_signal_date (signal_date),
+            INDEX idx_system_type (system_type),
+            INDEX idx_is_active (is_active)
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+    """,
+    
+    'turtle_positions': """
+        CREATE TABLE IF NOT EXISTS turtle_positions (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            stock_code VARCHAR(10) NOT NULL,
+            signal_id INT NOT NULL,
+            entry_date DATE NOT NULL,
+            entry_price DECIMAL(12,2) NOT NULL,
+            entry_atr DECIMAL(12,4) NOT NULL COMMENT '진입시 ATR (고정)',
+            fixed_stop_loss DECIMAL(12,2) NOT NULL COMMENT '진입시 계산된 고정 손절가',
+            system_type TINYINT NOT NULL COMMENT '1:시스템1, 2:시스템2',
+            quantity INT DEFAULT 0,
+            current_trailing_stop DECIMAL(12,2) NULL COMMENT '현재 트레일링 스탑',
+            current_add_position DECIMAL(12,2) NULL COMMENT '현재 추가매수가',
+            is_closed BOOLEAN DEFAULT FALSE,
+            exit_date DATE NULL,
+            exit_price DECIMAL(12,2) NULL,
+            exit_reason VARCHAR(20) NULL COMMENT 'STOP_LOSS, TRAILING, MANUAL',
+            profit_loss DECIMAL(15,2) NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+            FOREIGN KEY (signal_id) REFERENCES turtle_signals(id),
+            INDEX idx_stock_code (stock_code),
+            INDEX idx_entry_date (entry_date),
+            INDEX idx_is_closed (is_closed),
+            INDEX idx_system_type (system_type)
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+    """,
+    
+    'turtle_position_summary': """
+        CREATE TABLE IF NOT EXISTS turtle_position_summary (
+            id TINYINT PRIMARY KEY COMMENT '단일 행 (id=1)',
+            active_count INT NOT NULL DEFAULT 0,
+            total_count INT NOT NULL DEFAULT 0,
+            closed_count INT NOT NULL DEFAULT 0 COMMENT '손익이 기록된 종료 포지션 수',
+            total_pnl DECIMAL(18,2) NOT NULL DEFAULT 0,
+            win_count INT NOT NULL DEFAULT 0,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+    """
+}
+
+
+def _candle_partitions(first_year: int, last_year: int) -> str:
+    partitions = [f"PARTITION p_old VALUES LESS THAN ('{first_year}-01-01')"]
+    partitions += [f"PARTITION p{year} VALUES LESS THAN ('{year + 1}-01-01')"
+                   for year in range(first_year, last_year + 1)]
+    partitions.append("PARTITION p_future VALUES LESS THAN (MAXVALUE)")
+    return ',\n            '.join(partitions)
+
+
+# 버전 2: daily_candle을 (stock_code, date) 클러스터드 PK + 원 단위 정수 가격 + 연도별 파티션으로 재작성
+# - 대리키 id, unique_stock_date, idx_stock_code, idx_date 제거 (PK가 종목별 이력 범위 스캔을 담당)
+# - 전체 종목의 날짜 범위 조회는 파티션 프루닝으로 처리
+# - 기존 행을 새 테이블로 복사한 뒤 이름을 원자적으로 교체
+DAILY_CANDLE_COMPACT = [
+    "DROP TABLE IF EXISTS daily_candle_new",
+    "DROP TABLE IF EXISTS daily_candle_old",
+    f"""
+        CREATE TABLE daily_candle_new (
+            stock_code VARCHAR(10) NOT NULL,
+            date DATE NOT NULL,
+            open_price INT UNSIGNED NOT NULL,
+            high_price INT UNSIGNED NOT NULL,
+            low_price INT UNSIGNED NOT NULL,
+            close_price INT UNSIGNED NOT NULL,
+            volume BIGINT UNSIGNED NOT NULL,
+            amount BIGINT UNSIGNED NOT NULL,
+            PRIMARY KEY (stock_code, date)
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+        PARTITION BY RANGE COLUMNS(date) (
+            {_candle_partitions(CANDLE_PARTITION_FIRST_YEAR, CANDLE_PARTITION_LAST_YEAR)}
+        )
+    """,
+    """
+        INSERT INTO daily_candle_new 
+        (stock_code, date, open_price, high_price, low_price, close_price, volume, amount)
+        SELECT stock_code, date, ROUND(open_price), ROUND(high_price), ROUND(low_price),
+               ROUND(close_price), volume, amount
+        FROM daily_candle
+    """,
+    "RENAME TABLE daily_candle TO daily_candle_old, daily_candle_new TO daily_candle",
+    "DROP TABLE daily_candle_old",
+]
+
+# 버전 3: 조건검색 결과 스냅샷 (실행마다 헤더 1행 + 종목 행, 쓰고 나면 바꾸지 않음)
+# - 키움 시세 필드는 받은 문자열 그대로, 터틀 가격은 고정소수점 정수 (PRICE_SCALE, atr_20은 ATR_SCALE)
+CONDITION_SNAPSHOT_TABLES = [
+    """
+        CREATE TABLE IF NOT EXISTS condition_snapshot (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            taken_at DATETIME NOT NULL COMMENT '조건검색 실행 시각 (KST)',
+            system1_count INT NOT NULL,
+            system2_count INT NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+    """,
+    """
+        CREATE TABLE IF NOT EXISTS condition_snapshot_item (
+            snapshot_id INT NOT NULL,
+            system_type TINYINT NOT NULL COMMENT '1:시스템1, 2:시스템2',
+            item_no SMALLINT UNSIGNED NOT NULL COMMENT '시스템 내 표시 순서',
+            stock_code VARCHAR(10) NOT NULL,
+            stock_name VARCHAR(100) NULL,
+            current_price VARCHAR(20) NULL,
+            price_sign VARCHAR(2) NULL,
+            change_price VARCHAR(20) NULL,
+            change_rate VARCHAR(20) NULL,
+            volume VARCHAR(20) NULL,
+            open_price VARCHAR(20) NULL,
+            high_price VARCHAR(20) NULL,
+            low_price VARCHAR(20) NULL,
+            entry_date DATE NULL,
+            entry_price BIGINT NULL,
+            atr_20 BIGINT NULL,
+            stop_loss BIGINT NULL,
+            trailing_stop BIGINT NULL,
+            add_position BIGINT NULL,
+            position_id INT NULL,
+            PRIMARY KEY (snapshot_id, system_type, item_no),
+            FOREIGN KEY (snapshot_id) REFERENCES condition_snapshot(id)
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+    """,
+]
+
+MIGRATIONS: List[Migration] = [
+    Migration(1, 'initial schema', list(BASELINE_TABLES.values())),
+    Migration(2, 'compact partitioned daily_candle', DAILY_CANDLE_COMPACT),
+    Migration(3, 'condition search snapshots', CONDITION_SNAPSHOT_TABLES),
+]
+
+
+# SQLite용 같은 스키마 (ENGINE/COMMENT/파티션 없음, 인덱스는 DB 전체에서 이름이 유일해야 해서 테이블명 접두)
+SQLITE_BASELINE = [
+    """
+        CREATE TABLE IF NOT EXISTS stock_info (
+            stock_code VARCHAR(10) PRIMARY KEY,
+            stock_name VARCHAR(100) NOT NULL,
+            market_type VARCHAR(20),
+            sector VARCHAR(50),
+            market_cap BIGINT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """,
+    """
+        CREATE TABLE IF NOT EXISTS daily_candle (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            stock_code VARCHAR(10) NOT NULL,
+            date DATE NOT NULL,
+            open_price DECIMAL(12,2) NOT NULL,
+            high_price DECIMAL(12,2) NOT NULL,
+            low_price DECIMAL(12,2) NOT NULL,
+            close_price DECIMAL(12,2) NOT NULL,
+            volume BIGINT NOT NULL,
+            amount BIGINT NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            UNIQUE (stock_code, date)
+        )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_daily_candle_date ON daily_candle (date)",
+    """
+        CREATE TABLE IF NOT EXISTS turtle_signals (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            stock_code VARCHAR(10) NOT NULL,
+            signal_date DATE NOT NULL,
+            system_type TINYINT NOT NULL,
+            signal_type VARCHAR(10) NOT NULL,
+            entry_price DECIMAL(12,2) NOT NULL,
+            stop_loss DECIMAL(12,2) NOT NULL,
+            take_profit DECIMAL(12,2) NOT NULL,
+            add_position DECIMAL(12,2) NOT NULL,
+            atr_20 DECIMAL(12,4) NOT NULL,
+            donchian_high_20 DECIMAL(12,2) NOT NULL,
+            donchian_low_20 DECIMAL(12,2) NOT NULL,
+            is_active BOOLEAN DEFAULT TRUE,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_turtle_signals_stock_code ON turtle_signals (stock_code)",
+    "CREATE INDEX IF NOT EXISTS idx_turtle_signals_signal_date ON turtle_signals (signal_date)",
+    """
+        CREATE TABLE IF NOT EXISTS turtle_positions (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            stock_code VARCHAR(10) NOT NULL,
+            signal_id INT NOT NULL,
+            entry_date DATE NOT NULL,
+            entry_price DECIMAL(12,2) NOT NULL,
+            entry_atr DECIMAL(12,4) NOT NULL,
+            fixed_stop_loss DECIMAL(12,2) NOT NULL,
+            system_type TINYINT NOT NULL,
+            quantity INT DEFAULT 0,
+            current_trailing_stop DECIMAL(12,2) NULL,
+            current_add_position DECIMAL(12,2) NULL,
+            is_closed BOOLEAN DEFAULT FALSE,
+            exit_date DATE NULL,
+            exit_price DECIMAL(12,2) NULL,
+            exit_reason VARCHAR(20) NULL,
+            profit_loss DECIMAL(15,2) NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (signal_id) REFERENCES turtle_signals(id)
+        )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_turtle_positions_stock_code ON turtle_positions (stock_code)",
+    "CREATE INDEX IF NOT EXISTS idx_turtle_positions_is_closed ON turtle_positions (is_closed)",
+    """
+        CREATE TABLE IF NOT EXISTS turtle_position_summary (
+            id TINYINT PRIMARY KEY,
+            active_count INT NOT NULL DEFAULT 0,
+            total_count INT NOT NULL DEFAULT 0,
+            closed_count INT NOT NULL DEFAULT 0,
+            total_pnl DECIMAL(18,2) NOT NULL DEFAULT 0,
+            win_count INT NOT NULL DEFAULT 0,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """,
+]
+
+# 버전 2 (SQLite): (stock_code, date) PK + 정수 가격 (WITHOUT ROWID로 PK 순서 저장, 파티션 없음)
+SQLITE_DAILY_CANDLE_COMPACT = [
+    "DROP TABLE IF EXISTS daily_candle_new",
+    """
+        CREATE TABLE daily_candle_new (
+            stock_code VARCHAR(10) NOT NULL,
+            date DATE NOT NULL,
+            open_price INT UNSIGNED NOT NULL,
+            high_price INT UNSIGNED NOT NULL,
+            low_price INT UNSIGNED NOT NULL,
+            close_price INT UNSIGNED NOT NULL,
+            volume BIGINT UNSIGNED NOT NULL,
+            amount BIGINT UNSIGNED NOT NULL,
+            PRIMARY KEY (stock_code, date)
+        ) WITHOUT ROWID
+    """,
+    """
+        INSERT INTO daily_candle_new 
+        (stock_code, date, open_price, high_price, low_price, close_price, volume, amount)
+        SELECT stock_code, date, CAST(ROUND(open_price) AS INTEGER), CAST(ROUND(high_price) AS INTEGER),
+               CAST(ROUND(low_price) AS INTEGER), CAST(ROUND(close_price) AS INTEGER), volume, amount
+        FROM daily_candle
+    """,
+    "DROP TABLE daily_candle",
+    "ALTER TABLE daily_candle_new RENAME TO daily_candle",
+]
+
+# 버전 3 (SQLite): taken_at은 TIMESTAMP로 선언해 datetime으로 읽힘
+SQLITE_CONDITION_SNAPSHOT_TABLES = [
+    """
+        CREATE TABLE IF NOT EXISTS condition_snapshot (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            taken_at TIMESTAMP NOT NULL,
+            system1_count INT NOT NULL,
+            system2_count INT NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """,
+    """
+        CREATE TABLE IF NOT EXISTS condition_snapshot_item (
+            snapshot_id INT NOT NULL,
+            system_type TINYINT NOT NULL,
+            item_no SMALLINT UNSIGNED NOT NULL,
+            stock_code VARCHAR(10) NOT NULL,
+            stock_name VARCHAR(100) NULL,
+            current_price VARCHAR(20) NULL,
+            price_sign VARCHAR(2) NULL,
+            change_price VARCHAR(20) NULL,
+            change_rate VARCHAR(20) NULL,
+            volume VARCHAR(20) NULL,
+            open_price VARCHAR(20) NULL,
+            high_price VARCHAR(20) NULL,
+            low_price VARCHAR(20) NULL,
+            entry_date DATE NULL,
+            entry_price BIGINT NULL,
+            atr_20 BIGINT NULL,
+            stop_loss BIGINT NULL,
+            trailing_stop BIGINT NULL,
+            add_position BIGINT NULL,
+            position_id INT NULL,
+            PRIMARY KEY (snapshot_id, system_type, item_no),
+            FOREIGN KEY (snapshot_id) REFERENCES condition_snapshot(id)
+        ) WITHOUT ROWID
+    """,
+]
+
+SQLITE_MIGRATIONS: List[Migration] = [
+    Migration(1, 'initial schema', SQLITE_BASELINE),
+    Migration(2, 'compact partitioned daily_candle', SQLITE_DAILY_CANDLE_COMPACT),
+    Migration(3, 'condition search snapshots', SQLITE_CONDITION_SNAPSHOT_TABLES),
+]
+
+
+class MigrationRunner:
+    """버전 마이그레이션 실행기
+
+    적용된 버전은 schema_migrations에 기록하고, 아직 적용되지 않은 버전만 순서대로 실행한다.
+    MySQL DDL은 암묵적으로 커밋되므로 각 버전의 문장은 중간에 실패해도 다시 실행할 수 있게 작성한다.
+    백엔드마다 목록이 따로 있지만 버전 번호와 결과 스키마(테이블/컬럼/키)는 같다.
+    """
+
+    def __init__(self, backend=None, migrations: Optional[List[Migration]] = None):
+        """
+        :param backend: StorageBackend (None이면 설정된 백엔드)
+        :param migrations: 적용할 목록 (None이면 백엔드의 목록)
+        """
+        if backend is None:
+            from .backends import get_backend
+            backend = get_backend()
+        self.backend = backend
+        self.migrations = sorted(migrations or backend.migrations(), key=lambda m: m.version)
+        self.logger = logging.getLogger(__name__)
+
+    @staticmethod
+    def _ensure_version_table(cursor):
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS schema_migrations (
+                version INT PRIMARY KEY,
+                description VARCHAR(200) NOT NULL,
+                applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+
+    def applied_versions(self) -> Dict[int, str]:
+        """적용된 버전 {version: description}"""
+        conn = self.backend.get_connection()
+        cursor = conn.cursor()
+        
+        try:
+            self._ensure_version_table(cursor)
+            cursor.execute("SELECT version, description FROM schema_migrations ORDER BY version")
+            return {version: description for version, description in cursor.fetchall()}
+        finally:
+            cursor.close()
+            conn.close()
+
+    def current_version(self) -> int:
+        applied = self.applied_versions()
+        return max(applied) if applied else 0
+
+    def pending(self, target: Optional[int] = None) -> List[Migration]:
+        applied = self.applied_versions()
+        return [m for m in self.migrations
+                if m.version not in applied and (target is None or m.version <= target)]
+
+    def migrate(self, target: Optional[int] = None) -> List[int]:
+        """
+        미적용 버전 실행
+
+        :param target: 이 버전까지만 적용 (None이면 최신까지)
+        :return: 이번에 적용한 버전 목록
+        """
+        conn = self.backend.get_connection()
+        cursor = conn.cursor()
+        applied_now: List[int] = []
+        
+        try:
+            self.backend.acquire_migration_lock(cursor)
+            
+            self._ensure_version_table(cursor)
+            cursor.execute("SELECT version FROM schema_migrations")
+            applied = {row[0] for row in cursor.fetchall()}
+            
+            for migration in self.migrations:
+                if migration.version in applied or (target is not None and migration.version > target):
+                    continue
+                self.logger.info(f"마이그레이션 {migration.version} 적용 시작: {migration.description}")
+                for statement in migration.statements:
+                    cursor.execute(statement)
+                cursor.execute(
+                    "INSERT INTO schema_migrations (version, description) VALUES (%s, %s)",
+                    (migration.version, migration.description)
+                )
+                conn.commit()
+                applied_now.append(migration.version)
+                self.logger.info(f"마이그레이션 {migration.version} 적용 완료")
+            
+            if not applied_now:
+                self.logger.info("적용할 마이그레이션 없음")
+            return applied_now
+            
+        except Exception as e:
+            self.logger.error(f"마이그레이션 실패 (적용 완료: {applied_now}): {e}")
+            conn.rollback()
+            raise
+        finally:
+            try:
+                self.backend.release_migration_lock(cursor)
+            except Exception:
+                pass
+            cursor.close()
+            conn.close()
+
+
+def main():
+    """스키마 마이그레이션 CLI (python -m database.migrations)"""
+    parser = argparse.ArgumentParser(description='DB 스키마 마이그레이션')
+    parser.add_argument('--target', type=int, default=None, help='이 버전까지만 적용')
+    parser.add_argument('--status', action='store_true', help='적용/미적용 버전만 출력')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s [%(levelname)s] %(name)s - %(message)s')
+    runner = MigrationRunner()
+    if args.status:
+        applied = runner.applied_versions()
+        for migration in runner.migrations:
+            mark = '적용' if migration.version in applied else '대기'
+            logger.info(f"[{mark}] {migration.version}: {migration.description}")
+        return
+    runner.migrate(args.target)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,7 +1,13 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field, fields
 from datetime import date, datetime
 from decimal import Decimal
-from typing import Optional
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# 고정소수점 스케일 (가격: 소수 2자리, ATR: 소수 4자리)
+PRICE_SCALE = 100
+ATR_SCALE = 10000
 
 @dataclass
 class StockInfo:
@@ -16,16 +22,15 @@ class StockInfo:
 
 @dataclass
 class DailyCandle:
-    """일봉 데이터"""
+    """일봉 데이터 (가격은 원 단위 정수, PK: stock_code + date)"""
     stock_code: str
     date: date
-    open_price: Decimal
-    high_price: Decimal
-    low_price: Decimal
-    close_price: Decimal
+    open_price: int
+    high_price: int
+    low_price: int
+    close_price: int
     volume: int
     amount: int
-    created_at: Optional[datetime] = None
 
 @dataclass
 class TurtleSignal:
@@ -47,8 +52,78 @@ class TurtleSignal:
     updated_at: Optional[datetime] = None
 
 @dataclass
+class TurtleSignalBatch:
+    """터틀 신호 배치 (컬럼형, 가격은 고정소수점 정수)
+
+    가격 컬럼은 값 * PRICE_SCALE, atr_20은 값 * ATR_SCALE 인 int64 배열이다.
+    signal_type은 +1(BUY) / -1(SELL).
+    """
+    signal_date: date
+    stock_code: np.ndarray        # object
+    system_type: np.ndarray       # int8
+    signal_type: np.ndarray       # int8 (+1: BUY, -1: SELL)
+    entry_price: np.ndarray       # int64
+    stop_loss: np.ndarray         # int64
+    take_profit: np.ndarray       # int64
+    add_position: np.ndarray      # int64
+    atr_20: np.ndarray            # int64
+    donchian_high_20: np.ndarray  # int64
+    donchian_low_20: np.ndarray   # int64
+
+    PRICE_COLUMNS = ('entry_price', 'stop_loss', 'take_profit', 'add_position',
+                     'donchian_high_20', 'donchian_low_20')
+
+    def __len__(self) -> int:
+        return len(self.stock_code)
+
+    @classmethod
+    def empty(cls, signal_date: date) -> 'TurtleSignalBatch':
+        ints = np.empty(0, dtype=np.int64)
+        return cls(signal_date, np.empty(0, dtype=object), np.empty(0, dtype=np.int8),
+                   np.empty(0, dtype=np.int8), ints, ints, ints, ints, ints, ints, ints)
+
+    @classmethod
+    def concat(cls, batches: Sequence['TurtleSignalBatch']) -> 'TurtleSignalBatch':
+        """같은 신호일의 배치 합치기"""
+        columns = {name: np.concatenate([getattr(b, name) for b in batches])
+                   for name in cls.__dataclass_fields__ if name != 'signal_date'}
+        return cls(signal_date=batches[0].signal_date, **columns)
+
+    def to_rows(self) -> List[Tuple]:
+        """turtle_signals INSERT용 튜플 (고정소수점 정수 그대로, SQL에서 스케일 복원)"""
+        signal_types = np.where(self.signal_type > 0, 'BUY', 'SELL')
+        return list(zip(
+            self.stock_code.tolist(),
+            [self.signal_date] * len(self),
+            self.system_type.tolist(),
+            signal_types.tolist(),
+            *(getattr(self, name).tolist() for name in ('entry_price', 'stop_loss', 'take_profit',
+                                                        'add_position', 'atr_20', 'donchian_high_20',
+                                                        'donchian_low_20'))
+        ))
+
+    def to_signals(self) -> List[TurtleSignal]:
+        """API 경계용 TurtleSignal 리스트 (Decimal 변환은 여기서만)"""
+        signals = []
+        for i in range(len(self)):
+            prices = {name: Decimal(int(getattr(self, name)[i])).scaleb(-2) for name in self.PRICE_COLUMNS}
+            signals.append(TurtleSignal(
+                stock_code=self.stock_code[i],
+                signal_date=self.signal_date,
+                system_type=int(self.system_type[i]),
+                signal_type='BUY' if self.signal_type[i] > 0 else 'SELL',
+                atr_20=Decimal(int(self.atr_20[i])).scaleb(-4),
+                **prices
+            ))
+        return signals
+
+
+@dataclass(slots=True)
 class TurtlePosition:
-    """터틀 포지션 (실제 진입한 포지션)"""
+    """터틀 포지션 (실제 진입한 포지션, 슬롯 - 인스턴스 __dict__ 없음)
+
+    필드 순서는 turtle_positions 조회 컬럼 순서(POSITION_COLUMNS)와 같아 튜플 행으로 바로 생성한다.
+    """
     stock_code: str
     signal_id: int
     entry_date: date
@@ -66,4 +141,72 @@ class TurtlePosition:
     profit_loss: Optional[Decimal] = None
     id: Optional[int] = None
     created_at: Optional[datetime] = None
-    updated_at: Optional[datetime] = None 
\ No newline at end of file
+    updated_at: Optional[datetime] = None
+
+
+# turtle_positions 조회 컬럼 (TurtlePosition 필드 순서) - TurtlePosition(*row)
+POSITION_COLUMNS = ', '.join(item.name for item in fields(TurtlePosition))
+
+# PositionFrame 가격 컬럼의 NULL (가격은 음수가 될 수 없음)
+MISSING_PRICE = -1
+
+
+@dataclass
+class PositionFrame:
+    """포지션 묶음 (컬럼형, 일괄 소비용 - 가격은 고정소수점 정수)
+
+    가격 컬럼은 값 * PRICE_SCALE, entry_atr는 값 * ATR_SCALE 인 int64 배열이고 NULL은 MISSING_PRICE.
+    entry_date는 datetime64[D], 행 순서는 조회 순서.
+    """
+    id: np.ndarray                     # int64
+    stock_code: np.ndarray             # object
+    system_type: np.ndarray            # int8
+    entry_date: np.ndarray             # datetime64[D]
+    quantity: np.ndarray               # int64
+    entry_price: np.ndarray            # int64
+    entry_atr: np.ndarray              # int64 (ATR_SCALE)
+    fixed_stop_loss: np.ndarray        # int64
+    current_trailing_stop: np.ndarray  # int64
+    current_add_position: np.ndarray   # int64
+    is_closed: np.ndarray              # bool
+
+    # 조회 컬럼 -> (배열 필드, dtype)
+    COLUMNS = (
+        ('id', np.int64),
+        ('stock_code', object),
+        ('system_type', np.int8),
+        ('entry_date', 'datetime64[D]'),
+        ('quantity', np.int64),
+        ('entry_price', np.int64),
+        ('entry_atr', np.int64),
+        ('fixed_stop_loss', np.int64),
+        ('current_trailing_stop', np.int64),
+        ('current_add_position', np.int64),
+        ('is_closed', bool),
+    )
+
+    def __len__(self) -> int:
+        return len(self.id)
+
+    @classmethod
+    def from_rows(cls, rows: Sequence[Tuple]) -> 'PositionFrame':
+        """COLUMNS 순서의 튜플 행 -> 컬럼 배열 (행 객체를 만들지 않음)"""
+        columns = list(zip(*rows)) if rows else [()] * len(cls.COLUMNS)
+        return cls(**{name: np.array(values, dtype=dtype)
+                      for (name, dtype), values in zip(cls.COLUMNS, columns)})
+
+    def price(self, name: str) -> np.ndarray:
+        """가격 컬럼을 float로 (NULL은 NaN)"""
+        scale = ATR_SCALE if name == 'entry_atr' else PRICE_SCALE
+        values = getattr(self, name)
+        return np.where(values == MISSING_PRICE, np.nan, values / scale)
+
+
+@dataclass
+class ConditionSnapshot:
+    """조건검색 결과 스냅샷 (한 번의 실행, 시스템별 터틀 데이터가 추가된 종목 목록)"""
+    id: int
+    taken_at: datetime  # 실행 시각 (KST, tz 없음)
+    system1: List[Dict] = field(default_factory=list)
+    system2: List[Dict] = field(default_factory=list)
+
@@ -1,21 +1,99 @@
 import logging
-from typing import List, Optional, Dict
+import threading
+import time
+from itertools import starmap
+from typing import Iterable, List, Optional, Dict, Tuple
 from datetime import date
 from decimal import Decimal
 
-from .connection import DatabaseConnection
-from .models import TurtlePosition
+from config import Config
+from .backends import StorageBackend, get_backend
+from .models import (TurtlePosition, PositionFrame, POSITION_COLUMNS, MISSING_PRICE,
+                     PRICE_SCALE, ATR_SCALE)
+
+# IN 목록 한 번에 넣을 종목 수
+LOOKUP_CHUNK_SIZE = 1000
+
+# turtle_position_summary (단일 행) 전체 재집계 - 집계 행이 없을 때/수동 복구용
+SUMMARY_REBUILD_QUERY = """
+    REPLACE INTO turtle_position_summary 
+    (id, active_count, total_count, closed_count, total_pnl, win_count)
+    SELECT 
+        1,
+        COALESCE(SUM(CASE WHEN is_closed = FALSE THEN 1 ELSE 0 END), 0),
+        COUNT(*),
+        COALESCE(SUM(CASE WHEN is_closed = TRUE AND profit_loss IS NOT NULL THEN 1 ELSE 0 END), 0),
+        COALESCE(SUM(CASE WHEN is_closed = TRUE THEN profit_loss END), 0),
+        COALESCE(SUM(CASE WHEN is_closed = TRUE AND profit_loss > 0 THEN 1 ELSE 0 END), 0)
+    FROM turtle_positions
+"""
+
+# 포지션 요약 프로세스 캐시 (이 프로세스의 쓰기 시 무효화, 다른 프로세스 쓰기는 TTL로 반영)
+_summary_cache: Dict = {'value': None, 'loaded_at': 0.0}
+_summary_lock = threading.Lock()
+
+
+def _invalidate_summary():
+    with _summary_lock:
+        _summary_cache['value'] = None
+
+
+def _summary_from_row(row: Dict) -> Dict:
+    closed_count = row['closed_count'] or 0
+    total_pnl = float(row['total_pnl'] or 0)
+    win_count = row['win_count'] or 0
+    return {
+        'active_positions': row['active_count'] or 0,
+        'total_positions': row['total_count'] or 0,
+        'closed_positions': closed_count,
+        'total_pnl': total_pnl,
+        'avg_pnl': total_pnl / closed_count if closed_count else 0.0,
+        'win_count': win_count,
+        'win_rate': win_count / max(closed_count, 1) * 100
+    }
+
+
+def _scaled(column: str, scale: int) -> str:
+    """DECIMAL 컬럼 -> 고정소수점 정수 SQL 식 (NULL은 MISSING_PRICE)"""
+    return f"COALESCE(CAST(ROUND({column} * {scale}) AS SIGNED), {MISSING_PRICE})"
+
+
+# PositionFrame.COLUMNS 순서의 조회 식 (스케일 변환은 DB에서)
+POSITION_FRAME_COLUMNS = ', '.join([
+    'id', 'stock_code', 'system_type', 'entry_date', 'quantity',
+    _scaled('entry_price', PRICE_SCALE),
+    _scaled('entry_atr', ATR_SCALE),
+    _scaled('fixed_stop_loss', PRICE_SCALE),
+    _scaled('current_trailing_stop', PRICE_SCALE),
+    _scaled('current_add_position', PRICE_SCALE),
+    'is_closed',
+])
+
 
 class PositionDAO:
     """터틀 포지션 관리 DAO"""
     
-    def __init__(self):
-        self.db_conn = DatabaseConnection()
+    def __init__(self, backend: Optional[StorageBackend] = None):
+        self.backend = backend or get_backend()
         self.logger = logging.getLogger(__name__)
     
+    @staticmethod
+    def _apply_summary_delta(cursor, active: int = 0, total: int = 0, closed: int = 0,
+                             pnl: Decimal = Decimal(0), wins: int = 0):
+        """요약 집계 행 증감 (호출한 쪽 트랜잭션 안에서, 집계 행이 없으면 전체 재집계)"""
+        cursor.execute("""
+            UPDATE turtle_position_summary 
+            SET active_count = active_count + %s, total_count = total_count + %s,
+                closed_count = closed_count + %s, total_pnl = total_pnl + %s, win_count = win_count + %s
+            WHERE id = 1
+        """, (active, total, closed, pnl, wins))
+        if cursor.rowcount == 0:
+            # 같은 트랜잭션이므로 방금 쓴 포지션까지 반영됨
+            cursor.execute(SUMMARY_REBUILD_QUERY)
+    
     def create_position(self, position: TurtlePosition) -> int:
         """새 포지션 생성"""
-        conn = self.db_conn.get_connection()
+        conn = self.backend.get_connection()
         cursor = conn.cursor()
         
         query = """
@@ -38,8 +116,10 @@ class PositionDAO:
                 position.current_trailing_stop,
                 position.current_add_position
             ))
-            conn.commit()
             position_id = cursor.lastrowid
+            self._apply_summary_delta(cursor, active=1, total=1)
+            conn.commit()
+            _invalidate_summary()
             self.logger.info(f"포지션 생성: {position.stock_code} (ID: {position_id})")
             return position_id
             
@@ -53,44 +133,19 @@ class PositionDAO:
     
     def get_active_positions(self) -> List[TurtlePosition]:
         """활성 포지션 조회"""
-        conn = self.db_conn.get_connection()
-        cursor = conn.cursor(dictionary=True)
+        conn = self.backend.get_connection(read_only=True)
+        cursor = conn.cursor()
         
-        query = """
-            SELECT * FROM turtle_positions 
+        query = f"""
+            SELECT {POSITION_COLUMNS} FROM turtle_positions 
             WHERE is_closed = FALSE 
             ORDER BY entry_date DESC, stock_code
         """
         
         try:
             cursor.execute(query)
-            rows = cursor.fetchall()
-            
-            positions = []
-            for row in rows:
-                position = TurtlePosition(
-                    id=row['id'],
-                    stock_code=row['stock_code'],
-                    signal_id=row['signal_id'],
-                    entry_date=row['entry_date'],
-                    entry_price=row['entry_price'],
-                    entry_atr=row['entry_atr'],
-                    fixed_stop_loss=row['fixed_stop_loss'],
-                    system_type=row['system_type'],
-                    quantity=row['quantity'],
-                    current_trailing_stop=row['current_trailing_stop'],
-                    current_add_position=row['current_add_position'],
-                    is_closed=row['is_closed'],
-                    exit_date=row['exit_date'],
-                    exit_price=row['exit_price'],
-                    exit_reason=row['exit_reason'],
-                    profit_loss=row['profit_loss'],
-                    created_at=row['created_at'],
-                    updated_at=row['updated_at']
-                )
-                positions.append(position)
-            
-            return positions
+            # 튜플 행을 필드 순서 그대로 생성 (행마다 dict를 만들지 않음)
+            return list(starmap(TurtlePosition, cursor.fetchall()))
             
         except Exception as e:
             self.logger.error(f"활성 포지션 조회 실패: {e}")
@@ -101,11 +156,11 @@ class PositionDAO:
     
     def get_position_by_stock(self, stock_code: str) -> Optional[TurtlePosition]:
         """종목별 활성 포지션 조회"""
-        conn = self.db_conn.get_connection()
-        cursor = conn.cursor(dictionary=True)
+        conn = self.backend.get_connection(read_only=True)
+        cursor = conn.cursor()
         
-        query = """
-            SELECT * FROM turtle_positions 
+        query = f"""
+            SELECT {POSITION_COLUMNS} FROM turtle_positions 
             WHERE stock_code = %s AND is_closed = FALSE 
             ORDER BY entry_date DESC 
             LIMIT 1
@@ -118,26 +173,7 @@ class PositionDAO:
             if not row:
                 return None
             
-            return TurtlePosition(
-                id=row['id'],
-                stock_code=row['stock_code'],
-                signal_id=row['signal_id'],
-                entry_date=row['entry_date'],
-                entry_price=row['entry_price'],
-                entry_atr=row['entry_atr'],
-                fixed_stop_loss=row['fixed_stop_loss'],
-                system_type=row['system_type'],
-                quantity=row['quantity'],
-                current_trailing_stop=row['current_trailing_stop'],
-                current_add_position=row['current_add_position'],
-                is_closed=row['is_closed'],
-                exit_date=row['exit_date'],
-                exit_price=row['exit_price'],
-                exit_reason=row['exit_reason'],
-                profit_loss=row['profit_loss'],
-                created_at=row['created_at'],
-                updated_at=row['updated_at']
-            )
+            return TurtlePosition(*row)
             
         except Exception as e:
             self.logger.error(f"종목별 포지션 조회 실패 ({stock_code}): {e}")
@@ -146,9 +182,96 @@ class PositionDAO:
             cursor.close()
             conn.close()
     
+    def get_active_positions_by_stock(self, stock_codes: Optional[Iterable[str]] = None) -> Dict[str, TurtlePosition]:
+        """
+        종목별 활성 포지션 일괄 조회 (종목당 최근 진입 1개, get_position_by_stock 대체용)
+
+        :param stock_codes: 조회할 종목 (None이면 전체 활성 포지션)
+        :return: {종목코드: 포지션} - 포지션 없는 종목은 키 없음
+        """
+        if stock_codes is None:
+            chunks = [None]
+        else:
+            codes = list(dict.fromkeys(code for code in stock_codes if code))
+            if not codes:
+                return {}
+            chunks = [codes[i:i + LOOKUP_CHUNK_SIZE] for i in range(0, len(codes), LOOKUP_CHUNK_SIZE)]
+        
+        conn = self.backend.get_connection(read_only=True)
+        cursor = conn.cursor()
+        
+        try:
+            positions: Dict[str, TurtlePosition] = {}
+            for chunk in chunks:
+                where = "is_closed = FALSE"
+                if chunk is not None:
+                    where += f" AND stock_code IN ({', '.join(['%s'] * len(chunk))})"
+                # 종목별 최근 진입이 먼저 오도록 정렬 -> 처음 나온 행만 사용
+                cursor.execute(f"""
+                    SELECT {POSITION_COLUMNS} FROM turtle_positions 
+                    WHERE {where}
+                    ORDER BY stock_code, entry_date DESC, id DESC
+                """, tuple(chunk or ()))
+                for row in cursor.fetchall():
+                    if row[0] not in positions:  # row[0]: stock_code
+                        positions[row[0]] = TurtlePosition(*row)
+            
+            self.logger.info(f"활성 포지션 일괄 조회: {len(positions)}개")
+            return positions
+            
+        except Exception as e:
+            self.logger.error(f"활성 포지션 일괄 조회 실패: {e}")
+            return {}
+        finally:
+            cursor.close()
+            conn.close()
+    
+    def get_positions_frame(self, stock_codes: Optional[Iterable[str]] = None,
+                            include_closed: bool = False) -> PositionFrame:
+        """
+        포지션 컬럼형 조회 (일괄 소비용 - 행 객체/Decimal 없이 고정소수점 배열)
+
+        :param stock_codes: 조회할 종목 (None이면 전체)
+        :param include_closed: 청산된 포지션 포함
+        :return: PositionFrame (종목코드, 진입일 DESC, ID DESC 순)
+        """
+        if stock_codes is None:
+            chunks = [None]
+        else:
+            codes = list(dict.fromkeys(code for code in stock_codes if code))
+            if not codes:
+                return PositionFrame.from_rows([])
+            chunks = [codes[i:i + LOOKUP_CHUNK_SIZE] for i in range(0, len(codes), LOOKUP_CHUNK_SIZE)]
+        
+        conn = self.backend.get_connection(read_only=True)
+        cursor = conn.cursor()
+        
+        try:
+            rows: List[Tuple] = []
+            for chunk in chunks:
+                conditions = [] if include_closed else ["is_closed = FALSE"]
+                if chunk is not None:
+                    conditions.append(f"stock_code IN ({', '.join(['%s'] * len(chunk))})")
+                where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+                cursor.execute(f"""
+                    SELECT {POSITION_FRAME_COLUMNS} FROM turtle_positions 
+                    {where}
+                    ORDER BY stock_code, entry_date DESC, id DESC
+                """, tuple(chunk or ()))
+                rows.extend(cursor.fetchall())
+            
+            return PositionFrame.from_rows(rows)
+            
+        except Exception as e:
+            self.logger.error(f"포지션 컬럼형 조회 실패: {e}")
+            return PositionFrame.from_rows([])
+        finally:
+            cursor.close()
+            conn.close()
+    
     def update_trailing_stop(self, position_id: int, trailing_stop: Decimal, add_position: Decimal) -> bool:
         """트레일링 스탑 및 추가매수가 업데이트"""
-        conn = self.db_conn.get_connection()
+        conn = self.backend.get_connection()
         cursor = conn.cursor()
         
         query = """
@@ -176,10 +299,68 @@ class PositionDAO:
             cursor.close()
             conn.close()
     
+    def update_trailing_stops(self, updates: Iterable[Tuple[int, Decimal, Decimal]]) -> List[int]:
+        """
+        트레일링 스탑 및 추가매수가 일괄 업데이트 (한 트랜잭션, 청크당 다중 행 UPDATE 1개)
+
+        :param updates: (position_id, trailing_stop, add_position) 튜플 (같은 ID는 마지막 값 사용)
+        :return: 활성 포지션이 없어 반영되지 않은 position_id 목록
+        """
+        latest = {position_id: (trailing_stop, add_position)
+                  for position_id, trailing_stop, add_position in updates}
+        if not latest:
+            return []
+        
+        ids = list(latest)
+        chunks = [ids[i:i + LOOKUP_CHUNK_SIZE] for i in range(0, len(ids), LOOKUP_CHUNK_SIZE)]
+        
+        conn = self.backend.get_connection()
+        cursor = conn.cursor()
+        
+        try:
+            matched = set()
+            for chunk in chunks:
+                placeholders = ', '.join(['%s'] * len(chunk))
+                # 영향 행 수는 값이 바뀐 행만 세므로 대상 행을 먼저 잠그고 확인 (SQLite는 쓰기 잠금이 DB 단위)
+                cursor.execute(f"""
+                    SELECT id FROM turtle_positions 
+                    WHERE id IN ({placeholders}) AND is_closed = FALSE 
+                    {self.backend.for_update}
+                """, tuple(chunk))
+                chunk_matched = [row[0] for row in cursor.fetchall()]
+                if not chunk_matched:
+                    continue
+                matched.update(chunk_matched)
+                
+                cases = ' '.join(['WHEN %s THEN %s'] * len(chunk_matched))
+                trailing_params = [v for pid in chunk_matched for v in (pid, latest[pid][0])]
+                add_params = [v for pid in chunk_matched for v in (pid, latest[pid][1])]
+                cursor.execute(f"""
+                    UPDATE turtle_positions 
+                    SET current_trailing_stop = CASE id {cases} END,
+                        current_add_position = CASE id {cases} END
+                    WHERE id IN ({', '.join(['%s'] * len(chunk_matched))}) AND is_closed = FALSE
+                """, tuple(trailing_params + add_params + chunk_matched))
+            conn.commit()
+            
+            unmatched = [position_id for position_id in ids if position_id not in matched]
+            self.logger.info(f"트레일링 스탑 일괄 업데이트: {len(matched)}개")
+            if unmatched:
+                self.logger.warning(f"트레일링 스탑 일괄 업데이트 대상 없음: 포지션 ID {unmatched}")
+            return unmatched
+            
+        except Exception as e:
+            self.logger.error(f"트레일링 스탑 일괄 업데이트 실패: {e}")
+            conn.rollback()
+            raise
+        finally:
+            cursor.close()
+            conn.close()
+    
     def close_position(self, position_id: int, exit_date: date, exit_price: Decimal, 
                       exit_reason: str, profit_loss: Decimal) -> bool:
         """포지션 종료"""
-        conn = self.db_conn.get_connection()
+        conn = self.backend.get_connection()
         cursor = conn.cursor()
         
         query = """
@@ -191,12 +372,22 @@ class PositionDAO:
         
         try:
             cursor.execute(query, (exit_date, exit_price, exit_reason, profit_loss, position_id))
-            conn.commit()
             
             if cursor.rowcount > 0:
+                has_pnl = profit_loss is not None
+                self._apply_summary_delta(
+                    cursor,
+                    active=-1,
+                    closed=1 if has_pnl else 0,
+                    pnl=profit_loss if has_pnl else Decimal(0),
+                    wins=1 if has_pnl and profit_loss > 0 else 0
+                )
+                conn.commit()
+                _invalidate_summary()
                 self.logger.info(f"포지션 종료: ID {position_id}, 종료사유: {exit_reason}, 손익: {profit_loss}")
                 return True
             else:
+                conn.commit()
                 self.logger.warning(f"포지션 종료 실패: 포지션 ID {position_id} 없음")
                 return False
                 
@@ -209,44 +400,52 @@ class PositionDAO:
             conn.close()
     
     def get_positions_summary(self) -> Dict:
-        """포지션 요약 통계"""
-        conn = self.db_conn.get_connection()
+        """포지션 요약 통계 (집계 행 1개 조회, 프로세스 캐시 우선)"""
+        with _summary_lock:
+            cached = _summary_cache['value']
+            if cached is not None and time.monotonic() - _summary_cache['loaded_at'] < Config.POSITION_SUMMARY_CACHE_TTL:
+                return dict(cached)
+        
+        conn = self.backend.get_connection(read_only=True)
         cursor = conn.cursor(dictionary=True)
         
         try:
-            # 활성 포지션 수
-            cursor.execute("SELECT COUNT(*) as active_count FROM turtle_positions WHERE is_closed = FALSE")
-            active_count = cursor.fetchone()['active_count']
-            
-            # 총 포지션 수
-            cursor.execute("SELECT COUNT(*) as total_count FROM turtle_positions")
-            total_count = cursor.fetchone()['total_count']
-            
-            # 수익 통계
-            cursor.execute("""
-                SELECT 
-                    COUNT(*) as closed_count,
-                    SUM(profit_loss) as total_pnl,
-                    AVG(profit_loss) as avg_pnl,
-                    SUM(CASE WHEN profit_loss > 0 THEN 1 ELSE 0 END) as win_count
-                FROM turtle_positions 
-                WHERE is_closed = TRUE AND profit_loss IS NOT NULL
-            """)
-            pnl_stats = cursor.fetchone()
-            
-            return {
-                'active_positions': active_count,
-                'total_positions': total_count,
-                'closed_positions': pnl_stats['closed_count'] or 0,
-                'total_pnl': float(pnl_stats['total_pnl'] or 0),
-                'avg_pnl': float(pnl_stats['avg_pnl'] or 0),
-                'win_count': pnl_stats['win_count'] or 0,
-                'win_rate': (pnl_stats['win_count'] or 0) / max(pnl_stats['closed_count'] or 1, 1) * 100
-            }
-            
+            cursor.execute("SELECT * FROM turtle_position_summary WHERE id = 1")
+            row = cursor.fetchone()
         except Exception as e:
             self.logger.error(f"포지션 요약 조회 실패: {e}")
             return {}
         finally:
             cursor.close()
-            conn.close() 
\ No newline at end of file
+            conn.close()
+        
+        if not row:
+            return self.rebuild_summary()
+        
+        summary = _summary_from_row(row)
+        with _summary_lock:
+            _summary_cache['value'] = summary
+            _summary_cache['loaded_at'] = time.monotonic()
+        return dict(summary)
+    
+    def rebuild_summary(self) -> Dict:
+        """포지션 요약 집계 행을 turtle_positions 전체에서 다시 계산 (최초 생성/수동 수정 후 복구용)"""
+        conn = self.backend.get_connection()
+        cursor = conn.cursor(dictionary=True)
+        
+        try:
+            cursor.execute(SUMMARY_REBUILD_QUERY)
+            cursor.execute("SELECT * FROM turtle_position_summary WHERE id = 1")
+            row = cursor.fetchone()
+            conn.commit()
+            _invalidate_summary()
+            self.logger.info("포지션 요약 재집계 완료")
+            return _summary_from_row(row)
+            
+        except Exception as e:
+            self.logger.error(f"포지션 요약 재집계 실패: {e}")
+            conn.rollback()
+            return {}
+        finally:
+            cursor.close()
+            conn.close()
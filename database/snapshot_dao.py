@@ -0,0 +1,183 @@
+import logging
+from datetime import date, datetime
+from typing import Dict, List, Optional, Tuple
+
+from .backends import StorageBackend, get_backend
+from .models import ConditionSnapshot, PRICE_SCALE, ATR_SCALE
+
+# 종목 딕셔너리 키 -> condition_snapshot_item 컬럼 (키움 시세, 받은 문자열 그대로)
+QUOTE_FIELDS = (
+    ('name', 'stock_name'),
+    ('current', 'current_price'),
+    ('sign', 'price_sign'),
+    ('change', 'change_price'),
+    ('rate', 'change_rate'),
+    ('volume', 'volume'),
+    ('open', 'open_price'),
+    ('high', 'high_price'),
+    ('low', 'low_price'),
+)
+
+# 터틀 가격 키 -> 고정소수점 스케일 (컬럼명 같음)
+LEVEL_FIELDS = (
+    ('stop_loss', PRICE_SCALE),
+    ('trailing_stop', PRICE_SCALE),
+    ('add_position', PRICE_SCALE),
+    ('atr_20', ATR_SCALE),
+    ('entry_price', PRICE_SCALE),
+)
+
+ITEM_COLUMNS = ', '.join(
+    ['snapshot_id', 'system_type', 'item_no', 'stock_code']
+    + [column for _, column in QUOTE_FIELDS]
+    + [name for name, _ in LEVEL_FIELDS]
+    + ['entry_date', 'position_id']
+)
+
+# 결과 키('1', '2') -> system_type
+SYSTEMS = (('1', 1), ('2', 2))
+
+
+def _to_fixed(value, scale: int) -> Optional[int]:
+    """가격 -> 고정소수점 정수 (없거나 숫자가 아니면 None)"""
+    if value is None:
+        return None
+    try:
+        return int(round(float(value) * scale))
+    except (TypeError, ValueError):
+        return None
+
+
+def _to_date(value) -> Optional[date]:
+    if isinstance(value, date):
+        return value
+    try:
+        return date.fromisoformat(value) if value else None
+    except (TypeError, ValueError):
+        return None
+
+
+def _item_row(snapshot_id: int, system_type: int, item_no: int, stock: Dict) -> Tuple:
+    quotes = [stock.get(key) for key, _ in QUOTE_FIELDS]
+    levels = [_to_fixed(stock.get(key), scale) for key, scale in LEVEL_FIELDS]
+    position_id = stock.get('position_id')
+    return (
+        snapshot_id, system_type, item_no, stock.get('code', ''),
+        *[str(value) if value is not None else None for value in quotes],
+        *levels,
+        _to_date(stock.get('entry_date')),
+        int(position_id) if position_id is not None else None,
+    )
+
+
+def _item_stock(row: Tuple) -> Dict:
+    """조회 행 (system_type부터) -> 스케줄러가 만든 것과 같은 키의 종목 딕셔너리"""
+    stock = {'code': row[2]}
+    offset = 3
+    for key, _ in QUOTE_FIELDS:
+        stock[key] = row[offset]
+        offset += 1
+    for key, scale in LEVEL_FIELDS:
+        stock[key] = row[offset] / scale if row[offset] is not None else None
+        offset += 1
+    entry_date = row[offset]
+    stock['entry_date'] = entry_date.strftime('%Y-%m-%d') if entry_date else None
+    stock['position_id'] = row[offset + 1]
+    return stock
+
+
+class ConditionSnapshotDAO:
+    """조건검색 결과 스냅샷 DAO (저장한 스냅샷은 수정하지 않음)"""
+
+    def __init__(self, backend: Optional[StorageBackend] = None):
+        self.backend = backend or get_backend()
+        self.logger = logging.getLogger(__name__)
+
+    def save_snapshot(self, taken_at: datetime, results: Dict[str, List[Dict]]) -> int:
+        """
+        시스템별 결과를 새 스냅샷으로 저장 (헤더 + 종목 행, 한 트랜잭션)
+
+        :param taken_at: 조건검색 실행 시각 (KST)
+        :param results: {'1': System 1 종목들, '2': System 2 종목들}
+        :return: 스냅샷 ID
+        """
+        conn = self.backend.get_connection()
+        cursor = conn.cursor()
+
+        try:
+            cursor.execute("""
+                INSERT INTO condition_snapshot (taken_at, system1_count, system2_count)
+                VALUES (%s, %s, %s)
+            """, (taken_at.replace(tzinfo=None), len(results.get('1', [])), len(results.get('2', []))))
+            snapshot_id = cursor.lastrowid
+
+            rows = [
+                _item_row(snapshot_id, system_type, item_no, stock)
+                for key, system_type in SYSTEMS
+                for item_no, stock in enumerate(results.get(key, []))
+            ]
+            if rows:
+                cursor.executemany(
+                    f"INSERT INTO condition_snapshot_item ({ITEM_COLUMNS}) "
+                    f"VALUES ({', '.join(['%s'] * len(rows[0]))})",
+                    rows
+                )
+            conn.commit()
+            self.logger.info(f"조건검색 스냅샷 저장: ID {snapshot_id} ({len(rows)}개 종목)")
+            return snapshot_id
+
+        except Exception as e:
+            self.logger.error(f"조건검색 스냅샷 저장 실패: {e}")
+            conn.rollback()
+            raise
+        finally:
+            cursor.close()
+            conn.close()
+
+    def get_latest_snapshot_id(self) -> Optional[int]:
+        """가장 최근 스냅샷 ID (없으면 None)"""
+        conn = self.backend.get_connection(read_only=True)
+        cursor = conn.cursor()
+
+        try:
+            cursor.execute("SELECT MAX(id) FROM condition_snapshot")
+            row = cursor.fetchone()
+            return row[0] if row else None
+        finally:
+            cursor.close()
+            conn.close()
+
+    def get_snapshot(self, snapshot_id: Optional[int] = None) -> Optional[ConditionSnapshot]:
+        """
+        스냅샷 조회
+
+        :param snapshot_id: 조회할 ID (None이면 가장 최근)
+        """
+        conn = self.backend.get_connection(read_only=True)
+        cursor = conn.cursor()
+
+        try:
+            if snapshot_id is None:
+                cursor.execute("SELECT id, taken_at FROM condition_snapshot ORDER BY id DESC LIMIT 1")
+            else:
+                cursor.execute("SELECT id, taken_at FROM condition_snapshot WHERE id = %s", (snapshot_id,))
+            header = cursor.fetchone()
+            if not header:
+                return None
+
+            snapshot = ConditionSnapshot(id=header[0], taken_at=header[1])
+            systems = {1: snapshot.system1, 2: snapshot.system2}
+            # PK (snapshot_id, system_type, item_no) 순서 그대로 범위 스캔
+            cursor.execute(f"""
+                SELECT {ITEM_COLUMNS.replace('snapshot_id, ', '', 1)} FROM condition_snapshot_item
+                WHERE snapshot_id = %s
+                ORDER BY system_type, item_no
+            """, (snapshot.id,))
+            for row in cursor.fetchall():
+                if row[0] in systems:
+                    systems[row[0]].append(_item_stock(row))
+            return snapshot
+
+        finally:
+            cursor.close()
+            conn.close()
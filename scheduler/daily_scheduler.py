@@ -4,16 +4,25 @@ import asyncio
 import threading
 import logging
 from datetime import datetime, date
-from typing import List, Dict, Optional
+from typing import Callable, List, Dict, Optional, Tuple
 from decimal import Decimal
+import numpy as np
+import pandas as pd
 try:
     from zoneinfo import ZoneInfo
 except ImportError:
     from backports.zoneinfo import ZoneInfo
 from services.kiwoom_service import KiwoomAPIService
+from services.kiwoom_ws import KiwoomWebSocketSession
+from services.condition_stream import ConditionStream
 from services.turtle_calculator import TurtleCalculator
+from services.turtle_state import IndicatorStateStore, MIN_BARS
+from services.candle_store import CandleStore
+from services.ingest_pipeline import IngestPipeline
+from services.write_behind import WriteBehindQueue
 from database.position_dao import PositionDAO
 from database.handler import DatabaseHandler
+from database.snapshot_dao import ConditionSnapshotDAO
 from database.models import TurtlePosition
 from config import Config
 
@@ -26,24 +35,42 @@ class DailyScheduler:
     def __init__(self):
         self.kiwoom_service = KiwoomAPIService()
         self.turtle_calculator = TurtleCalculator()
+        self.indicator_store = IndicatorStateStore(Config.TURTLE_STATE_FILE)
+        self.candle_store = CandleStore(Config.CANDLE_STORE_DIR)
         self.logger = logging.getLogger(__name__)
         self.kst = KST  # KST 시간대 참조
+        # 장 마감 실행(16:00/수동)과 실시간 편입 계산이 저장소/지표 상태를 동시에 쓰지 않도록 직렬화
+        self._run_lock = threading.Lock()
         
         # DB 연결 시도 (실패해도 계속 진행)
         self.db_available = False
+        self.write_queue: Optional[WriteBehindQueue] = None
+        self.last_snapshot_id: Optional[int] = None  # 마지막으로 저장한 조건검색 스냅샷
         try:
             self.position_dao = PositionDAO()
             self.db_handler = DatabaseHandler()
+            self.snapshot_dao = ConditionSnapshotDAO()
             self.db_available = True
             self.logger.info("✅ 데이터베이스 연결 성공")
         except Exception as e:
             self.logger.warning(f"⚠️ 데이터베이스 연결 실패 (키움 API만 사용): {e}")
             self.position_dao = None
             self.db_handler = None
+            self.snapshot_dao = None
+        
+        if self.db_available:
+            # DB 쓰기는 백그라운드 후행 기록 (프로세스별 스풀, 죽은 워커가 못 쓴 스풀은 여기서 복구)
+            self.write_queue = WriteBehindQueue(
+                self.db_handler, self.position_dao,
+                spool_path=Config.DB_WRITE_SPOOL_FILE,
+                batch_size=Config.PIPELINE_WRITE_BATCH,
+                flush_interval=Config.DB_WRITE_FLUSH_INTERVAL
+            )
         
         # 조건검색 seq 번호들을 동적으로 찾기
         self.condition_sequences = []
         self.system_seq_mapping = {}  # seq -> system name 매핑
+        self.condition_stream: Optional[ConditionStream] = None
         
         # 조건식 초기화 실행 (일시적으로 비활성화 - 앱 크래시 방지)
         # self._initialize_system_sequences()
@@ -89,63 +116,171 @@ class DailyScheduler:
             self.condition_sequences = []
             self.system_seq_mapping = {}
 
-    async def _enhance_with_turtle_data(self, stocks: List[Dict[str, str]], system_type: int) -> List[Dict[str, str]]:
-        """조건검색 결과에 터틀 계산 데이터 추가"""
-        enhanced_stocks = []
+    async def _enhance_with_turtle_data(self, stocks: List[Dict[str, str]], system_type: int,
+                                        positions: Optional[Dict[str, TurtlePosition]] = None) -> List[Dict[str, str]]:
+        """
+        조건검색 결과에 터틀 계산 데이터 추가 (수집 -> 계산 -> DB 기록 파이프라인, executor 스레드에서 실행)
+
+        :param positions: 종목별 활성 포지션 인덱스 (없으면 이 종목들만 한 번에 조회)
+        """
+        stocks_by_code: Dict[str, Dict[str, str]] = {}
+        for stock in stocks:
+            if stock.get('code'):
+                stocks_by_code.setdefault(stock['code'], stock)
+        
+        loop = asyncio.get_running_loop()
+        if positions is None:
+            positions = await loop.run_in_executor(None, self._load_positions, list(stocks_by_code))
+        
+        # 지표 상태가 없는 종목은 daily_candle에서 한 번에 읽어 생성 (종목별 전체 재계산 대신)
+        await loop.run_in_executor(None, self._seed_states_from_db, list(stocks_by_code))
         
+        def calculate(stock_code: str, candle_df: pd.DataFrame) -> Tuple[Dict[str, str], Optional[Tuple]]:
+            return self._calculate_stock(stocks_by_code[stock_code], candle_df, system_type,
+                                         positions.get(stock_code))
+        
+        # 새 봉은 로컬 저장소에 병합된 뒤, 트레일링 스탑과 함께 후행 기록 큐로 (완료는 실행 끝에 한 번 확인)
+        pipeline = IngestPipeline(
+            self.kiwoom_service, self.candle_store, calculate,
+            writer=self.write_queue,
+            days=60,
+            fetch_workers=Config.PIPELINE_FETCH_WORKERS,
+            calc_workers=Config.PIPELINE_CALC_WORKERS,
+            queue_size=Config.PIPELINE_QUEUE_SIZE
+        )
+        results = await loop.run_in_executor(None, pipeline.run, list(stocks_by_code))
+        
+        enhanced_stocks = []
         for stock in stocks:
-            try:
-                stock_code = stock.get('code', '')
-                if not stock_code:
-                    enhanced_stocks.append(stock)
-                    continue
-                
-                # DB 사용 가능시 기존 포지션 확인
-                existing_position = None
-                if self.db_available and self.position_dao:
-                    try:
-                        existing_position = self.position_dao.get_position_by_stock(stock_code)
-                    except Exception as e:
-                        self.logger.warning(f"DB 포지션 조회 실패: {e}")
-                
-                # 캔들 데이터 가져오기 (30일로 단축)
-                self.logger.info(f"캔들 데이터 조회 중: {stock_code} ({stock.get('name', '')})")
-                candle_df = self.kiwoom_service.get_daily_candles(stock_code, count=30)
-                
+            stock_code = stock.get('code', '')
+            if not stock_code:
+                enhanced_stocks.append(stock)
+                continue
+            
+            enhanced_stock = results.get(stock_code)
+            if enhanced_stock is None:
+                enhanced_stock = self._create_basic_stock_data(stock, None)
+            elif stock is not stocks_by_code[stock_code]:
+                # 같은 종목이 중복된 행: 첫 행의 계산 결과에 이 행 정보를 덮어씀
+                enhanced_stock = {**enhanced_stock, **stock}
+            enhanced_stocks.append(enhanced_stock)
+        
+        try:
+            self.indicator_store.save()
+        except Exception as e:
+            self.logger.warning(f"지표 상태 저장 실패: {e}")
+        
+        return enhanced_stocks
+    
+    def _seed_states_from_db(self, stock_codes: List[str]) -> int:
+        """
+        지표 상태가 없는 종목들의 최근 봉을 daily_candle에서 단일 쿼리 블록으로 읽어 상태 생성
+
+        새 인스턴스처럼 상태 파일이 없을 때 재계산용 이력을 한 번의 왕복으로 가져온다.
+        이력이 MIN_BARS보다 짧은 종목은 건너뛰어 파이프라인의 전체 재계산에 맡긴다.
+
+        :return: 생성한 종목 수
+        """
+        if not self.db_available or self.db_handler is None:
+            return 0
+        missing = [code for code in stock_codes if code and self.indicator_store.get(code) is None]
+        if not missing:
+            return 0
+        
+        try:
+            codes, block, mask = self.db_handler.get_recent_candle_block(missing, days=MIN_BARS)
+        except Exception as e:
+            self.logger.warning(f"일봉 블록 조회 실패 (종목별 재계산): {e}")
+            return 0
+        
+        seeded = 0
+        for i, stock_code in enumerate(codes):
+            valid = mask[i]
+            if np.count_nonzero(valid) < MIN_BARS:
+                continue
+            self.indicator_store.seed(stock_code, pd.DataFrame({
+                'date': pd.to_datetime(block['date'][i, valid].astype(str), format='%Y%m%d'),
+                'high': block['high'][i, valid],
+                'low': block['low'][i, valid],
+                'close': block['close'][i, valid],
+            }))
+            seeded += 1
+        
+        self.logger.info(f"daily_candle 블록으로 지표 상태 생성: {seeded}/{len(missing)}종목")
+        return seeded
+    
+    def _flush_writes(self) -> bool:
+        """후행 기록 큐의 쓰기가 DB에 반영될 때까지 대기 (실행당 한 번)"""
+        if self.write_queue is None:
+            return True
+        flushed = self.write_queue.flush(Config.DB_WRITE_FLUSH_TIMEOUT)
+        if flushed:
+            self.logger.info(f"DB 쓰기 반영 완료: {self.write_queue.summary()}")
+        else:
+            self.logger.warning(f"DB 쓰기 {self.write_queue.pending}건 미반영 - 백그라운드 재시도 (스풀 보존)")
+        return flushed
+    
+    def _load_positions(self, stock_codes: List[str]) -> Dict[str, TurtlePosition]:
+        """종목별 활성 포지션 인덱스 (DB 사용 가능시만, 단일 쿼리)"""
+        if not self.db_available or not self.position_dao or not stock_codes:
+            return {}
+        try:
+            return self.position_dao.get_active_positions_by_stock(stock_codes)
+        except Exception as e:
+            self.logger.warning(f"DB 포지션 조회 실패: {e}")
+            return {}
+    
+    def _calculate_stock(self, stock: Dict[str, str], candle_df: pd.DataFrame, system_type: int,
+                         existing_position: Optional[TurtlePosition]) -> Tuple[Dict[str, str], Optional[Tuple]]:
+        """
+        파이프라인 계산 단계: 한 종목의 터틀 데이터 계산
+
+        :param existing_position: 이 종목의 활성 포지션 (포지션 인덱스에서)
+        :return: (터틀 데이터가 추가된 종목, 포지션 갱신 (position_id, trailing_stop, add_position) 또는 None)
+        """
+        stock_code = stock.get('code', '')
+        try:
+            # 저장된 지표 상태가 있으면 새 봉만 반영해 증분 갱신
+            turtle_data = self._advance_indicator_state(stock_code, system_type, candle_df)
+            
+            if turtle_data is None:
+                # 상태가 없거나 끊긴 경우: 전체 이력으로 계산 후 상태 재생성
                 if candle_df.empty or len(candle_df) < 20:
                     self.logger.warning(f"{stock_code}: 캔들 데이터 부족 ({len(candle_df)}일)")
-                    enhanced_stock = self._create_basic_stock_data(stock, existing_position)
-                    enhanced_stocks.append(enhanced_stock)
-                    continue
+                    return self._create_basic_stock_data(stock, existing_position), None
                 
                 # 현재 터틀 레벨 계산
                 turtle_data = self.turtle_calculator.calculate_current_levels(candle_df, system_type)
-                
-                if not turtle_data:
-                    self.logger.warning(f"{stock_code}: 터틀 계산 실패")
-                    enhanced_stock = self._create_basic_stock_data(stock, existing_position)
-                    enhanced_stocks.append(enhanced_stock)
-                    continue
-                
-                # DB 사용 가능시만 포지션 관리
-                if self.db_available and existing_position:
-                    # 기존 포지션: 트레일링 스탑만 업데이트
-                    enhanced_stock = await self._update_existing_position(
-                        stock, existing_position, turtle_data
-                    )
-                else:
-                    # DB 없거나 신규: 계산된 터틀 데이터만 사용
-                    enhanced_stock = self._create_turtle_stock_data(stock, turtle_data)
-                
-                enhanced_stocks.append(enhanced_stock)
-                await asyncio.sleep(0.2)  # API 호출 간격 단축
-                
-            except Exception as e:
-                self.logger.error(f"터틀 데이터 처리 오류 ({stock.get('code', '')}): {e}")
-                enhanced_stock = self._create_basic_stock_data(stock, None)
-                enhanced_stocks.append(enhanced_stock)
+                self.indicator_store.seed(stock_code, candle_df)
+            
+            if not turtle_data:
+                self.logger.warning(f"{stock_code}: 터틀 계산 실패")
+                return self._create_basic_stock_data(stock, existing_position), None
+            
+            # DB 사용 가능시만 포지션 관리
+            if self.db_available and existing_position:
+                # 기존 포지션: 트레일링 스탑만 업데이트 (계산 단계가 끝나면 일괄 반영)
+                return self._update_existing_position(stock, existing_position, turtle_data)
+            
+            # DB 없거나 신규: 계산된 터틀 데이터만 사용
+            return self._create_turtle_stock_data(stock, turtle_data), None
+            
+        except Exception as e:
+            self.logger.error(f"터틀 데이터 처리 오류 ({stock_code}): {e}")
+            return self._create_basic_stock_data(stock, None), None
+    
+    def _advance_indicator_state(self, stock_code: str, system_type: int, candle_df: pd.DataFrame) -> Optional[Dict]:
+        """저장된 지표 상태를 최근 봉으로 전진 (상태가 없거나 이어붙일 수 없으면 None)"""
+        if self.indicator_store.get(stock_code) is None:
+            return None
         
-        return enhanced_stocks
+        state = self.indicator_store.advance(stock_code, candle_df)
+        if state is None:
+            self.logger.info(f"{stock_code}: 지표 상태 불연속 - 전체 재계산")
+            return None
+        
+        turtle_data = state.levels(system_type)
+        return turtle_data or None
     
     def _create_basic_stock_data(self, stock: Dict[str, str], position: Optional[TurtlePosition]) -> Dict[str, str]:
         """기본 주식 데이터 생성"""
@@ -196,26 +331,19 @@ class DailyScheduler:
         
         return enhanced_stock
     
-    async def _update_existing_position(self, stock: Dict[str, str], position: TurtlePosition, 
-                                       turtle_data: Dict) -> Dict[str, str]:
-        """기존 포지션 업데이트 (트레일링 스탑만)"""
+    def _update_existing_position(self, stock: Dict[str, str], position: TurtlePosition, 
+                                  turtle_data: Dict) -> Tuple[Dict[str, str], Optional[Tuple]]:
+        """기존 포지션 업데이트 (트레일링 스탑만, DB 반영은 파이프라인 기록 단계에서)"""
         stock_code = stock.get('code', '')
         
         # 트레일링 스탑과 추가매수가 업데이트
         new_trailing_stop = turtle_data.get('trailing_stop')
         new_add_position = turtle_data.get('add_position')
         
-        # DB 업데이트 시도
-        try:
-            if self.db_available and self.position_dao:
-                self.position_dao.update_trailing_stop(
-                    position.id, 
-                    Decimal(str(new_trailing_stop)),
-                    Decimal(str(new_add_position))
-                )
-                self.logger.info(f"{stock_code}: 포지션 업데이트 - 트레일링: {new_trailing_stop}")
-        except Exception as e:
-            self.logger.warning(f"포지션 업데이트 실패 ({stock_code}): {e}")
+        position_update = None
+        if new_trailing_stop is not None and new_add_position is not None:
+            position_update = (position.id, Decimal(str(new_trailing_stop)), Decimal(str(new_add_position)))
+            self.logger.info(f"{stock_code}: 포지션 업데이트 - 트레일링: {new_trailing_stop}")
         
         # 기존 포지션 데이터 + 업데이트된 트레일링
         enhanced_stock = stock.copy()
@@ -229,13 +357,13 @@ class DailyScheduler:
             'position_id': position.id
         })
         
-        return enhanced_stock
+        return enhanced_stock, position_update
     
     async def _create_new_position(self, stock: Dict[str, str], turtle_data: Dict, 
                                   system_type: int) -> Dict[str, str]:
         """신규 포지션 생성 (DB 사용 가능시만)"""
         
-        if not self.db_available or not self.position_dao:
+        if not self.db_available or self.write_queue is None:
             # DB 없으면 계산된 터틀 데이터만 반환
             return self._create_turtle_stock_data(stock, turtle_data)
         
@@ -261,8 +389,9 @@ class DailyScheduler:
                 current_add_position=Decimal(str(turtle_data.get('add_position')))
             )
             
-            # DB에 저장
-            position_id = self.position_dao.create_position(new_position)
+            # DB 저장은 후행 기록 (ID는 기록 후 다음 포지션 조회부터)
+            self.write_queue.create_position(new_position)
+            position_id = None
             
             self.logger.info(f"{stock_code}: 신규 포지션 생성 - 진입가: {current_price}, 손절가: {fixed_stop_loss}")
         except Exception as e:
@@ -291,7 +420,6 @@ class DailyScheduler:
         self.logger.debug(f"시스템 매핑: {self.system_seq_mapping}")
         
         try:
-            seq_results: Dict[str, List[Dict[str, str]]] = {}
             system_results: Dict[str, List[Dict[str, str]]] = {"1": [], "2": []}
             
             total_conditions = len(self.condition_sequences)
@@ -300,18 +428,25 @@ class DailyScheduler:
             if total_conditions == 0:
                 self.logger.error("❌ 조건식이 하나도 없습니다! 키움 API 조건식 설정을 확인하세요.")
                 return {"1": [], "2": []}
+            
+            # 세션 하나로 로그인 1회 후 모든 조건식 동시 요청
+            try:
+                async with KiwoomWebSocketSession(self.kiwoom_service) as session:
+                    condition_results = await session.request_conditions(self.condition_sequences)
+            except Exception as e:
+                self.logger.error(f"❌ WebSocket 세션 조건검색 실패: {e}")
+                condition_results = {}
+            
+            # 모든 조건식 종목의 활성 포지션을 한 번에 조회해 이번 실행 동안 사용
+            all_codes = [stock.get('code', '') for results in condition_results.values() for stock in results]
+            loop = asyncio.get_running_loop()
+            positions = await loop.run_in_executor(None, self._load_positions, [code for code in all_codes if code])
+            
             for idx, seq in enumerate(self.condition_sequences, 1):
                 try:
-                    self.logger.info(f"📊 조건식 {seq} 결과 조회 시작 ({idx}/{total_conditions})")
-                    
-                    # WebSocket 연결 안정화를 위한 대기
-                    if idx > 1:  # 첫 번째 조건식이 아니면 대기
-                        self.logger.info(f"⏳ WebSocket 안정화 대기 (3초)...")
-                        await asyncio.sleep(3)
-                    
-                    results = await self.kiwoom_service.request_condition(seq)
-                    seq_results[seq] = results
+                    self.logger.info(f"📊 조건식 {seq} 결과 처리 시작 ({idx}/{total_conditions})")
                     
+                    results = condition_results.get(str(seq), [])
                     if not results:
                         self.logger.warning(f"⚠️ 조건식 {seq}: 결과가 없습니다")
                         continue
@@ -319,16 +454,16 @@ class DailyScheduler:
                     # seq를 시스템으로 매핑하여 결과 분류
                     system = self.system_seq_mapping.get(seq, seq)
                     
-                    # 종목 수 제한 (각 시스템당 최대 20개로 더 축소)
-                    max_stocks = 20
-                    limited_results = results[:max_stocks] if len(results) > max_stocks else results
+                    # 종목 수 제한 (Config.CONDITION_MAX_STOCKS, 0이면 전체 처리)
+                    max_stocks = Config.CONDITION_MAX_STOCKS
+                    limited_results = results[:max_stocks] if max_stocks and len(results) > max_stocks else results
                     
-                    if len(results) > max_stocks:
+                    if max_stocks and len(results) > max_stocks:
                         self.logger.warning(f"📊 조건식 {seq}: {len(results)}개 → {max_stocks}개로 제한")
                     
                     # 각 종목의 손절가/익절가 계산 (시간 단축을 위해 간소화)
                     try:
-                        enhanced_results = await self._enhance_with_turtle_data(limited_results, int(system))
+                        enhanced_results = await self._enhance_with_turtle_data(limited_results, int(system), positions)
                         
                         if system in system_results:
                             system_results[system].extend(enhanced_results)
@@ -338,7 +473,7 @@ class DailyScheduler:
                         # 상위 3개 종목 로깅
                         for i, stock in enumerate(enhanced_results[:3]):
                             current = stock.get('current', 0)
-                            self.logger.info(f"  🏆 {i+1}. {stock.get('code')} {stock.get('name')} - 현재가: {current:,}원")
+                            self.logger.info(f"  🏆 {i+1}. {stock.get('code')} {stock.get('name')} - 현재가: {current}원")
                         
                         if len(enhanced_results) > 3:
                             self.logger.info(f"  📈 ... 외 {len(enhanced_results) - 3}개 종목")
@@ -351,7 +486,6 @@ class DailyScheduler:
                     
                 except Exception as e:
                     self.logger.error(f"❌ 조건식 {seq} 전체 처리 실패: {e}")
-                    seq_results[seq] = []
                     # 실패해도 다음 조건식 계속 처리
                     continue
             
@@ -361,30 +495,51 @@ class DailyScheduler:
             self.logger.info(f"   📊 System 1: {len(system_results['1'])}개")
             self.logger.info(f"   📊 System 2: {len(system_results['2'])}개")
             
-            await self.save_condition_results(seq_results)
+            # 이번 실행의 DB 쓰기 반영 확인 (파이프라인은 기록을 기다리지 않음)
+            await loop.run_in_executor(None, self._flush_writes)
+            
+            await self.save_condition_results(system_results)
             return system_results
             
         except Exception as e:
             self.logger.error(f"❌ collect_condition_results 전체 오류: {e}")
             return {"1": [], "2": []}
 
-    async def save_condition_results(self, results: Dict[str, List[Dict[str, str]]]) -> None:
-        """결과 저장 (로그 또는 DB)"""
+    async def save_condition_results(self, results: Dict[str, List[Dict[str, str]]]) -> Optional[int]:
+        """시스템별 결과를 새 스냅샷으로 저장 (웹은 재계산 없이 스냅샷을 읽음)"""
         kst_now = self.get_kst_now()
         ts = kst_now.strftime('%Y-%m-%d %H:%M:%S KST')
-        self.logger.info(f"조건검색 결과 저장 시작: {ts}")
-        for seq, stocks in results.items():
-            self.logger.info(f"조건식 {seq}: {len(stocks)}개 저장")
-            # TODO: DB 저장 로직
-        self.logger.info("조건검색 결과 저장 완료")
+        total = sum(len(stocks) for stocks in results.values())
+        
+        if not self.db_available or self.snapshot_dao is None:
+            self.logger.info(f"조건검색 결과 저장 생략 (DB 없음): {ts}")
+            return None
+        if total == 0:
+            # 조회 실패로 빈 결과면 이전 스냅샷을 그대로 둠
+            self.logger.warning(f"조건검색 결과가 없어 스냅샷을 저장하지 않음: {ts}")
+            return None
+        
+        try:
+            loop = asyncio.get_running_loop()
+            snapshot_id = await loop.run_in_executor(
+                None, self.snapshot_dao.save_snapshot, kst_now.replace(tzinfo=None), results
+            )
+        except Exception as e:
+            self.logger.error(f"조건검색 스냅샷 저장 실패: {e}")
+            return None
+        
+        self.last_snapshot_id = snapshot_id
+        self.logger.info(f"조건검색 결과 저장 완료: 스냅샷 {snapshot_id} ({total}개 종목, {ts})")
+        return snapshot_id
 
     def run_condition_collection(self) -> Dict[str, List[Dict[str, str]]]:
         """동기 호출 래퍼"""
         try:
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            result = loop.run_until_complete(self.collect_condition_results())
-            loop.close()
+            with self._run_lock:
+                loop = asyncio.new_event_loop()
+                asyncio.set_event_loop(loop)
+                result = loop.run_until_complete(self.collect_condition_results())
+                loop.close()
             return result
         except Exception as e:
             self.logger.error(f"run_condition_collection 오류: {e}")
@@ -405,6 +560,86 @@ class DailyScheduler:
                 self.logger.error(f"스케줄러 루프 오류: {e}")
                 time.sleep(60)
 
+    def start_condition_stream(self, on_update: Optional[Callable[[Dict[str, List[Dict[str, str]]]], None]] = None) -> threading.Thread:
+        """
+        실시간 조건검색 구독을 데몬 스레드에서 시작
+
+        :param on_update: 후보 종목이 바뀔 때마다 시스템별 결과로 호출 (get_stream_results와 같은 형식)
+        """
+        def run():
+            try:
+                asyncio.run(self._run_condition_stream(on_update))
+            except Exception as e:
+                self.logger.error(f"실시간 조건검색 스레드 종료: {e}")
+        
+        thread = threading.Thread(target=run, name="ConditionStreamThread", daemon=True)
+        thread.start()
+        self.logger.info(f"📡 실시간 조건검색 시작: {len(self.condition_sequences)}개 조건식")
+        return thread
+
+    async def _run_condition_stream(self, on_update: Optional[Callable[[Dict[str, List[Dict[str, str]]]], None]]):
+        """편입 종목은 터틀 데이터를 계산해 반영, 이탈 종목은 제거"""
+        def publish():
+            if on_update is not None:
+                on_update(self.get_stream_results())
+        
+        async def on_insert(seq: str, stock: Dict[str, str]):
+            system = self.system_seq_mapping.get(seq, seq)
+            loop = asyncio.get_running_loop()
+            enhanced = await loop.run_in_executor(None, self._calculate_stream_stock, stock, int(system))
+            self.condition_stream.update_row(seq, stock['code'], enhanced)
+            publish()
+        
+        async def on_remove(seq: str, stock: Dict[str, str]):
+            publish()
+        
+        session = KiwoomWebSocketSession(self.kiwoom_service)
+        self.condition_stream = ConditionStream(session, on_insert=on_insert, on_remove=on_remove)
+        try:
+            await self.condition_stream.run(self.condition_sequences)
+        finally:
+            await session.close()
+
+    def _calculate_stream_stock(self, stock: Dict[str, str], system_type: int) -> Dict[str, str]:
+        """
+        실시간 편입 종목의 터틀 데이터 (읽기 전용)
+
+        장중 봉으로 지표 상태를 전진/저장하거나 포지션을 갱신하지 않는다. 로컬 저장소의 일봉
+        (부족하면 저장하지 않고 조회만)으로 레벨을 계산하고, 기존 포지션은 저장된 값을 보여준다.
+        """
+        stock_code = stock.get('code', '')
+        try:
+            # 장 마감 실행이 저장소를 쓰는 중에는 읽지 않도록 저장소 읽기만 잠금 (API/DB 조회는 잠금 밖)
+            with self._run_lock:
+                candle_df = self.candle_store.frame(stock_code, 60)
+            if len(candle_df) < 60:
+                candle_df = self.kiwoom_service.get_daily_candles(stock_code, count=60)
+            position = self._load_positions([stock_code]).get(stock_code)
+            
+            if position:
+                return self._create_basic_stock_data(stock, position)
+            
+            turtle_data = self.turtle_calculator.calculate_current_levels(candle_df, system_type) if not candle_df.empty else {}
+            if not turtle_data:
+                return self._create_basic_stock_data(stock, None)
+            return self._create_turtle_stock_data(stock, turtle_data)
+            
+        except Exception as e:
+            self.logger.error(f"실시간 편입 종목 계산 오류 ({stock_code}): {e}")
+            return self._create_basic_stock_data(stock, None)
+
+    def get_stream_results(self) -> Dict[str, List[Dict[str, str]]]:
+        """실시간 구독 중인 후보 종목 (시스템별)"""
+        system_results: Dict[str, List[Dict[str, str]]] = {"1": [], "2": []}
+        if self.condition_stream is None:
+            return system_results
+        
+        for seq, stocks in self.condition_stream.snapshot().items():
+            system = self.system_seq_mapping.get(seq, seq)
+            if system in system_results:
+                system_results[system].extend(stocks)
+        return system_results
+
     def fetch_turtle_signals(self) -> Dict[str, List[Dict[str, str]]]:
         """외부 호출용: 즉시 조건검색 실행"""
         return self.run_condition_collection()
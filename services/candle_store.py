@@ -0,0 +1,271 @@
+import logging
+import os
+import threading
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# 종목별 일봉 레코드 (날짜 오름차순, date는 YYYYMMDD 정수)
+CANDLE_DTYPE = np.dtype([
+    ('date', '<i4'),
+    ('open', '<f8'),
+    ('high', '<f8'),
+    ('low', '<f8'),
+    ('close', '<f8'),
+    ('volume', '<i8'),
+    ('amount', '<i8'),
+])
+
+PRICE_FIELDS = ('open', 'high', 'low', 'close')
+
+# get_daily_candles(DataFrame) 또는 get_daily_candle_arrays(컬럼 배열) 결과
+CandleData = Union[pd.DataFrame, Dict[str, np.ndarray]]
+
+
+def _is_empty(data: Optional[CandleData]) -> bool:
+    if data is None:
+        return True
+    if isinstance(data, pd.DataFrame):
+        return data.empty
+    return not len(data['date'])
+
+
+def _to_records(data: Optional[CandleData]) -> np.ndarray:
+    """일봉 데이터를 오름차순 레코드 배열로 변환 (날짜 중복시 마지막 값)"""
+    if _is_empty(data):
+        return np.empty(0, dtype=CANDLE_DTYPE)
+    if not isinstance(data, pd.DataFrame):
+        # 컬럼 배열은 이미 날짜 오름차순
+        records = np.empty(len(data['date']), dtype=CANDLE_DTYPE)
+        for field in CANDLE_DTYPE.names:
+            records[field] = data[field]
+        return records
+
+    df = data.dropna(subset=['date', 'close'])
+    records = np.empty(len(df), dtype=CANDLE_DTYPE)
+    records['date'] = pd.to_datetime(df['date']).dt.strftime('%Y%m%d').astype(np.int32).to_numpy()
+    for field in PRICE_FIELDS:
+        records[field] = pd.to_numeric(df[field], errors='coerce').to_numpy(dtype=np.float64)
+    for field in ('volume', 'amount'):
+        if field in df.columns:
+            records[field] = pd.to_numeric(df[field], errors='coerce').fillna(0).to_numpy(dtype=np.int64)
+        else:
+            records[field] = 0
+
+    records = records[np.argsort(records['date'], kind='stable')]
+    # 같은 날짜가 여러 번 오면 마지막 행 유지
+    keep = np.append(records['date'][1:] != records['date'][:-1], True)
+    return records[keep]
+
+
+def candle_rows(stock_code: str, records: np.ndarray) -> List[Dict]:
+    """레코드 -> upsert_candle_data 입력 형식"""
+    return [
+        {
+            'stock_code': stock_code,
+            'date': datetime.strptime(str(int(row['date'])), '%Y%m%d').date(),
+            'open': float(row['open']),
+            'high': float(row['high']),
+            'low': float(row['low']),
+            'close': float(row['close']),
+            'volume': int(row['volume']),
+            'amount': int(row['amount']),
+        }
+        for row in records
+    ]
+
+
+class CandleStore:
+    """종목별 일봉 컬럼 저장소 (종목당 .npy 파일, 메모리 맵으로 읽기)
+
+    - 레코드는 날짜 오름차순이라 날짜 조회는 searchsorted로 한다.
+    - 쓰기는 임시 파일 작성 후 교체하므로 열려 있는 메모리 맵은 이전 내용을 계속 본다.
+    - sync()는 마지막 저장일 이후 봉만 받아 병합하고 새 봉을 daily_candle에 반영한다.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+
+    def path(self, stock_code: str) -> str:
+        return os.path.join(self.root, f"{stock_code}.npy")
+
+    def load(self, stock_code: str, mmap: bool = True) -> np.ndarray:
+        """저장된 레코드 (없으면 빈 배열)"""
+        try:
+            return np.load(self.path(stock_code), mmap_mode='r' if mmap else None)
+        except FileNotFoundError:
+            return np.empty(0, dtype=CANDLE_DTYPE)
+        except (OSError, ValueError) as e:
+            self.logger.warning(f"{stock_code}: 캔들 파일 손상 - 무시하고 재수집 ({e})")
+            return np.empty(0, dtype=CANDLE_DTYPE)
+
+    def stock_codes(self) -> List[str]:
+        """저장된 종목코드 (정렬)"""
+        try:
+            names = os.listdir(self.root)
+        except FileNotFoundError:
+            return []
+        return sorted(name[:-len('.npy')] for name in names if name.endswith('.npy'))
+
+    def last_date(self, stock_code: str) -> Optional[str]:
+        """마지막 저장일 (YYYYMMDD)"""
+        records = self.load(stock_code)
+        return str(int(records['date'][-1])) if len(records) else None
+
+    def _write(self, stock_code: str, records: np.ndarray):
+        os.makedirs(self.root, exist_ok=True)
+        tmp_path = f"{self.path(stock_code)}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            np.save(f, np.ascontiguousarray(records, dtype=CANDLE_DTYPE))
+        os.replace(tmp_path, self.path(stock_code))
+
+    def replace(self, stock_code: str, df: CandleData) -> np.ndarray:
+        """저장된 이력을 새 데이터로 교체 (수정주가 변경 등)"""
+        records = _to_records(df)
+        with self._lock:
+            self._write(stock_code, records)
+        return records
+
+    def merge(self, stock_code: str, df: CandleData) -> np.ndarray:
+        """
+        새 봉 병합 (같은 날짜는 새 값으로 덮어씀)
+
+        :return: 추가되거나 값이 바뀐 레코드
+        """
+        incoming = _to_records(df)
+        if not len(incoming):
+            return incoming
+
+        with self._lock:
+            stored = self.load(stock_code, mmap=False)
+            pos = np.searchsorted(stored['date'], incoming['date'])
+            pos_clipped = np.minimum(pos, max(len(stored) - 1, 0))
+            exists = (pos < len(stored)) & (stored['date'][pos_clipped] == incoming['date']) \
+                if len(stored) else np.zeros(len(incoming), dtype=bool)
+
+            changed = ~exists
+            if exists.any():
+                changed[exists] = stored[pos[exists]] != incoming[exists]
+            if not changed.any():
+                return incoming[:0]
+
+            merged = np.concatenate([stored[~np.isin(stored['date'], incoming['date'])], incoming])
+            merged = merged[np.argsort(merged['date'], kind='stable')]
+            self._write(stock_code, merged)
+        return incoming[changed]
+
+    def frame(self, stock_code: str, days: int = 60) -> pd.DataFrame:
+        """최근 days개 봉 (get_daily_candles와 같은 형식, 최신순)"""
+        records = self.load(stock_code)[-days:]
+        if not len(records):
+            return pd.DataFrame()
+
+        df = pd.DataFrame({
+            'stock_code': stock_code,
+            'date': pd.to_datetime(records['date'].astype(str), format='%Y%m%d'),
+            'open': records['open'],
+            'high': records['high'],
+            'low': records['low'],
+            'close': records['close'],
+            'volume': records['volume'],
+            'amount': records['amount'],
+        })
+        return df.iloc[::-1].reset_index(drop=True)
+
+    def _resume_date(self, stock_code: str, days: int) -> Optional[str]:
+        """증분 조회 시작일: 마지막 두 봉부터 다시 받음 (당일 미완성 봉 갱신 + 확정 봉 대조용)"""
+        records = self.load(stock_code)
+        if len(records) < max(days, 2):
+            return None
+        return str(int(records['date'][-2]))
+
+    def _overlap_matches(self, stock_code: str, df: CandleData, since: str) -> bool:
+        """기준 봉 (확정된 봉) 가격이 저장값과 같은지 - 다르면 수정주가 반영으로 전체 재수집"""
+        incoming = _to_records(df)
+        stored = self.load(stock_code)
+        key = int(since)
+        new_row = incoming[incoming['date'] == key]
+        old_row = stored[stored['date'] == key]
+        if not len(new_row) or not len(old_row):
+            return False
+        return all(np.isclose(new_row[field][0], old_row[field][0]) for field in PRICE_FIELDS)
+
+    def sync(self, service, stock_codes: Iterable[str], days: int = 60,
+             db_handler=None) -> Dict[str, pd.DataFrame]:
+        """
+        빠진 봉만 조회해 저장소 갱신 후 최근 days개 봉 반환
+
+        :param service: KiwoomAPIService
+        :param db_handler: DatabaseHandler (주어지면 새 봉을 daily_candle에 업서트)
+        :return: {종목코드: 최근 일봉 DataFrame (최신순)}
+        """
+        codes = [code for code in dict.fromkeys(stock_codes) if code]
+        since = {code: self._resume_date(code, days) for code in codes}
+        since = {code: dt for code, dt in since.items() if dt}
+        full_codes = [code for code in codes if code not in since]
+        self.logger.info(f"캔들 동기화 시작: 증분 {len(since)}종목, 전체 {len(full_codes)}종목")
+
+        new_rows: Dict[str, np.ndarray] = {}
+        refetch: List[str] = []
+        for stock_code, candle_df in service.get_daily_candles_many(codes, count=days, since=since, arrays=True):
+            rows = self._apply(stock_code, candle_df, since.get(stock_code))
+            if rows is None:
+                refetch.append(stock_code)
+            elif len(rows):
+                new_rows[stock_code] = rows
+
+        if refetch:
+            self.logger.info(f"수정주가 변경 감지, 전체 재수집: {len(refetch)}종목")
+            for stock_code, candle_df in service.get_daily_candles_many(refetch, count=days, arrays=True):
+                if not _is_empty(candle_df):
+                    new_rows[stock_code] = self.replace(stock_code, candle_df)
+
+        if db_handler is not None:
+            self._mirror(db_handler, new_rows)
+
+        return {code: self.frame(code, days) for code in codes}
+
+    def _apply(self, stock_code: str, data: CandleData, since: Optional[str]) -> Optional[np.ndarray]:
+        """
+        조회 결과를 저장소에 반영
+
+        :return: 새로 저장된 레코드 (수신 없으면 빈 배열), 기준 봉이 달라 전체 재수집이 필요하면 None
+        """
+        if _is_empty(data):
+            self.logger.warning(f"{stock_code}: 캔들 수신 없음 - 저장된 이력 사용")
+            return np.empty(0, dtype=CANDLE_DTYPE)
+        if since is None:
+            return self.replace(stock_code, data)
+        if not self._overlap_matches(stock_code, data, since):
+            return None
+        return self.merge(stock_code, data)
+
+    def sync_one(self, service, stock_code: str, days: int = 60) -> Tuple[pd.DataFrame, np.ndarray]:
+        """
+        한 종목만 동기화 (파이프라인 수집 단계용, 호출 스레드에서 조회)
+
+        :return: (최근 days개 봉 DataFrame (최신순), 새로 저장된 레코드)
+        """
+        since = self._resume_date(stock_code, days)
+        rows = self._apply(stock_code, service.get_daily_candle_arrays(stock_code, count=days, since=since), since)
+        if rows is None:
+            self.logger.info(f"{stock_code}: 수정주가 변경 감지, 전체 재수집")
+            data = service.get_daily_candle_arrays(stock_code, count=days)
+            rows = self.replace(stock_code, data) if not _is_empty(data) else np.empty(0, dtype=CANDLE_DTYPE)
+        return self.frame(stock_code, days), rows
+
+    def _mirror(self, db_handler, new_rows: Dict[str, np.ndarray]):
+        """새 봉을 daily_candle에 업서트 (실패해도 로컬 저장소는 유지)"""
+        candle_data = [row for stock_code, rows in new_rows.items() for row in candle_rows(stock_code, rows)]
+        if not candle_data:
+            return
+        try:
+            db_handler.upsert_candle_data(candle_data)
+        except Exception as e:
+            self.logger.warning(f"daily_candle 반영 실패: {e}")
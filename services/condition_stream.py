@@ -0,0 +1,167 @@
+import asyncio
+import logging
+import threading
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from services.kiwoom_service import normalize_stock_code, parse_condition_rows
+from services.kiwoom_ws import KiwoomWebSocketSession
+
+logger = logging.getLogger(__name__)
+
+# 실시간 조건검색 이벤트 (REAL, type 02) values 필드
+FIELD_SEQ = "841"      # 조건식 번호
+FIELD_CODE = "9001"    # 종목코드
+FIELD_ACTION = "843"   # I: 편입, D: 이탈
+FIELD_TIME = "20"      # 체결시간
+
+ACTION_INSERT = "I"
+ACTION_REMOVE = "D"
+
+StreamCallback = Callable[[str, Dict[str, Any]], Awaitable[None]]
+
+
+class ConditionStream:
+    """실시간 조건검색 구독 (search_type=1)
+
+    - 조건식별 최초 응답으로 후보 집합을 만들고, REAL 편입/이탈 이벤트로 계속 갱신한다.
+    - 재연결시 다시 등록하면서 최초 응답으로 집합을 맞춘다 (끊긴 동안 놓친 이벤트 보정).
+    - 후보 집합은 다른 스레드(웹)에서 snapshot()으로 읽을 수 있다.
+
+    on_insert(seq, row) / on_remove(seq, row) 콜백은 집합 갱신 후 호출된다.
+    """
+
+    def __init__(self, session: KiwoomWebSocketSession,
+                 on_insert: Optional[StreamCallback] = None,
+                 on_remove: Optional[StreamCallback] = None):
+        self.session = session
+        self.on_insert = on_insert
+        self.on_remove = on_remove
+        self.seqs: List[str] = []
+        self._candidates: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        self._names: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        self._tasks: set = set()
+        self.session.add_listener(self._on_message)
+
+    def snapshot(self) -> Dict[str, List[Dict[str, Any]]]:
+        """조건식별 현재 후보 종목 (복사본)"""
+        with self._lock:
+            return {seq: [dict(row) for row in rows.values()] for seq, rows in self._candidates.items()}
+
+    def update_row(self, seq: str, code: str, row: Dict[str, Any]):
+        """후보 종목 정보 갱신 (터틀 계산 결과 반영 등, 이미 이탈한 종목은 무시)"""
+        with self._lock:
+            rows = self._candidates.get(str(seq))
+            if rows is not None and code in rows:
+                rows[code] = row
+
+    async def subscribe(self, seqs: List[str]):
+        """조건식 실시간 등록 (최초 결과로 후보 집합 초기화)"""
+        self.seqs = [str(seq) for seq in seqs]
+        for seq in self.seqs:
+            await self._register(seq)
+
+    async def unsubscribe(self):
+        """실시간 등록 해제 (CNSRCLR)"""
+        for seq in self.seqs:
+            try:
+                await self.session.send_request({"trnm": "CNSRCLR", "seq": seq})
+            except Exception as e:
+                logger.warning(f"조건식 {seq} 실시간 해제 실패: {e}")
+
+    async def _register(self, seq: str):
+        msg = await self.session.send_request({
+            "trnm":        "CNSRREQ",
+            "seq":         seq,
+            "search_type": "1",
+            "stex_tp":     "K"
+        })
+        if msg.get("return_code") != 0:
+            logger.error(f"조건식 {seq} 실시간 등록 실패: {msg.get('return_msg')}")
+            return
+
+        data = msg.get("data") or []
+        if data and "jmcode" in data[0]:
+            rows = [{"code": normalize_stock_code(d.get("jmcode"))} for d in data]
+        else:
+            rows = parse_condition_rows(data)
+
+        current = {}
+        for row in rows:
+            row["code"] = normalize_stock_code(row.get("code"))
+            if row.get("name"):
+                self._names[row["code"]] = row["name"]
+            else:
+                row["name"] = self._names.get(row["code"])
+            current[row["code"]] = row
+
+        with self._lock:
+            previous = self._candidates.get(seq, {})
+            # 재등록이면 기존 행(터틀 계산 결과 포함) 유지
+            self._candidates[seq] = {code: previous.get(code, row) for code, row in current.items()}
+
+        logger.info(f"조건식 {seq} 실시간 등록: 초기 {len(current)}개 종목")
+        for code in current.keys() - previous.keys():
+            self._spawn(self._notify(self.on_insert, seq, current[code]))
+        for code in previous.keys() - current.keys():
+            self._spawn(self._notify(self.on_remove, seq, previous[code]))
+
+    async def _on_message(self, msg: Dict[str, Any]):
+        if msg.get("trnm") != "REAL":
+            return
+
+        for item in msg.get("data") or []:
+            values = item.get("values") or {}
+            seq = str(values.get(FIELD_SEQ, "")).strip()
+            code = normalize_stock_code(values.get(FIELD_CODE) or item.get("item"))
+            action = values.get(FIELD_ACTION)
+            if seq not in self.seqs or not code:
+                continue
+
+            if action == ACTION_INSERT:
+                row = {"code": code, "name": self._names.get(code), "time": values.get(FIELD_TIME)}
+                with self._lock:
+                    rows = self._candidates.setdefault(seq, {})
+                    inserted = code not in rows
+                    if inserted:
+                        rows[code] = row
+                if inserted:
+                    logger.info(f"조건식 {seq} 편입: {code}")
+                    self._spawn(self._notify(self.on_insert, seq, row))
+            elif action == ACTION_REMOVE:
+                with self._lock:
+                    row = self._candidates.get(seq, {}).pop(code, None)
+                if row is not None:
+                    logger.info(f"조건식 {seq} 이탈: {code}")
+                    self._spawn(self._notify(self.on_remove, seq, row))
+
+    def _spawn(self, coro):
+        """수신 루프를 막지 않도록 콜백은 별도 태스크로 실행"""
+        task = asyncio.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _notify(self, callback: Optional[StreamCallback], seq: str, row: Dict[str, Any]):
+        if callback is None:
+            return
+        try:
+            await callback(seq, row)
+        except Exception as e:
+            logger.error(f"조건검색 이벤트 처리 오류 ({seq}, {row.get('code')}): {e}", exc_info=True)
+
+    async def run(self, seqs: List[str], reconnect_delay: float = 5.0, max_delay: float = 300.0):
+        """연결이 끊기면 재연결 후 재등록하며 계속 구독 (취소될 때까지)"""
+        delay = reconnect_delay
+        while True:
+            try:
+                await self.session.connect()
+                await self.subscribe(seqs)
+                delay = reconnect_delay
+                await self.session.wait_closed()
+                logger.warning("실시간 조건검색 연결 종료 - 재연결 대기")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"실시간 조건검색 오류: {e}")
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, max_delay)
@@ -0,0 +1,148 @@
+import logging
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from services.candle_store import CANDLE_DTYPE, CandleStore
+from services.write_behind import WriteBehindQueue
+
+logger = logging.getLogger(__name__)
+
+# calculate() 반환값: (종목별 결과, 포지션 갱신 (position_id, trailing_stop, add_position) 또는 None)
+CalcResult = Tuple[Any, Optional[Tuple]]
+
+# 단계 종료 표시
+_DONE = object()
+
+
+class IngestPipeline:
+    """일봉 수집 -> 터틀 계산 2단계 파이프라인 (DB 쓰기는 후행 기록 큐로)
+
+    - 수집: fetch_workers개 스레드가 종목별로 빠진 봉만 받아 로컬 저장소에 병합
+    - 계산: calc_workers개 스레드가 calculate(종목코드, 일봉 DataFrame)를 호출하고, 새 봉과
+      포지션 갱신은 writer(WriteBehindQueue)에 넣고 바로 다음 종목으로 넘어감
+    단계 사이 큐는 크기가 제한되어 있어 계산이 밀리면 수집이 기다린다 (backpressure).
+    네트워크 대기와 계산이 종목 단위로 겹치고, DB 왕복은 writer의 백그라운드 스레드에서 일어난다.
+    기록 완료는 호출자가 실행 단위로 writer.flush()를 기다려 확인한다.
+    """
+
+    def __init__(self, service, candle_store: CandleStore,
+                 calculate: Callable[[str, pd.DataFrame], CalcResult],
+                 writer: Optional[WriteBehindQueue] = None, days: int = 60,
+                 fetch_workers: int = 4, calc_workers: int = 1, queue_size: int = 32):
+        """
+        :param service: KiwoomAPIService
+        :param calculate: 계산 단계 함수 (예외는 종목 단위로 잡아 결과 None 처리)
+        :param writer: 새 일봉/포지션 갱신을 넘길 후행 기록 큐 (없으면 DB 기록 생략)
+        :param queue_size: 단계 사이 큐 크기
+        """
+        self.service = service
+        self.candle_store = candle_store
+        self.calculate = calculate
+        self.writer = writer
+        self.days = days
+        self.fetch_workers = max(1, fetch_workers)
+        self.calc_workers = max(1, calc_workers)
+        self.queue_size = max(1, queue_size)
+        self.logger = logging.getLogger(__name__)
+        self._stats_lock = threading.Lock()
+        self.stats: Dict[str, float] = {}
+
+    def _count(self, key: str, value: float = 1):
+        with self._stats_lock:
+            self.stats[key] = self.stats.get(key, 0) + value
+
+    def _put(self, q: queue.Queue, item, stage: str):
+        """다음 단계 큐에 넣기 (가득 차서 기다린 시간 기록)"""
+        started = time.monotonic()
+        q.put(item)
+        waited = time.monotonic() - started
+        if waited > 0.001:
+            self._count(f'{stage}_blocked_sec', waited)
+
+    def run(self, stock_codes: Iterable[str]) -> Dict[str, Any]:
+        """
+        종목들을 파이프라인으로 처리 (모든 단계가 끝날 때까지 대기)
+
+        :return: {종목코드: calculate 결과 (실패시 None)}
+        """
+        codes = [code for code in dict.fromkeys(stock_codes) if code]
+        if not codes:
+            return {}
+
+        self.stats = {}
+        pending: queue.Queue = queue.Queue()
+        for code in codes:
+            pending.put(code)
+        candles: queue.Queue = queue.Queue(maxsize=self.queue_size)
+        results: Dict[str, Any] = {}
+
+        started = time.monotonic()
+        fetchers = [self._start(self._fetch_worker, f"ingest-fetch-{i}", pending, candles)
+                    for i in range(min(self.fetch_workers, len(codes)))]
+        calculators = [self._start(self._calc_worker, f"ingest-calc-{i}", candles, results)
+                       for i in range(self.calc_workers)]
+
+        for thread in fetchers:
+            thread.join()
+        for _ in calculators:
+            candles.put(_DONE)
+        for thread in calculators:
+            thread.join()
+
+        elapsed = time.monotonic() - started
+        self.logger.info(
+            f"수집 파이프라인 완료: {len(codes)}종목, {elapsed:.1f}초 "
+            f"(새 봉 {int(self.stats.get('candles_queued', 0))}개, "
+            f"포지션 갱신 {int(self.stats.get('positions_queued', 0))}개 기록 대기)"
+        )
+        return results
+
+    @staticmethod
+    def _start(target, name: str, *args) -> threading.Thread:
+        thread = threading.Thread(target=target, name=name, args=args, daemon=True)
+        thread.start()
+        return thread
+
+    def _fetch_worker(self, pending: queue.Queue, candles: queue.Queue):
+        """수집 단계: 남은 종목이 없을 때까지 하나씩 동기화"""
+        while True:
+            try:
+                stock_code = pending.get_nowait()
+            except queue.Empty:
+                return
+            try:
+                candle_df, new_rows = self.candle_store.sync_one(self.service, stock_code, self.days)
+            except Exception as e:
+                self.logger.warning(f"{stock_code}: 캔들 수집 실패 - {e}")
+                candle_df, new_rows = self.candle_store.frame(stock_code, self.days), np.empty(0, dtype=CANDLE_DTYPE)
+            self._count('fetched')
+            self._put(candles, (stock_code, candle_df, new_rows), 'fetch')
+
+    def _calc_worker(self, candles: queue.Queue, results: Dict[str, Any]):
+        """계산 단계: 종목별 계산 후 새 봉/포지션 갱신을 후행 기록 큐에"""
+        while True:
+            item = candles.get()
+            if item is _DONE:
+                return
+            stock_code, candle_df, new_rows = item
+            try:
+                result, position_update = self.calculate(stock_code, candle_df)
+            except Exception as e:
+                self.logger.error(f"{stock_code}: 계산 단계 오류 - {e}")
+                result, position_update = None, None
+            results[stock_code] = result
+            self._count('calculated')
+
+            if self.writer is None:
+                continue
+            if len(new_rows):
+                self.writer.upsert_candles(stock_code, new_rows)
+                self._count('candles_queued', len(new_rows))
+            if position_update is not None:
+                self.writer.update_trailing_stop(*position_update)
+                self._count('positions_queued')
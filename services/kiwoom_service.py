@@ -4,19 +4,121 @@ import json
 import logging
 import asyncio
 import time
+import threading
 import websockets
 import requests
+import numpy as np
 import pandas as pd
 
-from typing import Any, List, Dict, Optional
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from operator import itemgetter
+from requests.adapters import HTTPAdapter
+from typing import Any, List, Dict, Optional, Iterable, Iterator, Tuple
 from datetime import datetime, timedelta
 from config import Config
+from services.token_cache import TokenCache
+from services.rate_limiter import AdaptiveRateLimiter, backoff_delay, parse_rate_limits
 
 logger = logging.getLogger(__name__)
 
 # 키움 서비스는 DEBUG 레벨로 상세 로깅
 logger.setLevel(logging.DEBUG)
 
+# 응답 코드 (return_code)
+THROTTLED_CODE = 1700           # 허용된 요청 개수 초과
+TOKEN_ERROR_CODES = {8005}      # 토큰 만료/무효
+TOKEN_API_ID = "au10001"        # 접근토큰 발급
+
+
+def normalize_stock_code(code: Optional[str]) -> str:
+    """조건검색 종목코드의 시장 접두어 제거 ('A005930' -> '005930')"""
+    code = (code or "").strip()
+    return code[1:] if code[:1].isalpha() else code
+
+
+def parse_condition_rows(data_list: List[Dict[str, str]]) -> List[Dict[str, str]]:
+    """조건검색(CNSRREQ) 응답 data를 종목 딕셔너리로 변환"""
+    return [
+        {
+            "code":    normalize_stock_code(d.get("9001")),
+            "name":    d.get("302"),
+            "current": d.get("10"),
+            "sign":    d.get("25"),
+            "change":  d.get("11"),
+            "rate":    d.get("12"),
+            "volume":  d.get("13"),
+            "open":    d.get("16"),
+            "high":    d.get("17"),
+            "low":     d.get("18")
+        }
+        for d in data_list
+    ]
+
+
+# ka10081 응답 필드 -> (컬럼, 응답 키, dtype)
+CHART_COLUMNS = (
+    ('date',   'dt',         np.int32),
+    ('open',   'open_pric',  np.int64),
+    ('high',   'high_pric',  np.int64),
+    ('low',    'low_pric',   np.int64),
+    ('close',  'cur_prc',    np.int64),
+    ('volume', 'trde_qty',   np.int64),
+    ('amount', 'trde_prica', np.int64),
+)
+CHART_PRICE_COLUMNS = ('open', 'high', 'low', 'close')
+
+
+def _safe_int(value: Any) -> int:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        pass
+    try:
+        return int(float(value))
+    except (TypeError, ValueError):
+        return 0
+
+
+def parse_chart_rows(rows: List[Dict[str, Any]], since: Optional[str] = None) -> Dict[str, np.ndarray]:
+    """
+    ka10081 행(최신순)을 날짜 오름차순 컬럼 배열로 바로 변환
+
+    - 가격의 부호('+12345', '-12345': 전일 대비 방향)는 떼고 절대값 사용
+    - 날짜/시가/고가/저가/종가 중 하나라도 없거나 0인 행과 since(YYYYMMDD) 이전 행은 제외
+      (0 저가가 돈치안 하한/트레일링 스탑으로, 0 날짜가 저장소 정렬로 들어가지 않도록)
+    """
+    n = len(rows)
+    columns = {}
+    for name, key, dtype in CHART_COLUMNS:
+        try:
+            column = np.fromiter(map(int, map(itemgetter(key), reversed(rows))), dtype=dtype, count=n)
+        except (KeyError, TypeError, ValueError):
+            # 빈 문자열/누락 필드가 섞인 페이지만 느린 경로
+            column = np.fromiter((_safe_int(row.get(key)) for row in reversed(rows)), dtype=dtype, count=n)
+        columns[name] = column
+    for name in CHART_PRICE_COLUMNS:
+        np.abs(columns[name], out=columns[name])
+
+    keep = columns['date'] > 0
+    for name in CHART_PRICE_COLUMNS:
+        keep &= columns[name] > 0
+    if since:
+        keep &= columns['date'] >= int(since)
+    if not keep.all():
+        columns = {name: column[keep] for name, column in columns.items()}
+    return columns
+
+
+def chart_frame(stk_cd: str, columns: Dict[str, np.ndarray]) -> pd.DataFrame:
+    """컬럼 배열 -> 기존 get_daily_candles 형식 DataFrame (최신순)"""
+    df = pd.DataFrame({
+        'stock_code': stk_cd,
+        'date': pd.to_datetime(columns['date'].astype(str), format='%Y%m%d'),
+        **{name: columns[name] for name in ('open', 'high', 'low', 'close', 'volume', 'amount')}
+    })
+    return df.iloc[::-1].reset_index(drop=True)
+
+
 class KiwoomAPIService:
     def __init__(self):
         self.app_key       = Config.KIWOOM_APP_KEY
@@ -25,56 +127,153 @@ class KiwoomAPIService:
         self.wss_url       = Config.KIWOOM_WSS_URL + "/api/dostk/websocket"
         self.access_token: Optional[str] = None
         self.token_expires_at: Optional[datetime] = None
+        self._token_lock = threading.Lock()
 
-        # 선발급: 인스턴스 초기화 시 토큰 발급
+        # keep-alive 커넥션 풀 (요청마다 TCP/TLS 핸드셰이크 방지)
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=Config.KIWOOM_MAX_CONCURRENCY)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+        # REST/WebSocket 공용 속도 제한 (api-id/trnm별 예산, 한도 초과시 자동 감속)
+        self.rate_limiter = AdaptiveRateLimiter(parse_rate_limits(Config.KIWOOM_RATE_LIMITS))
+
+        # 워커/인스턴스 공용 토큰 캐시 (유효한 토큰이 있으면 발급 생략)
+        self.token_cache = TokenCache(Config.KIWOOM_TOKEN_CACHE_FILE)
+
+        # 선확보: 캐시된 토큰을 읽거나 만료 임박시에만 발급
         try:
-            self.get_access_token(force_refresh=True)
-            logger.info(f"Access token pre-fetched at init, expires at {self.token_expires_at}.")
+            self.get_access_token()
+            logger.info(f"Access token ready at init, expires at {self.token_expires_at}.")
         except Exception as e:
             logger.error(f"초기 토큰 발급 실패: {e}")
 
     def get_access_token(self, force_refresh: bool = False) -> str:
-        token_url = f"{self.base_url}/oauth2/token"
         logger.debug(f"토큰 요청 - force_refresh: {force_refresh}, 현재 토큰 존재: {bool(self.access_token)}, 만료시간: {self.token_expires_at}")
         
-        if force_refresh or not self.access_token or datetime.now() >= (self.token_expires_at or datetime.min):
-            logger.debug(f"새 토큰 발급 시작 - URL: {token_url}")
-            headers = {"Content-Type": "application/json;charset=UTF-8"}
-            body = {
+        with self._token_lock:
+            # 메모리 토큰이 유효하면 파일도 보지 않음
+            if (not force_refresh and self.access_token and self.token_expires_at
+                    and datetime.now() < self.token_expires_at - self.token_cache.refresh_margin):
+                logger.debug("기존 토큰 재사용")
+                return self.access_token
+            
+            try:
+                self.access_token, self.token_expires_at = self.token_cache.get(
+                    self._issue_access_token,
+                    force_refresh=force_refresh,
+                    stale_token=self.access_token
+                )
+            except OSError as e:
+                # 캐시 파일 문제로 토큰을 못 쓰면 직접 발급
+                logger.warning(f"토큰 캐시 사용 불가, 직접 발급: {e}")
+                self.access_token, self.token_expires_at = self._issue_access_token()
+            
+        return self.access_token
+
+    def _issue_access_token(self) -> Tuple[str, Optional[datetime]]:
+        """토큰 발급 (oauth2/token) -> (token, 만료시각), 실패시 ('', None)"""
+        token_url = f"{self.base_url}/oauth2/token"
+        logger.debug(f"새 토큰 발급 시작 - URL: {token_url}")
+        headers = {"Content-Type": "application/json;charset=UTF-8"}
+        body = {
+            "grant_type": "client_credentials",
+            "appkey":    self.app_key,
+            "secretkey": "***"  # 보안상 마스킹
+        }
+        logger.debug(f"토큰 요청 헤더: {headers}")
+        logger.debug(f"토큰 요청 본문: {body}")
+        
+        try:
+            resp = self._post(token_url, TOKEN_API_ID, headers, {
                 "grant_type": "client_credentials",
                 "appkey":    self.app_key,
-                "secretkey": "***"  # 보안상 마스킹
-            }
-            logger.debug(f"토큰 요청 헤더: {headers}")
-            logger.debug(f"토큰 요청 본문: {body}")
+                "secretkey": self.app_secret
+            })
+            logger.debug(f"토큰 응답 상태코드: {resp.status_code}")
+            resp.raise_for_status()
+            data = resp.json()
+            logger.debug(f"토큰 응답 데이터 키: {list(data.keys())}")
             
+            token = data.get("token", "")
+            # 응답의 만료일시(expires_dt) 사용, 없으면 23시간
             try:
-                resp = requests.post(token_url, headers=headers, json={
-                    "grant_type": "client_credentials",
-                    "appkey":    self.app_key,
-                    "secretkey": self.app_secret
-                }, timeout=30)
-                logger.debug(f"토큰 응답 상태코드: {resp.status_code}")
-                resp.raise_for_status()
-                data = resp.json()
-                logger.debug(f"토큰 응답 데이터 키: {list(data.keys())}")
-                
-                self.access_token   = data.get("token", "")
-                self.token_expires_at = datetime.now() + timedelta(hours=23)
-                logger.info(f"새 토큰 발급 성공 - 만료시간: {self.token_expires_at}")
-                
-            except requests.exceptions.RequestException as e:
-                logger.error(f"토큰 발급 네트워크 오류: {e}", exc_info=True)
-                self.access_token = ""
-                self.token_expires_at = None
-            except Exception as e:
-                logger.error(f"토큰 발급 실패: {e}", exc_info=True)
-                self.access_token = ""
-                self.token_expires_at = None
-        else:
-            logger.debug("기존 토큰 재사용")
+                expires_at = datetime.strptime(data["expires_dt"], "%Y%m%d%H%M%S")
+            except (KeyError, TypeError, ValueError):
+                expires_at = datetime.now() + timedelta(hours=23)
+            logger.info(f"새 토큰 발급 성공 - 만료시간: {expires_at}")
+            return token, expires_at
             
-        return self.access_token
+        except requests.exceptions.RequestException as e:
+            logger.error(f"토큰 발급 네트워크 오류: {e}", exc_info=True)
+        except Exception as e:
+            logger.error(f"토큰 발급 실패: {e}", exc_info=True)
+        return "", None
+
+    def _post(self, url: str, api_id: str, headers: Dict[str, str], body: Dict[str, Any],
+              timeout: float = 30) -> requests.Response:
+        """
+        키움 REST 호출 (속도 제한 + 재시도)
+
+        - 한도 초과(429 / return_code 1700): 해당 api-id 감속 후 백오프 재시도
+        - 5xx, 연결 오류, 타임아웃: 백오프 재시도
+        - 토큰 오류(401 / 8005): 토큰 강제 갱신 후 1회 재시도
+        """
+        max_retries = Config.KIWOOM_MAX_RETRIES
+        token_refreshed = False
+        for attempt in range(max_retries + 1):
+            self.rate_limiter.acquire(api_id)
+            try:
+                resp = self.session.post(url, headers=headers, json=body, timeout=timeout)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                if attempt == max_retries:
+                    raise
+                delay = backoff_delay(attempt)
+                logger.warning(f"{api_id} 요청 실패 ({e.__class__.__name__}) - {delay:.2f}초 후 재시도 ({attempt + 1}/{max_retries})")
+                time.sleep(delay)
+                continue
+
+            return_code = self._return_code(resp)
+            if resp.status_code == 429 or return_code == THROTTLED_CODE:
+                self.rate_limiter.on_throttled(api_id, self._retry_after(resp))
+                if attempt == max_retries:
+                    return resp
+                time.sleep(backoff_delay(attempt))
+                continue
+
+            if resp.status_code >= 500 and attempt < max_retries:
+                delay = backoff_delay(attempt)
+                logger.warning(f"{api_id} 서버 오류 {resp.status_code} - {delay:.2f}초 후 재시도 ({attempt + 1}/{max_retries})")
+                time.sleep(delay)
+                continue
+
+            if ((resp.status_code == 401 or return_code in TOKEN_ERROR_CODES)
+                    and api_id != TOKEN_API_ID and not token_refreshed):
+                logger.warning(f"{api_id} 토큰 오류 - 토큰 갱신 후 재시도")
+                headers = dict(headers, authorization=f"Bearer {self.get_access_token(force_refresh=True)}")
+                token_refreshed = True
+                continue
+
+            self.rate_limiter.on_success(api_id)
+            return resp
+        return resp
+
+    @staticmethod
+    def _return_code(resp: requests.Response) -> Optional[int]:
+        """오류 응답의 return_code (큰 정상 응답은 두 번 파싱하지 않도록 건너뜀)"""
+        if len(resp.content) > 4096:
+            return None
+        try:
+            return int(resp.json().get("return_code"))
+        except (ValueError, TypeError, AttributeError):
+            return None
+
+    @staticmethod
+    def _retry_after(resp: requests.Response) -> Optional[float]:
+        try:
+            return float(resp.headers.get("Retry-After", ""))
+        except ValueError:
+            return None
 
     def get_ws_headers(self) -> Dict[str, str]:
         token = self.get_access_token()
@@ -177,13 +376,13 @@ class KiwoomAPIService:
                     logger.info(f"조건검색 seq={seq} 성공: {len(result)}개")
                     return result
                 logger.warning(f"조건검색 seq={seq} 시도 {attempt + 1} 실패, 재시도...")
-                await asyncio.sleep(2)  # 2초 대기 후 재시도
+                await asyncio.sleep(backoff_delay(attempt, base=1.0))
             except Exception as e:
                 logger.error(f"조건검색 seq={seq} 시도 {attempt + 1} 오류: {e}")
                 if attempt == max_retries - 1:  # 마지막 시도
                     logger.error(f"조건검색 seq={seq} 최종 실패")
                     return []
-                await asyncio.sleep(2)
+                await asyncio.sleep(backoff_delay(attempt, base=1.0))
         
         return []
     
@@ -260,21 +459,7 @@ class KiwoomAPIService:
                                 return all_results
 
                             data_list = msg.get("data", [])
-                            page = [
-                                {
-                                    "code":    d.get("9001"),
-                                    "name":    d.get("302"),
-                                    "current": d.get("10"),
-                                    "sign":    d.get("25"),
-                                    "change":  d.get("11"),
-                                    "rate":    d.get("12"),
-                                    "volume":  d.get("13"),
-                                    "open":    d.get("16"),
-                                    "high":    d.get("17"),
-                                    "low":     d.get("18")
-                                }
-                                for d in data_list
-                            ]
+                            page = parse_condition_rows(data_list)
                             all_results.extend(page)
                             logger.info(f"페이지 {page_num}: {len(page)}개 (총 {len(all_results)}개)")
 
@@ -318,7 +503,8 @@ class KiwoomAPIService:
                         stk_cd: str,
                         count: int = 60,
                         upd_stkpc_tp: str = "1",
-                        base_dt: Optional[str] = None) -> pd.DataFrame:
+                        base_dt: Optional[str] = None,
+                        since: Optional[str] = None) -> pd.DataFrame:
         """
         주식일봉차트조회 (ka10081)
         
@@ -326,8 +512,33 @@ class KiwoomAPIService:
         :param count: 최대 조회일수
         :param upd_stkpc_tp: 수정주가구분 (0: 원본, 1: 수정)
         :param base_dt: 기준일자 (YYYYMMDD), None이면 당일
-        :return: pandas.DataFrame
+        :param since: 시작일자 (YYYYMMDD) - 주어지면 count 대신 이 날짜까지만 연속조회
+        :return: pandas.DataFrame (최신순)
+        """
+        columns = self.get_daily_candle_arrays(stk_cd, count, upd_stkpc_tp, base_dt, since)
+        if not len(columns['date']):
+            return pd.DataFrame()
+        return chart_frame(stk_cd, columns)
+
+    def get_daily_candle_arrays(self,
+                                stk_cd: str,
+                                count: int = 60,
+                                upd_stkpc_tp: str = "1",
+                                base_dt: Optional[str] = None,
+                                since: Optional[str] = None) -> Dict[str, np.ndarray]:
+        """
+        주식일봉차트조회 (ka10081) - 컬럼 배열 (날짜 오름차순, DataFrame 변환 없음)
+
+        :return: {'date': int32 YYYYMMDD, 'open'/'high'/'low'/'close'/'volume'/'amount': int64}
         """
+        rows = self._fetch_chart_rows(stk_cd, count, upd_stkpc_tp, base_dt, since)
+        columns = parse_chart_rows(rows, since)
+        logger.info(f"일별 캔들 데이터 조회 완료: {stk_cd} {len(columns['date'])}개")
+        return columns
+
+    def _fetch_chart_rows(self, stk_cd: str, count: int, upd_stkpc_tp: str,
+                          base_dt: Optional[str], since: Optional[str]) -> List[Dict[str, Any]]:
+        """ka10081 연속조회 -> 원본 행 목록 (최신순), 실패시 빈 목록"""
         # 키움 API 주식일봉차트조회 엔드포인트
         url = f"{self.base_url}/api/dostk/chart"
         
@@ -339,11 +550,12 @@ class KiwoomAPIService:
         cont_yn = None
         next_key = None
         page_num = 1
+        seen_keys = set()
         
         try:
-            logger.info(f"일별 캔들 데이터 조회 시작: {stk_cd}, count={count}, base_dt={base_dt}")
+            logger.info(f"일별 캔들 데이터 조회 시작: {stk_cd}, count={count}, base_dt={base_dt}, since={since}")
             
-            while len(all_data) < count and page_num <= 20:  # 최대 20페이지
+            while since or len(all_data) < count:
                 
                 # 헤더 설정
                 headers = {
@@ -368,7 +580,7 @@ class KiwoomAPIService:
                 logger.info(f"페이지 {page_num} 요청 (cont-yn: {cont_yn})")
                 
                 # POST 요청
-                resp = requests.post(url, headers=headers, json=body, timeout=30)
+                resp = self._post(url, 'ka10081', headers, body)
                 
                 if resp.status_code != 200:
                     logger.error(f"HTTP 오류: {resp.status_code}, {resp.text}")
@@ -394,82 +606,73 @@ class KiwoomAPIService:
                 cont_yn = resp.headers.get('cont-yn')
                 next_key = resp.headers.get('next-key')
                 
+                # 시작일자까지 받았으면 종료 (응답은 최신순)
+                if since and min(str(d.get('dt', '')) for d in chart_data) <= since:
+                    logger.info("조회 완료 (시작일자 도달)")
+                    break
+                
                 # 연속조회가 필요없거나 충분한 데이터를 얻었으면 종료
-                if cont_yn != 'Y' or len(all_data) >= count:
+                if cont_yn != 'Y' or (not since and len(all_data) >= count):
                     logger.info("조회 완료")
                     break
                 
+                # 같은 연속조회 키가 다시 오면 무한 반복 방지
+                if not next_key or next_key in seen_keys:
+                    logger.warning(f"연속조회 키 이상 (next-key: {next_key}) - 조회 중단")
+                    break
+                seen_keys.add(next_key)
+
                 page_num += 1
             
-            # 요청한 개수만큼 자르기
-            sliced_data = all_data[:count]
-            
-            if not sliced_data:
-                logger.warning("조회된 데이터가 없습니다.")
-                return pd.DataFrame()
-            
-            # DataFrame 생성
-            df = pd.DataFrame(sliced_data)
-            logger.debug(f"원본 DataFrame 생성 완료 - 모양: {df.shape}, 컬럼: {list(df.columns)}")
-            
-            # 키움 API 응답 필드명에 맞게 컬럼 매핑
-            column_mapping = {
-                'dt': 'date',           # 일자
-                'open_pric': 'open',    # 시가
-                'high_pric': 'high',    # 고가
-                'low_pric': 'low',      # 저가
-                'cur_prc': 'close',     # 현재가(종가)
-                'trde_qty': 'volume'    # 거래량
-            }
-            
-            # 컬럼명 변경
-            available_columns = {k: v for k, v in column_mapping.items() if k in df.columns}
-            df = df.rename(columns=available_columns)
-            
-            df['stock_code'] = stk_cd
-            # 필요한 컬럼만 선택
-            required_columns = ['stock_code', 'date', 'open', 'high', 'low', 'close', 'volume']
-            available_required_columns = [col for col in required_columns if col in df.columns]
-            df = df[available_required_columns]
-            # 데이터 타입 변환
-            try:
-                # 날짜 변환
-                if 'date' in df.columns:
-                    df['date'] = pd.to_datetime(df['date'], format='%Y%m%d')
-                    
-                # 숫자 컬럼 변환
-                numeric_columns = ['open', 'high', 'low', 'close', 'volume']
-                for col in numeric_columns:
-                    if col in df.columns:
-                        df[col] = pd.to_numeric(df[col], errors='coerce')
-                        
-                # 날짜 기준 정렬 (최신순)
-                if 'date' in df.columns:
-                    df = df.sort_values('date', ascending=False).reset_index(drop=True)
-                    
-            except Exception as e:
-                logger.warning(f"데이터 타입 변환 중 오류: {e}")
-            
-            logger.info(f"일별 캔들 데이터 조회 완료: {len(df)}개")
-            logger.info(f"데이터 컬럼: {list(df.columns)}")
-            
-            # 기본 컬럼이 있는지 확인
-            required_columns = ['date', 'open', 'high', 'low', 'close', 'volume']
-            missing_columns = [col for col in required_columns if col not in df.columns]
-            if missing_columns:
-                logger.warning(f"누락된 컬럼: {missing_columns}")
-            
-            return df
+            # 요청한 개수만큼 자르기 (시작일자 조건은 파싱에서 적용)
+            return all_data if since else all_data[:count]
             
         except requests.exceptions.Timeout as e:
             logger.error(f"요청 타임아웃 (30초): {e}", exc_info=True)
-            return pd.DataFrame()
+            return []
         except requests.exceptions.ConnectionError as e:
             logger.error(f"연결 오류: {e}", exc_info=True)
-            return pd.DataFrame()
+            return []
         except requests.exceptions.RequestException as e:
             logger.error(f"네트워크 오류: {e}", exc_info=True)
-            return pd.DataFrame()
+            return []
         except Exception as e:
             logger.error(f"일별 캔들 조회 예상치 못한 오류: {e}", exc_info=True)
-            return pd.DataFrame()
\ No newline at end of file
+            return []
+
+    def get_daily_candles_many(self,
+                               stock_codes: Iterable[str],
+                               count: int = 60,
+                               upd_stkpc_tp: str = "1",
+                               base_dt: Optional[str] = None,
+                               max_workers: Optional[int] = None,
+                               since: Optional[Dict[str, str]] = None,
+                               arrays: bool = False) -> Iterator[Tuple[str, Any]]:
+        """
+        여러 종목 일봉 동시 조회 (완료되는 순서대로 반환)
+
+        :param stock_codes: 종목코드 목록
+        :param max_workers: 동시 요청 수 (기본 Config.KIWOOM_MAX_CONCURRENCY)
+        :param since: 종목별 시작일자 (YYYYMMDD) - 있는 종목은 그 날짜 이후만 조회
+        :param arrays: True면 DataFrame 대신 get_daily_candle_arrays 결과 반환
+        :return: (종목코드, DataFrame) 이터레이터 - 실패한 종목은 빈 DataFrame (arrays면 빈 배열)
+        """
+        codes = list(dict.fromkeys(stock_codes))
+        if not codes:
+            return
+        max_workers = max_workers or Config.KIWOOM_MAX_CONCURRENCY
+        since = since or {}
+
+        # 워커들이 동시에 토큰을 발급받지 않도록 미리 확보
+        self.get_access_token()
+
+        fetch = self.get_daily_candle_arrays if arrays else self.get_daily_candles
+
+        logger.info(f"일봉 동시 조회 시작: {len(codes)}종목, 동시 요청 {max_workers}개")
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="kiwoom-candle") as pool:
+            futures = {
+                pool.submit(fetch, code, count, upd_stkpc_tp, base_dt, since.get(code)): code
+                for code in codes
+            }
+            for future in as_completed(futures):
+                yield futures[future], future.result()
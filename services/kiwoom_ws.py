@@ -0,0 +1,279 @@
+# services/kiwoom_ws.py
+
+import json
+import logging
+import asyncio
+import websockets
+
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+from config import Config
+from services.kiwoom_service import KiwoomAPIService, THROTTLED_CODE, parse_condition_rows
+from services.rate_limiter import backoff_delay
+
+logger = logging.getLogger(__name__)
+
+# 응답 대기 시간 (초)
+LOGIN_TIMEOUT = 10.0
+RESPONSE_TIMEOUT = 30.0
+
+MessageListener = Callable[[Dict[str, Any]], Awaitable[None]]
+
+
+class KiwoomWebSocketSession:
+    """키움 WebSocket 세션 (로그인 1회, 요청 다중화)
+
+    - 연결 후 LOGIN과 CNSRLST를 한 번만 수행하고 조건식 목록을 캐시한다.
+    - 수신 전용 태스크가 PING에 응답하고, 응답을 (trnm, seq) 기준으로 대기 중인 요청자에게 전달한다.
+    - 요청자가 없는 메시지(실시간 이벤트 등)는 등록된 리스너로 전달한다.
+
+    사용 예:
+        async with KiwoomWebSocketSession(service) as session:
+            results = await session.request_conditions(["1", "2"])
+    """
+
+    def __init__(self, service: KiwoomAPIService, max_inflight: Optional[int] = None):
+        self.service = service
+        self.url = service.wss_url
+        self.ws = None
+        self.condition_list: Optional[List[Dict[str, Any]]] = None
+
+        self._reader_task: Optional[asyncio.Task] = None
+        self._login_future: Optional[asyncio.Future] = None
+        self._pending: Dict[str, List[Tuple[str, asyncio.Future]]] = {}
+        self._seq_locks: Dict[str, asyncio.Lock] = {}
+        self._connect_lock = asyncio.Lock()
+        self._send_lock = asyncio.Lock()
+        self._inflight = asyncio.Semaphore(max_inflight or Config.KIWOOM_WS_MAX_INFLIGHT)
+        self._listeners: List[MessageListener] = []
+
+    async def __aenter__(self) -> 'KiwoomWebSocketSession':
+        await self.connect()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    @property
+    def connected(self) -> bool:
+        return self.ws is not None and not self.ws.closed
+
+    def add_listener(self, listener: MessageListener):
+        """요청자가 없는 메시지 수신 콜백 등록 (예: 실시간 조건검색 이벤트)"""
+        self._listeners.append(listener)
+
+    async def connect(self):
+        """연결 및 로그인 (이미 연결되어 있으면 무시)"""
+        async with self._connect_lock:
+            if self.connected:
+                return
+
+            self.ws = await websockets.connect(
+                self.url,
+                extra_headers=self.service.get_ws_headers(),
+                ping_interval=20,
+                ping_timeout=10,
+                close_timeout=5,
+                max_size=10**7
+            )
+            loop = asyncio.get_running_loop()
+            self._login_future = loop.create_future()
+            self._reader_task = asyncio.create_task(self._reader())
+
+            await self._send({"trnm": "LOGIN", "token": self.service.get_access_token()})
+            try:
+                msg = await asyncio.wait_for(self._login_future, timeout=LOGIN_TIMEOUT)
+            except asyncio.TimeoutError:
+                await self.close()
+                raise ConnectionError(f"로그인 응답 타임아웃 ({LOGIN_TIMEOUT:.0f}초)")
+
+            if msg.get("return_code") != 0:
+                await self.close()
+                raise ConnectionError(f"로그인 실패 - 코드: {msg.get('return_code')}, 메시지: {msg.get('return_msg')}")
+            logger.info("WebSocket 세션 로그인 성공")
+
+        # 조건검색 전에 목록 조회가 필요하므로 연결마다 한 번 수행
+        await self.get_condition_list(refresh=True)
+
+    async def close(self):
+        """연결 종료 및 대기 중인 요청 실패 처리"""
+        if self.ws is not None:
+            await self.ws.close()
+        if self._reader_task is not None and self._reader_task is not asyncio.current_task():
+            self._reader_task.cancel()
+            try:
+                await self._reader_task
+            except (asyncio.CancelledError, Exception):
+                pass
+        self._reader_task = None
+        self._fail_pending(ConnectionError("WebSocket 세션 종료"))
+
+    async def wait_closed(self):
+        """수신 루프가 끝날 때까지 대기 (연결 종료 감지용)"""
+        if self._reader_task is not None:
+            try:
+                await asyncio.shield(self._reader_task)
+            except Exception:
+                pass
+
+    async def _send(self, msg: Dict[str, Any]):
+        async with self._send_lock:
+            await self.ws.send(json.dumps(msg))
+
+    async def _reader(self):
+        """수신 루프: PING 응답, LOGIN/요청 응답 라우팅, 나머지는 리스너로 전달"""
+        try:
+            async for raw in self.ws:
+                try:
+                    msg = json.loads(raw)
+                except json.JSONDecodeError:
+                    logger.warning(f"JSON 파싱 실패: {str(raw)[:200]}...")
+                    continue
+
+                trnm = msg.get("trnm")
+                if trnm == "PING":
+                    await self._send(msg)
+                    continue
+                if trnm == "LOGIN":
+                    if self._login_future is not None and not self._login_future.done():
+                        self._login_future.set_result(msg)
+                    continue
+                if self._resolve(trnm, msg):
+                    continue
+
+                for listener in self._listeners:
+                    try:
+                        await listener(msg)
+                    except Exception as e:
+                        logger.error(f"WebSocket 리스너 오류: {e}", exc_info=True)
+        except websockets.exceptions.ConnectionClosed as e:
+            logger.warning(f"WebSocket 세션 연결 종료: {e}")
+        finally:
+            self._fail_pending(ConnectionError("WebSocket 연결 종료"))
+
+    def _resolve(self, trnm: Optional[str], msg: Dict[str, Any]) -> bool:
+        """
+        응답을 대기 중인 요청에 전달 (seq가 같은 요청, seq 없는 응답만 가장 오래된 요청)
+
+        seq가 있는데 대기 중인 요청이 없으면(이미 타임아웃된 요청의 늦은 응답) 다른 seq에 넘기지 않고 버린다.
+        """
+        waiters = self._pending.get(trnm)
+        if not waiters:
+            return False
+
+        seq = str(msg.get("seq", "")).strip()
+        if seq:
+            index = next((i for i, (s, _) in enumerate(waiters) if s == seq), None)
+            if index is None:
+                logger.warning(f"대기 요청 없는 {trnm} 응답 무시 (seq={seq}, 타임아웃 후 도착)")
+                return True
+        else:
+            index = 0
+        _, future = waiters.pop(index)
+        if not future.done():
+            future.set_result(msg)
+        return True
+
+    def _fail_pending(self, error: Exception):
+        for waiters in self._pending.values():
+            for _, future in waiters:
+                if not future.done():
+                    future.set_exception(error)
+        self._pending.clear()
+
+    async def send_request(self, msg: Dict[str, Any], timeout: float = RESPONSE_TIMEOUT) -> Dict[str, Any]:
+        """요청 전송 후 같은 trnm(+seq) 응답 대기 (REST와 같은 속도 제한, 한도 초과시 백오프 재시도)"""
+        limiter = self.service.rate_limiter
+        trnm = msg["trnm"]
+        max_retries = Config.KIWOOM_MAX_RETRIES
+        for attempt in range(max_retries + 1):
+            await limiter.acquire_async(trnm)
+            reply = await self._send_and_wait(msg, timeout)
+            if reply.get("return_code") != THROTTLED_CODE:
+                limiter.on_success(trnm)
+                return reply
+            limiter.on_throttled(trnm)
+            if attempt < max_retries:
+                await asyncio.sleep(backoff_delay(attempt))
+        return reply
+
+    async def _send_and_wait(self, msg: Dict[str, Any], timeout: float) -> Dict[str, Any]:
+        if not self.connected:
+            await self.connect()
+
+        trnm = msg["trnm"]
+        seq = str(msg.get("seq", ""))
+        future = asyncio.get_running_loop().create_future()
+        async with self._inflight:
+            # 보내기 직전에 등록 (세마포어를 기다리는 요청이 앞선 응답을 가로채지 않도록)
+            waiters = self._pending.setdefault(trnm, [])
+            waiters.append((seq, future))
+            try:
+                await self._send(msg)
+                return await asyncio.wait_for(future, timeout=timeout)
+            finally:
+                if (seq, future) in waiters:
+                    waiters.remove((seq, future))
+
+    async def get_condition_list(self, refresh: bool = False) -> List[Dict[str, Any]]:
+        """조건검색식 목록 (세션 캐시)"""
+        if self.condition_list is not None and not refresh:
+            return self.condition_list
+
+        msg = await self.send_request({"trnm": "CNSRLST"})
+        if msg.get("return_code") != 0:
+            raise RuntimeError(f"조건식 목록 조회 실패 - 코드: {msg.get('return_code')}, 메시지: {msg.get('return_msg')}")
+
+        self.condition_list = [{"seq": int(item[0]), "name": item[1]} for item in msg.get("data", [])]
+        logger.info(f"조건검색 목록 조회 성공: {len(self.condition_list)}개")
+        return self.condition_list
+
+    async def request_condition(self, seq: str, max_retries: int = 3) -> List[Dict[str, str]]:
+        """조건검색 요청 (페이징, 연결 끊김시 재연결 후 재시도)"""
+        seq = str(seq)
+        lock = self._seq_locks.setdefault(seq, asyncio.Lock())
+
+        async with lock:  # 같은 seq의 연속조회는 순서대로
+            for attempt in range(max_retries):
+                try:
+                    results = await self._request_condition_pages(seq)
+                    logger.info(f"조건검색 seq={seq} 성공: {len(results)}개")
+                    return results
+                except (ConnectionError, asyncio.TimeoutError, websockets.exceptions.WebSocketException) as e:
+                    logger.warning(f"조건검색 seq={seq} 시도 {attempt + 1}/{max_retries} 실패: {e}")
+                    if attempt == max_retries - 1:
+                        logger.error(f"조건검색 seq={seq} 최종 실패")
+                        return []
+                    await asyncio.sleep(backoff_delay(attempt, base=1.0))
+                    await self.connect()
+        return []
+
+    async def _request_condition_pages(self, seq: str) -> List[Dict[str, str]]:
+        all_results: List[Dict[str, str]] = []
+        cont_yn = "N"
+        next_key = ""
+
+        while True:
+            msg = await self.send_request({
+                "trnm":        "CNSRREQ",
+                "seq":         seq,
+                "search_type": "0",
+                "stex_tp":     "K",
+                "cont_yn":     cont_yn,
+                "next_key":    next_key
+            })
+            if msg.get("return_code") != 0:
+                logger.error(f"조건검색 seq={seq} 실패: {msg.get('return_msg')}")
+                return all_results
+
+            all_results.extend(parse_condition_rows(msg.get("data", [])))
+
+            if msg.get("cont_yn") == "Y" and msg.get("next_key"):
+                cont_yn = "Y"
+                next_key = msg.get("next_key")
+                continue
+            return all_results
+
+    async def request_conditions(self, seqs: List[str]) -> Dict[str, List[Dict[str, str]]]:
+        """여러 조건식을 동시에 요청 (seq별 결과 딕셔너리)"""
+        results = await asyncio.gather(*(self.request_condition(seq) for seq in seqs))
+        return dict(zip(map(str, seqs), results))
@@ -0,0 +1,137 @@
+import asyncio
+import logging
+import random
+import threading
+import time
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# 모든 요청이 함께 쓰는 전체 예산 키
+GLOBAL_KEY = '*'
+
+
+def parse_rate_limits(spec: str) -> Dict[str, float]:
+    """'ka10081=5,CNSRREQ=5,*=10' -> {'ka10081': 5.0, ...}"""
+    limits = {}
+    for item in (spec or '').split(','):
+        key, sep, value = item.strip().partition('=')
+        if sep and key:
+            limits[key.strip()] = float(value)
+    return limits
+
+
+def backoff_delay(attempt: int, base: float = 0.5, cap: float = 30.0) -> float:
+    """지수 백오프 + full jitter (attempt는 0부터)"""
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+class _Bucket:
+    def __init__(self, rate: float):
+        self.max_rate = rate
+        self.rate = rate
+        self.ceiling = rate  # 한도 초과가 난 속도 기준으로 학습한 상한
+        self.tokens = max(1.0, rate)
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+
+    def refill(self, now: float):
+        self.tokens = min(max(1.0, self.rate), self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+
+class AdaptiveRateLimiter:
+    """api-id별 토큰 버킷 (REST/WebSocket 공용, 스레드/코루틴 모두 사용)
+
+    - 호출자는 acquire()로 자리를 예약하고, 필요한 만큼만 기다린다 (잠금 밖에서 대기).
+    - '*' 예산이 있으면 모든 요청이 해당 키 버킷과 전체 버킷을 함께 소모한다.
+    - 한도 초과 응답(on_throttled)을 받으면 그 속도의 90%를 학습 상한으로 두고, 속도를 절반으로
+      줄여 잠시 멈춘다. 성공(on_success)할 때마다 학습 상한까지 빠르게 되돌리고, 상한 자체는
+      설정 한도를 향해 천천히 올려 실제 허용량을 다시 탐색한다 (AIMD).
+    """
+
+    def __init__(self, limits: Dict[str, float], default_rate: float = 0.0,
+                 min_rate: float = 0.2, recovery: float = 0.05, probe: float = 0.002):
+        """
+        :param limits: 키별 초당 요청 수 (없는 키는 default_rate, 0이면 무제한)
+        :param min_rate: 줄일 수 있는 최저 속도
+        :param recovery: 성공 1회당 속도 회복량 (설정 한도 대비 비율)
+        :param probe: 성공 1회당 학습 상한 증가량 (설정 한도 대비 비율)
+        """
+        self.limits = dict(limits)
+        self.default_rate = default_rate
+        self.min_rate = min_rate
+        self.recovery = recovery
+        self.probe = probe
+        self._buckets: Dict[str, _Bucket] = {}
+        self._lock = threading.Lock()
+        self.stats: Dict[str, int] = {}
+
+    def _bucket(self, key: str) -> Optional[_Bucket]:
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            rate = self.limits.get(key, self.default_rate)
+            if not rate:
+                return None
+            bucket = self._buckets[key] = _Bucket(rate)
+        return bucket
+
+    def _reserve(self, key: str) -> float:
+        """키 버킷과 전체 버킷에서 1개씩 예약 -> 대기 시간(초)"""
+        now = time.monotonic()
+        wait = 0.0
+        with self._lock:
+            for bucket_key in (key, GLOBAL_KEY):
+                bucket = self._bucket(bucket_key)
+                if bucket is None:
+                    continue
+                bucket.refill(now)
+                bucket.tokens -= 1
+                if bucket.tokens < 0:
+                    wait = max(wait, -bucket.tokens / bucket.rate)
+                wait = max(wait, bucket.blocked_until - now)
+            if wait > 0:
+                self.stats[f'{key}:waits'] = self.stats.get(f'{key}:waits', 0) + 1
+        return wait
+
+    def acquire(self, key: str):
+        """동기 호출용 (REST 스레드)"""
+        wait = self._reserve(key)
+        if wait > 0:
+            time.sleep(wait)
+
+    async def acquire_async(self, key: str):
+        """비동기 호출용 (WebSocket)"""
+        wait = self._reserve(key)
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def on_success(self, key: str):
+        with self._lock:
+            for bucket_key in (key, GLOBAL_KEY):
+                bucket = self._buckets.get(bucket_key)
+                if bucket is None:
+                    continue
+                bucket.ceiling = min(bucket.max_rate, bucket.ceiling + bucket.max_rate * self.probe)
+                bucket.rate = min(bucket.ceiling, bucket.rate + bucket.max_rate * self.recovery)
+
+    def on_throttled(self, key: str, retry_after: Optional[float] = None):
+        """한도 초과 응답: 속도 절반, retry_after(없으면 1/속도)초 동안 정지"""
+        now = time.monotonic()
+        with self._lock:
+            self.stats[f'{key}:throttled'] = self.stats.get(f'{key}:throttled', 0) + 1
+            bucket = self._bucket(key)
+            if bucket is None:
+                # 한도를 모르는 키가 제한에 걸리면 그때부터 관리
+                bucket = self._buckets[key] = _Bucket(max(self.min_rate, 1.0))
+            bucket.refill(now)
+            bucket.ceiling = max(self.min_rate, min(bucket.ceiling, bucket.rate * 0.9))
+            bucket.rate = max(self.min_rate, bucket.rate / 2)
+            bucket.tokens = min(bucket.tokens, 0.0)
+            bucket.blocked_until = max(bucket.blocked_until, now + (retry_after or 1.0 / bucket.rate))
+            rate = bucket.rate
+        logger.warning(f"요청 한도 초과 ({key}) - 속도 {rate:.2f}/초로 감속")
+
+    def rate(self, key: str) -> Optional[float]:
+        bucket = self._buckets.get(key)
+        return bucket.rate if bucket is not None else None
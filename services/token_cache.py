@@ -0,0 +1,90 @@
+import json
+import logging
+import os
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Callable, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows 개발 환경: 프로세스간 잠금 없이 동작
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+TokenIssuer = Callable[[], Tuple[str, Optional[datetime]]]
+
+
+class TokenCache:
+    """프로세스/워커 공용 접근 토큰 캐시 (파일 잠금 로컬 저장소)
+
+    - 읽기는 잠금 없이 파일을 읽고, 만료 refresh_margin 전까지 그대로 사용한다.
+    - 갱신은 배타적 파일 잠금을 잡은 프로세스 하나만 수행한다. 잠금을 기다린 다른
+      워커는 잠금 획득 후 파일을 다시 읽어 이미 갱신된 토큰을 사용한다.
+    """
+
+    def __init__(self, path: str, refresh_margin: timedelta = timedelta(hours=1)):
+        self.path = path
+        self.lock_path = f"{path}.lock"
+        self.refresh_margin = refresh_margin
+
+    def _read(self) -> Tuple[str, Optional[datetime]]:
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            return data.get('token', ''), datetime.fromisoformat(data['expires_at'])
+        except (OSError, ValueError, KeyError):
+            return '', None
+
+    def _write(self, token: str, expires_at: datetime):
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'token': token, 'expires_at': expires_at.isoformat(),
+                       'issued_at': datetime.now().isoformat(), 'pid': os.getpid()}, f)
+        os.chmod(tmp_path, 0o600)
+        os.replace(tmp_path, self.path)
+
+    def _is_fresh(self, token: str, expires_at: Optional[datetime]) -> bool:
+        return bool(token) and expires_at is not None and datetime.now() < expires_at - self.refresh_margin
+
+    @contextmanager
+    def _exclusive(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(self.lock_path, 'a') as lock_file:
+            if fcntl:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def get(self, issue: TokenIssuer, force_refresh: bool = False,
+            stale_token: Optional[str] = None) -> Tuple[str, Optional[datetime]]:
+        """
+        캐시된 토큰 반환, 만료 임박시 잠금을 잡고 한 번만 발급
+
+        :param issue: 토큰 발급 함수 -> (token, expires_at)
+        :param force_refresh: 강제 갱신 (stale_token과 같은 토큰일 때만 재발급)
+        :param stale_token: 호출자가 거부당한 토큰 (다른 워커가 이미 바꿨으면 재발급하지 않음)
+        """
+        token, expires_at = self._read()
+        if not force_refresh and self._is_fresh(token, expires_at):
+            return token, expires_at
+
+        with self._exclusive():
+            token, expires_at = self._read()
+            replaced = force_refresh and stale_token is not None and token != stale_token
+            if self._is_fresh(token, expires_at) and (not force_refresh or replaced):
+                logger.debug("다른 워커가 갱신한 토큰 사용")
+                return token, expires_at
+
+            token, expires_at = issue()
+            if token and expires_at:
+                try:
+                    self._write(token, expires_at)
+                except OSError as e:
+                    logger.warning(f"토큰 캐시 저장 실패: {e}")
+            return token, expires_at
@@ -0,0 +1,314 @@
+import logging
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from services.turtle_calculator import TurtleCalculator, TurtleParams
+
+# 손절/익절/추가매수 도달일 탐색 시 한 번에 확인하는 일수
+SCAN_CHUNK = 32
+
+
+@dataclass
+class BacktestResult:
+    """백테스트 결과"""
+    trades: pd.DataFrame
+    equity: pd.Series
+    summary: Dict = field(default_factory=dict)
+
+
+def _next_true_index(mask: np.ndarray) -> np.ndarray:
+    """각 위치에서 처음으로 True가 되는 인덱스 (자기 자신 포함, 없으면 n_days)"""
+    n_days = mask.shape[1]
+    idx = np.where(mask, np.arange(n_days), n_days)
+    return np.minimum.accumulate(idx[:, ::-1], axis=1)[:, ::-1]
+
+
+def _first_hit(values: np.ndarray, sym: np.ndarray, start: np.ndarray, end: np.ndarray,
+               threshold: np.ndarray, above: bool) -> np.ndarray:
+    """
+    종목별 [start, end] 구간에서 values가 threshold에 처음 도달한 인덱스 (없으면 n_days)
+
+    above=True면 values >= threshold, False면 values <= threshold를 찾는다.
+    모든 종목을 SCAN_CHUNK일씩 함께 확인하고, 찾았거나 구간이 끝난 종목은 제외한다.
+    """
+    n_days = values.shape[1]
+    result = np.full(len(sym), n_days, dtype=np.int64)
+    pending = np.flatnonzero(start <= end)
+    offset = 0
+    while pending.size:
+        day = start[pending, None] + np.arange(offset, offset + SCAN_CHUNK)
+        in_range = day <= end[pending, None]
+        window = values[sym[pending, None], np.minimum(day, n_days - 1)]
+        if above:
+            hit = (window >= threshold[pending, None]) & in_range
+        else:
+            hit = (window <= threshold[pending, None]) & in_range
+
+        found = hit.any(axis=1)
+        result[pending[found]] = start[pending[found]] + offset + np.argmax(hit[found], axis=1)
+
+        offset += SCAN_CHUNK
+        pending = pending[~found & (start[pending] + offset <= end[pending])]
+    return result
+
+
+def _forward_fill(values: np.ndarray) -> np.ndarray:
+    """마지막 축 기준 NaN 앞값 채우기"""
+    idx = np.where(~np.isnan(values), np.arange(values.shape[1]), 0)
+    np.maximum.accumulate(idx, axis=1, out=idx)
+    return values[np.arange(values.shape[0])[:, None], idx]
+
+
+class TurtleBacktester:
+    """터틀 System 1 / System 2 유니버스 백테스터 (롱 전용)
+
+    - 진입: 종가가 전일 기준 N일 최고가 돌파 (System 1: 20일, System 2: 55일)
+    - 손절: 진입가 - 2N, 익절: 진입가 + 4N / 6N (장중 고가/저가 기준, 같은 날이면 손절 우선)
+    - 트레일링: 종가가 전일 기준 청산 채널 하단 (10일 / 20일) 이탈시 종가 청산
+    - 피라미딩: max_units > 1이면 진입가 + k * 0.5N 도달시 유닛 추가 (손절/익절은 첫 진입 기준)
+    - 종목당 동시 포지션 1개, 유닛 크기는 1N 변동이 초기자본 * risk_per_trade가 되도록 고정
+
+    일자 루프 대신 "거래 세대" 단위로 반복한다. 한 번의 반복에서 모든 종목의 다음 진입과
+    청산을 배열 연산으로 찾으므로 반복 횟수는 종목당 최대 거래 수에 비례한다.
+    """
+
+    def __init__(self, calculator: Optional[TurtleCalculator] = None):
+        self.calculator = calculator or TurtleCalculator()
+        self.logger = logging.getLogger(__name__)
+
+    def run(self, stock_codes: Sequence[str], dates: Sequence, high: np.ndarray, low: np.ndarray,
+            close: np.ndarray, system_type: int = 1, params: Optional[TurtleParams] = None,
+            initial_capital: float = 100_000_000, risk_per_trade: float = 0.01,
+            indicators: Optional[Dict[str, np.ndarray]] = None) -> BacktestResult:
+        """
+        백테스트 실행
+
+        :param stock_codes: 종목코드 (블록의 행 순서)
+        :param dates: 일자 (블록의 열 순서, 오름차순)
+        :param high: 고가 블록 (종목 x 일자, 거래 없는 날은 NaN)
+        :param low: 저가 블록
+        :param close: 종가 블록
+        :param system_type: 1 또는 2 (params가 없으면 해당 시스템 기본값 사용)
+        :param params: 시스템 파라미터
+        :param initial_capital: 초기 자본
+        :param risk_per_trade: 유닛당 1N 위험 비율
+        :param indicators: 미리 계산한 calculate_indicator_block 결과 (파라미터 스윕 재사용용)
+        :return: BacktestResult (거래 내역, 일별 자산곡선, 요약 통계)
+        """
+        params = params or self.calculator.params[system_type]
+        high = np.asarray(high, dtype=float)
+        low = np.asarray(low, dtype=float)
+        close = np.asarray(close, dtype=float)
+        n_symbols, n_days = close.shape
+
+        if indicators is None:
+            indicators = self.calculator.calculate_indicator_block(
+                high, low, close, (params.entry_period, params.exit_period))
+        atr = indicators['atr_20']
+        entry_high = indicators[f'donchian_high_{params.entry_period}']
+        exit_low = indicators[f'donchian_low_{params.exit_period}']
+
+        # 전일 채널 기준 진입/트레일링 청산 신호
+        entry_signal = np.zeros(close.shape, dtype=bool)
+        entry_signal[:, 1:] = (close[:, 1:] > entry_high[:, :-1]) & ~np.isnan(atr[:, 1:])
+        exit_signal = np.zeros(close.shape, dtype=bool)
+        exit_signal[:, 1:] = close[:, 1:] < exit_low[:, :-1]
+
+        next_entry = _next_true_index(entry_signal)
+        next_exit = _next_true_index(exit_signal)
+
+        valid_close = ~np.isnan(close)
+        last_valid = np.where(valid_close.any(axis=1),
+                              n_days - 1 - np.argmax(valid_close[:, ::-1], axis=1), -1)
+
+        unit_risk = initial_capital * risk_per_trade
+        rows = np.arange(n_symbols)
+        pointer = np.zeros(n_symbols, dtype=np.int64)
+        generations: List[Dict[str, np.ndarray]] = []
+
+        while True:
+            active = pointer < n_days
+            entry_idx = np.full(n_symbols, n_days, dtype=np.int64)
+            entry_idx[active] = next_entry[rows[active], pointer[active]]
+            active = entry_idx < n_days
+            if not active.any():
+                break
+
+            sym = rows[active]
+            e = entry_idx[active]
+            entry_price = close[sym, e]
+            entry_atr = atr[sym, e]
+            stop_loss = entry_price - params.stop_atr * entry_atr
+            take_profit = entry_price + params.take_profit_atr * entry_atr
+
+            # 트레일링 청산 후보 (없으면 마지막 거래일에 미청산 처리)
+            channel_exit = np.full(len(sym), n_days, dtype=np.int64)
+            has_next = e + 1 < n_days
+            channel_exit[has_next] = next_exit[sym[has_next], e[has_next] + 1]
+            horizon = np.minimum(channel_exit, last_valid[sym])
+
+            # 손절/익절: 진입 다음 날부터 horizon까지 첫 도달일
+            stop_day = _first_hit(low, sym, e + 1, horizon, stop_loss, above=False)
+            target_day = _first_hit(high, sym, e + 1, horizon, take_profit, above=True)
+            exit_idx = np.minimum(np.minimum(stop_day, target_day), horizon)
+
+            exit_reason = np.where(channel_exit <= last_valid[sym], 'TRAILING', 'OPEN').astype(object)
+            exit_price = close[sym, exit_idx]
+            is_target = (target_day == exit_idx) & (target_day < stop_day)
+            is_stop = stop_day == exit_idx
+            exit_price = np.where(is_target, take_profit, np.where(is_stop, stop_loss, exit_price))
+            exit_reason[is_target] = 'TAKE_PROFIT'
+            exit_reason[is_stop] = 'STOP_LOSS'
+
+            # 추가 유닛: 청산 전날까지 진입가 + k * add_atr * N 도달시 추가
+            add_days = []
+            for unit in range(1, params.max_units):
+                add_price = entry_price + unit * params.add_atr * entry_atr
+                add_day = _first_hit(high, sym, e + 1, exit_idx - 1, add_price, above=True)
+                add_days.append(np.where(add_day < exit_idx, add_day, -1))
+
+            generations.append({
+                'symbol': sym, 'entry_idx': e, 'exit_idx': exit_idx,
+                'entry_price': entry_price, 'exit_price': exit_price, 'atr_20': entry_atr,
+                'stop_loss': stop_loss, 'take_profit': take_profit, 'exit_reason': exit_reason,
+                'add_idx': np.stack(add_days, axis=1) if add_days else np.empty((len(sym), 0), dtype=np.int64),
+            })
+
+            pointer[sym] = exit_idx + 1
+
+        trades = self._build_trades(generations, stock_codes, dates, system_type, params, unit_risk)
+        equity = self._build_equity(trades, dates, close, initial_capital, params)
+        summary = self._summarize(trades, equity, initial_capital)
+
+        self.logger.info(f"System {system_type} 백테스트 완료: {n_symbols}종목 x {n_days}일, "
+                         f"{summary['trades']}건 거래, 승률 {summary['win_rate']:.1f}%")
+        return BacktestResult(trades=trades, equity=equity, summary=summary)
+
+    def run_from_db(self, db_handler, system_type: int = 1, start_date=None, end_date=None,
+                    **kwargs) -> BacktestResult:
+        """daily_candle 전체 이력으로 백테스트"""
+        stock_codes, dates, block = db_handler.get_candle_history_block(start_date, end_date)
+        return self.run(stock_codes, dates, block['high'], block['low'], block['close'],
+                        system_type=system_type, **kwargs)
+
+    def _build_trades(self, generations: List[Dict[str, np.ndarray]], stock_codes: Sequence[str],
+                      dates: Sequence, system_type: int, params: TurtleParams,
+                      unit_risk: float) -> pd.DataFrame:
+        """세대별 배열을 거래 내역 DataFrame으로 변환"""
+        columns = ['stock_code', 'system_type', 'entry_date', 'exit_date', 'entry_price', 'exit_price',
+                   'atr_20', 'stop_loss', 'take_profit', 'exit_reason', 'holding_days', 'units', 'quantity',
+                   'return_pct', 'r_multiple', 'profit_loss', 'entry_idx', 'exit_idx', 'symbol_idx']
+        if not generations:
+            return pd.DataFrame(columns=columns)
+
+        merged = {key: np.concatenate([g[key] for g in generations]) for key in generations[0]}
+        codes = np.asarray(stock_codes, dtype=object)
+        dates = np.asarray(dates)
+
+        quantity = unit_risk / merged['atr_20']
+        price_change = merged['exit_price'] - merged['entry_price']
+
+        # 추가 유닛 손익 (유닛 k의 진입가 = 진입가 + k * add_atr * N)
+        add_idx = merged['add_idx']
+        added = add_idx >= 0
+        unit_steps = np.arange(1, add_idx.shape[1] + 1) * params.add_atr
+        add_change = price_change[:, None] - unit_steps * merged['atr_20'][:, None]
+        total_change = price_change + np.where(added, add_change, 0.0).sum(axis=1)
+
+        trades = pd.DataFrame({
+            'stock_code': codes[merged['symbol']],
+            'system_type': system_type,
+            'entry_date': dates[merged['entry_idx']],
+            'exit_date': dates[merged['exit_idx']],
+            'entry_price': merged['entry_price'],
+            'exit_price': merged['exit_price'],
+            'atr_20': merged['atr_20'],
+            'stop_loss': merged['stop_loss'],
+            'take_profit': merged['take_profit'],
+            'exit_reason': merged['exit_reason'],
+            'holding_days': merged['exit_idx'] - merged['entry_idx'],
+            'units': 1 + added.sum(axis=1),
+            'quantity': quantity,
+            'return_pct': price_change / merged['entry_price'] * 100,
+            'r_multiple': price_change / (params.stop_atr * merged['atr_20']),
+            'profit_loss': quantity * total_change,
+            'entry_idx': merged['entry_idx'],
+            'exit_idx': merged['exit_idx'],
+            'symbol_idx': merged['symbol'],
+        })
+        for unit in range(add_idx.shape[1]):
+            trades[f'add_idx_{unit + 1}'] = add_idx[:, unit]
+        return trades.sort_values(['entry_date', 'stock_code']).reset_index(drop=True)
+
+    def _build_equity(self, trades: pd.DataFrame, dates: Sequence, close: np.ndarray,
+                      initial_capital: float, params: TurtleParams) -> pd.Series:
+        """보유 수량 차분 배열로 일별 평가손익을 계산해 자산곡선 생성"""
+        n_symbols, n_days = close.shape
+        if trades.empty:
+            return pd.Series(initial_capital, index=pd.Index(dates, name='date'), name='equity')
+
+        sym = trades['symbol_idx'].to_numpy()
+        exit_idx = trades['exit_idx'].to_numpy()
+        quantity = trades['quantity'].to_numpy()
+        atr = trades['atr_20'].to_numpy()
+        filled = _forward_fill(close)
+
+        # 유닛별 (진입일, 진입가): 첫 유닛 + 추가 유닛
+        units = [(trades['entry_idx'].to_numpy(), trades['entry_price'].to_numpy())]
+        for unit in range(1, params.max_units):
+            units.append((trades[f'add_idx_{unit}'].to_numpy(),
+                          trades['entry_price'].to_numpy() + unit * params.add_atr * atr))
+
+        # 유닛 진입 다음 날 ~ 청산일까지 보유 (종목당 포지션이 겹치지 않으므로 차분 누적으로 충분)
+        held = np.zeros((n_symbols, n_days + 1))
+        daily_pnl = np.zeros(n_days)
+        units_at_exit = np.zeros(len(trades))
+        for start_idx, start_price in units:
+            open_days = (start_idx >= 0) & (exit_idx > start_idx)
+            np.add.at(held, (sym[open_days], start_idx[open_days] + 1), quantity[open_days])
+            np.add.at(held, (sym[open_days], exit_idx[open_days] + 1), -quantity[open_days])
+            units_at_exit += open_days
+
+            # 진입일은 진입가 대비 종가로 평가 (첫 유닛은 종가 진입이라 0)
+            entry_adjust = quantity * (filled[sym, np.maximum(start_idx, 0)] - start_price)
+            np.add.at(daily_pnl, start_idx[open_days], entry_adjust[open_days])
+        held = np.cumsum(held[:, :-1], axis=1)
+
+        change = np.zeros(close.shape)
+        change[:, 1:] = np.nan_to_num(filled[:, 1:] - filled[:, :-1])
+        daily_pnl += (held * change).sum(axis=0)
+
+        # 청산일은 종가 대신 실제 청산가로 평가
+        exit_adjust = units_at_exit * quantity * (trades['exit_price'].to_numpy() - filled[sym, exit_idx])
+        np.add.at(daily_pnl, exit_idx, exit_adjust)
+
+        return pd.Series(initial_capital + np.cumsum(daily_pnl),
+                         index=pd.Index(dates, name='date'), name='equity')
+
+    def _summarize(self, trades: pd.DataFrame, equity: pd.Series, initial_capital: float) -> Dict:
+        """요약 통계"""
+        pnl = trades['profit_loss'].to_numpy(dtype=float)
+        wins = pnl[pnl > 0]
+        losses = pnl[pnl < 0]
+
+        running_max = np.maximum.accumulate(equity.to_numpy())
+        drawdown = (equity.to_numpy() - running_max) / running_max
+
+        return {
+            'trades': int(len(trades)),
+            'open_trades': int((trades['exit_reason'] == 'OPEN').sum()),
+            'win_count': int(len(wins)),
+            'win_rate': len(wins) / max(len(pnl), 1) * 100,
+            'total_pnl': float(pnl.sum()),
+            'avg_pnl': float(pnl.mean()) if len(pnl) else 0.0,
+            'avg_return_pct': float(trades['return_pct'].mean()) if len(pnl) else 0.0,
+            'avg_r_multiple': float(trades['r_multiple'].mean()) if len(pnl) else 0.0,
+            'profit_factor': float(wins.sum() / -losses.sum()) if len(losses) else float('inf'),
+            'avg_holding_days': float(trades['holding_days'].mean()) if len(pnl) else 0.0,
+            'final_equity': float(equity.iloc[-1]) if len(equity) else initial_capital,
+            'total_return_pct': (float(equity.iloc[-1]) / initial_capital - 1) * 100 if len(equity) else 0.0,
+            'max_drawdown_pct': float(drawdown.min() * 100) if len(drawdown) else 0.0,
+        }
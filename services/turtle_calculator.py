@@ -1,14 +1,113 @@
 import pandas as pd
 import numpy as np
-from typing import List, Tuple, Optional
-from decimal import Decimal
+from typing import List, Tuple, Optional, Dict, Union
+from dataclasses import dataclass
 from datetime import datetime
 import logging
 
-from database.models import TurtleSignal
+from database.models import TurtleSignal, TurtleSignalBatch, PRICE_SCALE, ATR_SCALE
+
+
+@dataclass(frozen=True)
+class TurtleParams:
+    """터틀 시스템 파라미터 (돈치안 기간 / ATR 배수)"""
+    entry_period: int          # 진입 돈치안 기간
+    exit_period: int           # 청산(트레일링) 돈치안 기간
+    stop_atr: float = 2.0      # 손절 배수 (진입가 - stop_atr * N)
+    take_profit_atr: float = 4.0  # 익절 배수
+    add_atr: float = 0.5       # 추가매수 간격 배수
+    max_units: int = 1         # 최대 보유 유닛 수 (백테스트 피라미딩용)
+
+
+# 시스템별 기본 파라미터
+SYSTEM_PARAMS = {
+    1: TurtleParams(entry_period=20, exit_period=10, take_profit_atr=4.0),
+    2: TurtleParams(entry_period=55, exit_period=20, take_profit_atr=6.0),
+}
+
+
+# ---------------------------------------------------------------------------
+# 유니버스 배치 계산용 헬퍼 (2-D 블록: 종목 x 일자, 마지막 축이 시간축)
+# 짧은 이력은 왼쪽을 NaN으로 채워 마지막 열이 항상 최신 봉이 되도록 정렬한다.
+# ---------------------------------------------------------------------------
+
+def _rolling_extreme(values: np.ndarray, window: int, func) -> np.ndarray:
+    """마지막 축 rolling max/min (2배씩 늘린 구간을 겹쳐 O(log window)번의 배열 연산으로 계산)"""
+    out = np.full(values.shape, np.nan)
+    if values.shape[-1] < window:
+        return out
+
+    # acc[..., j] = values[..., j:j + span] 구간의 극값
+    acc = values
+    span = 1
+    while span * 2 <= window:
+        acc = func(acc[..., :-span], acc[..., span:])
+        span *= 2
+
+    out[..., window - 1:] = func(acc[..., :acc.shape[-1] - (window - span)], acc[..., window - span:])
+    return out
+
+
+def _rolling_max(values: np.ndarray, window: int) -> np.ndarray:
+    """마지막 축 rolling max (pandas rolling(window).max()와 동일하게 앞 window-1개는 NaN)"""
+    return _rolling_extreme(values, window, np.maximum)
+
+
+def _rolling_min(values: np.ndarray, window: int) -> np.ndarray:
+    """마지막 축 rolling min"""
+    return _rolling_extreme(values, window, np.minimum)
+
+
+def _rolling_mean(values: np.ndarray, window: int) -> np.ndarray:
+    """마지막 축 rolling mean (누적합 기반, 윈도우 안에 NaN이 있으면 NaN)"""
+    out = np.full(values.shape, np.nan)
+    if values.shape[-1] < window:
+        return out
+
+    valid = ~np.isnan(values)
+    pad = [(0, 0)] * (values.ndim - 1) + [(1, 0)]
+    csum = np.pad(np.cumsum(np.where(valid, values, 0.0), axis=-1), pad)
+    ccount = np.pad(np.cumsum(valid, axis=-1), pad)
+
+    sums = csum[..., window:] - csum[..., :-window]
+    counts = ccount[..., window:] - ccount[..., :-window]
+    out[..., window - 1:] = np.where(counts == window, sums / window, np.nan)
+    return out
+
+
+def _true_range(high: np.ndarray, low: np.ndarray, close: np.ndarray) -> np.ndarray:
+    """True Range 블록 (전일 종가가 없으면 고가-저가, pandas concat().max()와 동일)"""
+    prev_close = np.full(close.shape, np.nan)
+    prev_close[..., 1:] = close[..., :-1]
+
+    tr = np.fmax(high - low, np.abs(high - prev_close))
+    return np.fmax(tr, np.abs(low - prev_close))
+
+
+def _round_half(values: np.ndarray, ndigits: int) -> np.ndarray:
+    """
+    파이썬 round()와 동일한 반올림 (np.round는 x.xx5 경계에서 결과가 달라질 수 있음)
+
+    10**ndigits 배한 값이 .5 경계에서 곱셈 오차 이상 떨어져 있으면 반올림 방향이 확실하므로 배열 연산으로
+    정수 반올림 후 나눈다 (정수 / 10**ndigits는 round()가 돌려주는 가장 가까운 float와 같음).
+    경계에 걸친 값만 round()로 다시 계산한다.
+    """
+    values = np.asarray(values, dtype=float)
+    scale = 10.0 ** ndigits
+    with np.errstate(invalid='ignore'):
+        scaled = values * scale
+        floor = np.floor(scaled)
+        frac = scaled - floor
+        out = np.where(frac < 0.5, floor, floor + 1) / scale
+        ambiguous = np.abs(frac - 0.5) <= np.abs(scaled) * 1e-15
+    if ambiguous.any():
+        out[ambiguous] = [round(v, ndigits) for v in values[ambiguous].tolist()]
+    return out
+
 
 class TurtleCalculator:
-    def __init__(self):
+    def __init__(self, params: Optional[Dict[int, TurtleParams]] = None):
+        self.params = {**SYSTEM_PARAMS, **(params or {})}
         self.logger = logging.getLogger(__name__)
     
     def calculate_atr(self, df: pd.DataFrame, period: int = 20) -> pd.Series:
@@ -37,132 +136,83 @@ class TurtleCalculator:
         """터틀 시스템 1 (단기) 신호 계산"""
         if len(df) < 30:  # 최소 30일 데이터 필요
             return None
-        
-        # 20일 돈치안 채널과 ATR 계산
-        atr = self.calculate_atr(df, 20)
-        high_channel, low_channel = self.calculate_donchian_channel(df, 20)
-        
-        # 10일 돈치안 채널 (exit용)
-        exit_high, exit_low = self.calculate_donchian_channel(df, 10)
-        
-        current_price = df['close_price'].iloc[-1]
-        prev_high_channel = high_channel.iloc[-2]  # 전일 채널
-        prev_low_channel = low_channel.iloc[-2]
-        current_atr = atr.iloc[-1]
-        
-        if pd.isna(current_atr) or pd.isna(prev_high_channel):
-            return None
-        
-        signal = None
-        
-        # 매수 신호: 현재가가 20일 최고가를 돌파
-        if current_price > prev_high_channel:
-            entry_price = current_price
-            stop_loss = entry_price - (2 * current_atr)  # 2ATR 손절
-            take_profit = entry_price + (4 * current_atr)  # 4ATR 익절
-            add_position = entry_price + (0.5 * current_atr)  # 0.5ATR 추가매수
-            
-            signal = TurtleSignal(
-                stock_code=df.iloc[-1].get('stock_code', ''),
-                signal_date=current_date,
-                system_type=1,
-                signal_type='BUY',
-                entry_price=Decimal(str(round(entry_price, 2))),
-                stop_loss=Decimal(str(round(stop_loss, 2))),
-                take_profit=Decimal(str(round(take_profit, 2))),
-                add_position=Decimal(str(round(add_position, 2))),
-                atr_20=Decimal(str(round(current_atr, 4))),
-                donchian_high_20=Decimal(str(round(prev_high_channel, 2))),
-                donchian_low_20=Decimal(str(round(prev_low_channel, 2)))
-            )
-        
-        # 매도 신호: 현재가가 20일 최저가를 하향 돌파
-        elif current_price < prev_low_channel:
-            entry_price = current_price
-            stop_loss = entry_price + (2 * current_atr)  # 2ATR 손절
-            take_profit = entry_price - (4 * current_atr)  # 4ATR 익절
-            add_position = entry_price - (0.5 * current_atr)  # 0.5ATR 추가매수
-            
-            signal = TurtleSignal(
-                stock_code=df.iloc[-1].get('stock_code', ''),
-                signal_date=current_date,
-                system_type=1,
-                signal_type='SELL',
-                entry_price=Decimal(str(round(entry_price, 2))),
-                stop_loss=Decimal(str(round(stop_loss, 2))),
-                take_profit=Decimal(str(round(take_profit, 2))),
-                add_position=Decimal(str(round(add_position, 2))),
-                atr_20=Decimal(str(round(current_atr, 4))),
-                donchian_high_20=Decimal(str(round(prev_high_channel, 2))),
-                donchian_low_20=Decimal(str(round(prev_low_channel, 2)))
-            )
-        
-        return signal
+        return self._calculate_single_signal(df, current_date, 1)
     
     def calculate_turtle_system2(self, df: pd.DataFrame, current_date: str) -> Optional[TurtleSignal]:
         """터틀 시스템 2 (장기) 신호 계산"""
         if len(df) < 60:  # 최소 60일 데이터 필요
             return None
+        return self._calculate_single_signal(df, current_date, 2)
+    
+    def _calculate_single_signal(self, df: pd.DataFrame, current_date: str, system_type: int) -> Optional[TurtleSignal]:
+        """단일 종목 신호 (배치 규칙을 1행 블록으로 실행)"""
+        batch = self.calculate_signal_batch(
+            [df.iloc[-1].get('stock_code', '')],
+            df['high_price'].to_numpy(dtype=float)[None, :],
+            df['low_price'].to_numpy(dtype=float)[None, :],
+            df['close_price'].to_numpy(dtype=float)[None, :],
+            current_date,
+            system_type
+        )
+        signals = batch.to_signals()
+        return signals[0] if signals else None
+    
+    def calculate_signal_batch(self, stock_codes: List[str], high: np.ndarray, low: np.ndarray,
+                               close: np.ndarray, signal_date, system_type: int = 1) -> TurtleSignalBatch:
+        """
+        유니버스 전체 터틀 신호 배치 계산 (최신 봉 기준, 종목 x 일자 블록)
+
+        :param stock_codes: 종목코드 (블록의 행 순서)
+        :param signal_date: 신호일
+        :param system_type: 1 (20일 돌파) 또는 2 (55일 돌파)
+        :return: 신호가 발생한 종목만 담은 TurtleSignalBatch
+        """
+        params = self.params[system_type]
+        min_bars = 30 if system_type == 1 else 60
+        high = np.asarray(high, dtype=float)
+        low = np.asarray(low, dtype=float)
+        close = np.asarray(close, dtype=float)
         
-        # 55일 돈치안 채널과 ATR 계산
-        atr = self.calculate_atr(df, 20)
-        high_channel, low_channel = self.calculate_donchian_channel(df, 55)
-        
-        # 20일 돈치안 채널 (exit용)
-        exit_high, exit_low = self.calculate_donchian_channel(df, 20)
+        if close.shape[1] < 2:
+            return TurtleSignalBatch.empty(signal_date)
         
-        current_price = df['close_price'].iloc[-1]
-        prev_high_channel = high_channel.iloc[-2]
-        prev_low_channel = low_channel.iloc[-2]
-        current_atr = atr.iloc[-1]
+        indicators = self.calculate_indicator_block(high, low, close, (params.entry_period,))
+        current_atr = indicators['atr_20'][:, -1]
+        prev_high = indicators[f'donchian_high_{params.entry_period}'][:, -2]  # 전일 채널
+        prev_low = indicators[f'donchian_low_{params.entry_period}'][:, -2]
+        current_price = close[:, -1]
         
-        if pd.isna(current_atr) or pd.isna(prev_high_channel):
-            return None
+        valid = (
+            (np.count_nonzero(~np.isnan(close), axis=1) >= min_bars)
+            & ~np.isnan(current_atr)
+            & ~np.isnan(prev_high)
+        )
+        # 매수: 채널 상단 돌파, 매도: 채널 하단 하향 돌파
+        buy = valid & (current_price > prev_high)
+        sell = valid & ~buy & (current_price < prev_low)
+        hit = np.flatnonzero(buy | sell)
         
-        signal = None
+        direction = np.where(buy[hit], 1, -1)
+        entry_price = current_price[hit]
+        atr = current_atr[hit]
         
-        # 매수 신호: 현재가가 55일 최고가를 돌파
-        if current_price > prev_high_channel:
-            entry_price = current_price
-            stop_loss = entry_price - (2 * current_atr)
-            take_profit = entry_price + (6 * current_atr)  # 시스템2는 더 큰 수익 목표
-            add_position = entry_price + (0.5 * current_atr)
-            
-            signal = TurtleSignal(
-                stock_code=df.iloc[-1].get('stock_code', ''),
-                signal_date=current_date,
-                system_type=2,
-                signal_type='BUY',
-                entry_price=Decimal(str(round(entry_price, 2))),
-                stop_loss=Decimal(str(round(stop_loss, 2))),
-                take_profit=Decimal(str(round(take_profit, 2))),
-                add_position=Decimal(str(round(add_position, 2))),
-                atr_20=Decimal(str(round(current_atr, 4))),
-                donchian_high_20=Decimal(str(round(prev_high_channel, 2))),
-                donchian_low_20=Decimal(str(round(prev_low_channel, 2)))
-            )
+        def to_fixed(values: np.ndarray, scale: int) -> np.ndarray:
+            # 기존 round(np.float64, n)과 같은 numpy 반올림 (값 * scale 후 짝수 반올림)
+            return np.rint(values * scale).astype(np.int64)
         
-        elif current_price < prev_low_channel:
-            entry_price = current_price
-            stop_loss = entry_price + (2 * current_atr)
-            take_profit = entry_price - (6 * current_atr)
-            add_position = entry_price - (0.5 * current_atr)
-            
-            signal = TurtleSignal(
-                stock_code=df.iloc[-1].get('stock_code', ''),
-                signal_date=current_date,
-                system_type=2,
-                signal_type='SELL',
-                entry_price=Decimal(str(round(entry_price, 2))),
-                stop_loss=Decimal(str(round(stop_loss, 2))),
-                take_profit=Decimal(str(round(take_profit, 2))),
-                add_position=Decimal(str(round(add_position, 2))),
-                atr_20=Decimal(str(round(current_atr, 4))),
-                donchian_high_20=Decimal(str(round(prev_high_channel, 2))),
-                donchian_low_20=Decimal(str(round(prev_low_channel, 2)))
-            )
-        
-        return signal
+        return TurtleSignalBatch(
+            signal_date=signal_date,
+            stock_code=np.asarray(stock_codes, dtype=object)[hit],
+            system_type=np.full(len(hit), system_type, dtype=np.int8),
+            signal_type=direction.astype(np.int8),
+            entry_price=to_fixed(entry_price, PRICE_SCALE),
+            stop_loss=to_fixed(entry_price - direction * (params.stop_atr * atr), PRICE_SCALE),
+            take_profit=to_fixed(entry_price + direction * (params.take_profit_atr * atr), PRICE_SCALE),
+            add_position=to_fixed(entry_price + direction * (params.add_atr * atr), PRICE_SCALE),
+            atr_20=to_fixed(atr, ATR_SCALE),
+            donchian_high_20=to_fixed(prev_high[hit], PRICE_SCALE),
+            donchian_low_20=to_fixed(prev_low[hit], PRICE_SCALE)
+        )
 
     def calculate_current_levels(self, df: pd.DataFrame, system_type: int = 1) -> dict:
         """
@@ -196,13 +246,9 @@ class TurtleCalculator:
             # 현재가
             current_price = df_calc['close_price'].iloc[-1]
             
-            # 시스템별 트레일링 스탑 설정
-            if system_type == 1:
-                # System 1: 10일 돈치안 하한선
-                exit_period = 10
-            else:
-                # System 2: 20일 돈치안 하한선
-                exit_period = 20
+            # 시스템별 트레일링 스탑 설정 (System 1: 10일, System 2: 20일 돈치안 하한선)
+            params = self.params[1 if system_type == 1 else 2]
+            exit_period = params.exit_period
             
             # 트레일링 스탑용 돈치안 채널 계산
             exit_high, exit_low = self.calculate_donchian_channel(df_calc, exit_period)
@@ -212,13 +258,13 @@ class TurtleCalculator:
                 return {}
             
             # 손절가: 2ATR 손절
-            atr_stop_loss = current_price - (2 * current_atr)
+            atr_stop_loss = current_price - (params.stop_atr * current_atr)
             
             # 트레일링 스탑: 돈치안 하한선
             trailing_stop = current_exit_low
             
             # 추가 매수가 (0.5ATR 위)
-            add_position = current_price + (0.5 * current_atr)
+            add_position = current_price + (params.add_atr * current_atr)
             
             return {
                 'current_price': round(float(current_price), 2),
@@ -231,4 +277,91 @@ class TurtleCalculator:
             
         except Exception as e:
             self.logger.error(f"손절/트레일링 스탑 계산 오류: {e}")
-            return {}
\ No newline at end of file
+            return {}
+
+    def stack_candles(self, frames: List[pd.DataFrame], days: int = 60) -> Dict[str, np.ndarray]:
+        """
+        종목별 일봉 DataFrame 리스트를 (종목 x 일자) 2-D 블록으로 변환
+
+        :param frames: 일봉 데이터 리스트 (컬럼: date, high, low, close, 정렬 무관)
+        :param days: 블록 길이 (최근 days일만 사용)
+        :return: high/low/close 블록 (오름차순, 이력이 짧으면 왼쪽 NaN 패딩)
+        """
+        block = {key: np.full((len(frames), days), np.nan) for key in ('high', 'low', 'close')}
+
+        for row, df in enumerate(frames):
+            if df is None or df.empty:
+                continue
+            df_sorted = df.sort_values('date').tail(days)
+            n = len(df_sorted)
+            for key in block:
+                block[key][row, days - n:] = df_sorted[key].to_numpy(dtype=float)
+
+        return block
+
+    def calculate_indicator_block(self, high: np.ndarray, low: np.ndarray, close: np.ndarray,
+                                  periods: Tuple[int, ...] = (10, 20, 55)) -> Dict[str, np.ndarray]:
+        """
+        유니버스 전체 ATR-20 / 돈치안 채널 시계열 계산 (종목 x 일자 블록)
+
+        calculate_atr / calculate_donchian_channel과 같은 값을 모든 종목에 대해 한 번에 계산한다.
+        """
+        high = np.asarray(high, dtype=float)
+        low = np.asarray(low, dtype=float)
+        close = np.asarray(close, dtype=float)
+
+        indicators = {'atr_20': _rolling_mean(_true_range(high, low, close), 20)}
+        for period in sorted(set(periods)):
+            indicators[f'donchian_high_{period}'] = _rolling_max(high, period)
+            indicators[f'donchian_low_{period}'] = _rolling_min(low, period)
+
+        return indicators
+
+    def calculate_universe_levels(self, high: np.ndarray, low: np.ndarray, close: np.ndarray,
+                                  system_type: Union[int, np.ndarray] = 1) -> Dict[str, np.ndarray]:
+        """
+        유니버스 전체 손절가/트레일링 스탑 배치 계산 (calculate_current_levels의 배치 버전)
+
+        :param high: 고가 블록 (종목 x 일자, 오름차순, 마지막 열이 최신 봉)
+        :param low: 저가 블록
+        :param close: 종가 블록
+        :param system_type: 1 또는 2 (종목별로 다르면 같은 길이의 배열)
+        :return: 종목별 최신 봉 기준 레벨 배열 딕셔너리 ('valid'가 False인 종목은 계산 불가)
+        """
+        close = np.asarray(close, dtype=float)
+        system1, system2 = self.params[1], self.params[2]
+        periods = (system1.exit_period, system2.exit_period, 10, 20, 55)
+        indicators = self.calculate_indicator_block(high, low, close, periods)
+        latest = {key: series[:, -1] for key, series in indicators.items()}
+
+        is_system1 = np.broadcast_to(np.asarray(system_type), close.shape[:1]) == 1
+        exit_period = np.where(is_system1, system1.exit_period, system2.exit_period)
+        trailing_stop = np.where(is_system1, latest[f'donchian_low_{system1.exit_period}'],
+                                 latest[f'donchian_low_{system2.exit_period}'])
+        stop_atr = np.where(is_system1, system1.stop_atr, system2.stop_atr)
+        add_atr = np.where(is_system1, system1.add_atr, system2.add_atr)
+
+        current_price = close[:, -1]
+        current_atr = latest['atr_20']
+
+        # calculate_current_levels와 동일하게 최소 60일 데이터 필요
+        valid = (
+            (np.count_nonzero(~np.isnan(close), axis=1) >= 60)
+            & ~np.isnan(current_atr)
+            & ~np.isnan(trailing_stop)
+        )
+
+        levels = {
+            'current_price': _round_half(current_price, 2),
+            'stop_loss': _round_half(current_price - (stop_atr * current_atr), 2),
+            'trailing_stop': _round_half(trailing_stop, 2),
+            'add_position': _round_half(current_price + (add_atr * current_atr), 2),
+            'atr_20': _round_half(current_atr, 4),
+            'exit_period': exit_period,
+            'valid': valid
+        }
+        for key, value in latest.items():
+            if key.startswith('donchian_'):
+                levels[key] = _round_half(value, 2)
+
+        return levels
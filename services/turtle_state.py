@@ -0,0 +1,279 @@
+import json
+import logging
+import os
+import threading
+from collections import deque
+from datetime import datetime, time, timedelta
+from typing import Dict, List, Optional, Tuple
+
+import pandas as pd
+try:
+    from zoneinfo import ZoneInfo
+except ImportError:
+    from backports.zoneinfo import ZoneInfo
+
+from services.turtle_calculator import SYSTEM_PARAMS
+
+ATR_PERIOD = 20
+# 상태가 유지하는 돈치안 기간 (시스템별 진입/청산 기간에서 가져옴)
+DONCHIAN_PERIODS = tuple(sorted({period for params in SYSTEM_PARAMS.values()
+                                 for period in (params.entry_period, params.exit_period)}))
+MIN_BARS = 60  # calculate_current_levels와 동일한 최소 데이터 일수
+
+KST = ZoneInfo("Asia/Seoul")
+MARKET_CLOSE = time(15, 30)  # 정규장 종료 (이후 당일 봉 확정)
+
+
+def confirmed_cutoff(now: Optional[datetime] = None) -> str:
+    """이 날짜(YYYYMMDD) 이상인 봉은 장중 미확정 봉 (상태에 반영하지 않음)"""
+    now = now or datetime.now(KST)
+    today = now.date()
+    if now.time() >= MARKET_CLOSE:
+        today += timedelta(days=1)
+    return today.strftime('%Y%m%d')
+
+
+class SymbolIndicatorState:
+    """종목별 증분 지표 상태 (봉 하나당 O(1) 갱신)
+
+    - ATR: 최근 20개 TR 윈도우 + 누적합
+    - 돈치안: 기간별 단조 덱 (index, value) - 최고가는 내림차순, 최저가는 오름차순 유지
+    """
+
+    def __init__(self):
+        self.last_date: Optional[str] = None  # YYYYMMDD
+        self.prev_close: Optional[float] = None
+        self.bar_count = 0
+        self.tr_window: deque = deque()
+        self.tr_sum = 0.0
+        self.max_windows: Dict[int, deque] = {p: deque() for p in DONCHIAN_PERIODS}
+        self.min_windows: Dict[int, deque] = {p: deque() for p in DONCHIAN_PERIODS}
+
+    def advance(self, bar_date: str, high: float, low: float, close: float) -> bool:
+        """봉 하나로 상태 전진 (이미 반영된 날짜면 무시)"""
+        if self.last_date is not None and bar_date <= self.last_date:
+            return False
+
+        # True Range (첫 봉은 고가-저가)
+        if self.prev_close is None:
+            tr = high - low
+        else:
+            tr = max(high - low, abs(high - self.prev_close), abs(low - self.prev_close))
+
+        self.tr_window.append(tr)
+        self.tr_sum += tr
+        if len(self.tr_window) > ATR_PERIOD:
+            self.tr_sum -= self.tr_window.popleft()
+
+        idx = self.bar_count
+        for period in DONCHIAN_PERIODS:
+            highs = self.max_windows[period]
+            while highs and highs[-1][1] <= high:
+                highs.pop()
+            highs.append((idx, high))
+            while highs[0][0] <= idx - period:
+                highs.popleft()
+
+            lows = self.min_windows[period]
+            while lows and lows[-1][1] >= low:
+                lows.pop()
+            lows.append((idx, low))
+            while lows[0][0] <= idx - period:
+                lows.popleft()
+
+        self.bar_count += 1
+        self.prev_close = close
+        self.last_date = bar_date
+        return True
+
+    def copy(self) -> 'SymbolIndicatorState':
+        state = SymbolIndicatorState()
+        state.last_date = self.last_date
+        state.prev_close = self.prev_close
+        state.bar_count = self.bar_count
+        state.tr_window = deque(self.tr_window)
+        state.tr_sum = self.tr_sum
+        state.max_windows = {p: deque(w) for p, w in self.max_windows.items()}
+        state.min_windows = {p: deque(w) for p, w in self.min_windows.items()}
+        return state
+
+    def donchian(self, period: int) -> Tuple[Optional[float], Optional[float]]:
+        """현재 돈치안 채널 (상단, 하단) - 데이터 부족시 None"""
+        if self.bar_count < period:
+            return None, None
+        return self.max_windows[period][0][1], self.min_windows[period][0][1]
+
+    @property
+    def atr(self) -> Optional[float]:
+        if len(self.tr_window) < ATR_PERIOD:
+            return None
+        return self.tr_sum / ATR_PERIOD
+
+    def levels(self, system_type: int = 1) -> dict:
+        """현재 손절가/트레일링 스탑 (calculate_current_levels와 같은 형식)"""
+        current_atr = self.atr
+        if self.bar_count < MIN_BARS or current_atr is None:
+            return {}
+
+        params = SYSTEM_PARAMS[1 if system_type == 1 else 2]
+        exit_period = params.exit_period
+        if exit_period not in self.min_windows:
+            return {}
+        _, exit_low = self.donchian(exit_period)
+        if exit_low is None:
+            return {}
+
+        current_price = self.prev_close
+        return {
+            'current_price': round(float(current_price), 2),
+            'stop_loss': round(float(current_price - (params.stop_atr * current_atr)), 2),
+            'trailing_stop': round(float(exit_low), 2),
+            'add_position': round(float(current_price + (params.add_atr * current_atr)), 2),
+            'atr_20': round(float(current_atr), 4),
+            'exit_period': exit_period
+        }
+
+    def to_dict(self) -> dict:
+        return {
+            'last_date': self.last_date,
+            'prev_close': self.prev_close,
+            'bar_count': self.bar_count,
+            'tr_window': list(self.tr_window),
+            'tr_sum': self.tr_sum,
+            'max_windows': {str(p): list(map(list, w)) for p, w in self.max_windows.items()},
+            'min_windows': {str(p): list(map(list, w)) for p, w in self.min_windows.items()}
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'SymbolIndicatorState':
+        state = cls()
+        state.last_date = data.get('last_date')
+        state.prev_close = data.get('prev_close')
+        state.bar_count = data.get('bar_count', 0)
+        state.tr_window = deque(data.get('tr_window', []))
+        state.tr_sum = data.get('tr_sum', 0.0)
+        for period in DONCHIAN_PERIODS:
+            state.max_windows[period] = deque(tuple(x) for x in data.get('max_windows', {}).get(str(period), []))
+            state.min_windows[period] = deque(tuple(x) for x in data.get('min_windows', {}).get(str(period), []))
+        return state
+
+
+def _bar_rows(df: pd.DataFrame):
+    """일봉 DataFrame을 오름차순 (YYYYMMDD, high, low, close) 튜플로 변환"""
+    df_sorted = df.sort_values('date')
+    dates = pd.to_datetime(df_sorted['date']).dt.strftime('%Y%m%d')
+    return zip(dates, df_sorted['high'].astype(float), df_sorted['low'].astype(float),
+               df_sorted['close'].astype(float))
+
+
+def _split_confirmed(rows, cutoff: str) -> Tuple[List[tuple], List[tuple]]:
+    """봉들을 (확정, 장중 미확정)으로 나눔"""
+    confirmed, provisional = [], []
+    for bar in rows:
+        (provisional if bar[0] >= cutoff else confirmed).append(bar)
+    return confirmed, provisional
+
+
+def _with_provisional(state: SymbolIndicatorState, provisional: List[tuple]) -> SymbolIndicatorState:
+    """미확정 봉은 복사본에만 반영 (저장되는 상태는 확정 봉까지만)"""
+    if not provisional:
+        return state
+    view = state.copy()
+    for bar in provisional:
+        view.advance(*bar)
+    return view
+
+
+class IndicatorStateStore:
+    """종목별 증분 지표 상태 저장소 (로컬 JSON 파일)
+
+    저장되는 상태에는 확정된 봉만 반영한다. 장중에 받은 당일 봉은 반환되는 복사본에만
+    더해지므로, 종가가 확정된 뒤 같은 날짜 봉이 다시 들어오면 그 값으로 반영된다.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        self._states: Dict[str, SymbolIndicatorState] = {}
+        self._load()
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                raw = json.load(f)
+            # 기간 구성이 바뀌어 윈도우가 없는 종목은 버림 (다음 실행에서 전체 이력으로 재생성)
+            self._states = {
+                code: SymbolIndicatorState.from_dict(data) for code, data in raw.items()
+                if all(str(period) in data.get('min_windows', {}) for period in DONCHIAN_PERIODS)
+            }
+            self.logger.info(f"지표 상태 로드 완료: {len(self._states)}개 종목 ({self.path})")
+        except Exception as e:
+            self.logger.warning(f"지표 상태 로드 실패 (초기화 후 진행): {e}")
+            self._states = {}
+
+    def save(self):
+        """원자적 저장 (프로세스/스레드별 임시 파일 작성 후 교체, 스냅샷부터 교체까지 잠금)"""
+        with self._lock:
+            payload = {code: state.to_dict() for code, state in self._states.items()}
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            tmp_path = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            try:
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    json.dump(payload, f)
+                os.replace(tmp_path, self.path)
+            except BaseException:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+        self.logger.info(f"지표 상태 저장 완료: {len(payload)}개 종목")
+
+    def get(self, stock_code: str) -> Optional[SymbolIndicatorState]:
+        with self._lock:
+            return self._states.get(stock_code)
+
+    def seed(self, stock_code: str, df: pd.DataFrame, cutoff: Optional[str] = None) -> SymbolIndicatorState:
+        """
+        전체 이력으로 상태를 새로 생성
+
+        :param cutoff: 미확정 봉 기준일 (기본: confirmed_cutoff())
+        :return: 미확정 봉까지 반영한 상태 (저장되는 상태는 확정 봉까지)
+        """
+        confirmed, provisional = _split_confirmed(_bar_rows(df), cutoff or confirmed_cutoff())
+        state = SymbolIndicatorState()
+        for bar in confirmed:
+            state.advance(*bar)
+        with self._lock:
+            self._states[stock_code] = state
+            return _with_provisional(state, provisional)
+
+    def advance(self, stock_code: str, df: pd.DataFrame,
+                cutoff: Optional[str] = None) -> Optional[SymbolIndicatorState]:
+        """
+        최근 확정 봉으로 상태 전진
+
+        :param df: 최근 일봉 (state.last_date 이후 봉이 빠짐없이 포함되어야 함)
+        :param cutoff: 미확정 봉 기준일 (기본: confirmed_cutoff())
+        :return: 미확정 봉까지 반영한 상태, 이어붙일 수 없으면 None (seed 필요)
+        """
+        if df.empty:
+            return None
+        rows = list(_bar_rows(df))
+        confirmed, provisional = _split_confirmed(rows, cutoff or confirmed_cutoff())
+
+        # 계산 단계 스레드가 여럿이어도 상태 변경과 save() 스냅샷이 겹치지 않도록 잠금 안에서 전진
+        with self._lock:
+            state = self._states.get(stock_code)
+            if state is None or state.last_date is None:
+                return None
+            # 가장 오래된 봉이 last_date 이후면 사이에 빠진 봉이 있을 수 있음
+            if rows[0][0] > state.last_date:
+                return None
+
+            for bar in confirmed:
+                state.advance(*bar)
+            return _with_provisional(state, provisional)
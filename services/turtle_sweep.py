@@ -0,0 +1,190 @@
+import argparse
+import itertools
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+from multiprocessing import shared_memory
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from services.turtle_backtester import TurtleBacktester
+from services.turtle_calculator import TurtleParams
+
+logger = logging.getLogger(__name__)
+
+# 결과 테이블에 남기는 요약 지표
+RESULT_METRICS = ('trades', 'win_rate', 'total_pnl', 'avg_r_multiple', 'profit_factor',
+                  'avg_holding_days', 'total_return_pct', 'max_drawdown_pct')
+
+@dataclass
+class SweepGrid:
+    """파라미터 스윕 그리드 (각 항목의 데카르트 곱을 평가)"""
+    entry_periods: Sequence[int] = (20, 40, 55)
+    exit_periods: Sequence[int] = (10, 20)
+    stop_atr: Sequence[float] = (1.5, 2.0, 2.5)
+    take_profit_atr: Sequence[float] = (4.0, 6.0, 8.0)
+    add_atr: Sequence[float] = (0.5, 1.0)
+    max_units: int = 4
+
+    def period_groups(self) -> List[Tuple[int, int, List[TurtleParams]]]:
+        """(진입, 청산) 기간별로 묶은 파라미터 목록 - 같은 그룹은 지표를 한 번만 계산"""
+        groups = []
+        for entry_period, exit_period in itertools.product(self.entry_periods, self.exit_periods):
+            params = [
+                TurtleParams(entry_period=entry_period, exit_period=exit_period, stop_atr=stop,
+                             take_profit_atr=target, add_atr=add, max_units=self.max_units)
+                for stop, target, add in itertools.product(self.stop_atr, self.take_profit_atr, self.add_atr)
+            ]
+            groups.append((entry_period, exit_period, params))
+        return groups
+
+
+SharedSpecs = Dict[str, Tuple[str, Tuple[int, ...], str]]
+
+
+def _run_period_group(specs: SharedSpecs, entry_period: int, exit_period: int, params_list: List[TurtleParams],
+                      initial_capital: float, risk_per_trade: float) -> List[Dict]:
+    """워커 작업: 부모가 만든 공유 메모리 블록에 연결해 (복사 없음) 기간 그룹 하나를 평가"""
+    handles: List[shared_memory.SharedMemory] = []
+    blocks: Dict[str, np.ndarray] = {}
+    try:
+        for key, (name, shape, dtype) in specs.items():
+            shm = shared_memory.SharedMemory(name=name)
+            handles.append(shm)
+            blocks[key] = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+        return _evaluate_period_group(blocks['high'], blocks['low'], blocks['close'], entry_period,
+                                      exit_period, params_list, initial_capital, risk_per_trade)
+    finally:
+        # 버퍼를 참조하는 배열을 먼저 놓아야 close 가능
+        blocks.clear()
+        for shm in handles:
+            try:
+                shm.close()
+            except BufferError:
+                # 예외 traceback이 아직 배열을 잡고 있음 - 참조가 풀리면 SharedMemory가 직접 닫음
+                logger.debug(f"공유 메모리 {shm.name} 닫기 지연")
+
+
+def _evaluate_period_group(high: np.ndarray, low: np.ndarray, close: np.ndarray, entry_period: int,
+                           exit_period: int, params_list: List[TurtleParams], initial_capital: float,
+                           risk_per_trade: float) -> List[Dict]:
+    """기간 그룹 하나의 지표를 계산하고 배수 조합을 모두 평가"""
+    n_symbols, n_days = close.shape
+    codes = np.arange(n_symbols)
+    dates = np.arange(n_days)
+
+    backtester = TurtleBacktester()
+    indicators = backtester.calculator.calculate_indicator_block(high, low, close, (entry_period, exit_period))
+
+    rows = []
+    for params in params_list:
+        result = backtester.run(codes, dates, high, low, close, params=params, indicators=indicators,
+                                initial_capital=initial_capital, risk_per_trade=risk_per_trade)
+        row = {
+            'entry_period': params.entry_period,
+            'exit_period': params.exit_period,
+            'stop_atr': params.stop_atr,
+            'take_profit_atr': params.take_profit_atr,
+            'add_atr': params.add_atr,
+            'max_units': params.max_units,
+        }
+        row.update({metric: result.summary[metric] for metric in RESULT_METRICS})
+        rows.append(row)
+    return rows
+
+
+class TurtleParameterSweep:
+    """돈치안 기간 / ATR 배수 그리드를 프로세스 풀에서 백테스트
+
+    캔들 블록은 공유 메모리에 한 번만 올리고 워커는 이름으로 연결한다.
+    작업 단위는 (진입, 청산) 기간 그룹이라 워커당 지표 계산은 그룹마다 한 번이다.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.logger = logging.getLogger(__name__)
+
+    def run(self, high: np.ndarray, low: np.ndarray, close: np.ndarray, grid: Optional[SweepGrid] = None,
+            initial_capital: float = 100_000_000, risk_per_trade: float = 0.01) -> pd.DataFrame:
+        """
+        파라미터 스윕 실행
+
+        :param high: 고가 블록 (종목 x 일자, 거래 없는 날은 NaN)
+        :param low: 저가 블록
+        :param close: 종가 블록
+        :param grid: 스윕 그리드 (None이면 기본 그리드)
+        :return: 조합별 요약 지표 테이블 (total_pnl 내림차순)
+        """
+        grid = grid or SweepGrid()
+        groups = grid.period_groups()
+        total = sum(len(params) for _, _, params in groups)
+        self.logger.info(f"파라미터 스윕 시작: {total}개 조합, {len(groups)}개 기간 그룹, 워커 {self.max_workers}개")
+
+        handles: List[shared_memory.SharedMemory] = []
+        specs = {}
+        rows: List[Dict] = []
+        try:
+            for key, block in (('high', high), ('low', low), ('close', close)):
+                block = np.ascontiguousarray(block, dtype=np.float64)
+                shm = shared_memory.SharedMemory(create=True, size=max(block.nbytes, 1))
+                handles.append(shm)
+                np.ndarray(block.shape, dtype=block.dtype, buffer=shm.buf)[:] = block
+                specs[key] = (shm.name, block.shape, block.dtype.str)
+
+            with ProcessPoolExecutor(max_workers=self.max_workers) as pool:
+                futures = [
+                    pool.submit(_run_period_group, specs, entry_period, exit_period, params,
+                                initial_capital, risk_per_trade)
+                    for entry_period, exit_period, params in groups
+                ]
+                for done, future in enumerate(as_completed(futures), 1):
+                    rows.extend(future.result())
+                    self.logger.info(f"스윕 진행: {done}/{len(groups)} 그룹 완료")
+        finally:
+            for shm in handles:
+                shm.close()
+                shm.unlink()
+
+        return self._to_table(rows)
+
+    def run_from_db(self, db_handler, grid: Optional[SweepGrid] = None, start_date=None, end_date=None,
+                    **kwargs) -> pd.DataFrame:
+        """daily_candle 전체 이력으로 스윕"""
+        _, _, block = db_handler.get_candle_history_block(start_date, end_date)
+        return self.run(block['high'], block['low'], block['close'], grid=grid, **kwargs)
+
+    def _to_table(self, rows: List[Dict]) -> pd.DataFrame:
+        """결과를 작은 dtype의 테이블로 정리"""
+        table = pd.DataFrame(rows)
+        if table.empty:
+            return table
+
+        dtypes = {'entry_period': np.int16, 'exit_period': np.int16, 'max_units': np.int8, 'trades': np.int32}
+        for column in table.columns:
+            table[column] = table[column].astype(dtypes.get(column, np.float32))
+        return table.sort_values('total_pnl', ascending=False).reset_index(drop=True)
+
+
+def main():
+    """분기 튜닝용 CLI: daily_candle 이력으로 스윕 후 CSV 저장"""
+    from database.handler import DatabaseHandler
+
+    parser = argparse.ArgumentParser(description='터틀 파라미터 스윕')
+    parser.add_argument('--start', help='시작일 (YYYY-MM-DD)')
+    parser.add_argument('--end', help='종료일 (YYYY-MM-DD)')
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--output', default='sweep_results.csv')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s [%(levelname)s] %(name)s - %(message)s')
+    table = TurtleParameterSweep(args.workers).run_from_db(DatabaseHandler(), start_date=args.start,
+                                                          end_date=args.end)
+    table.to_csv(args.output, index=False)
+    logger.info(f"스윕 결과 저장: {args.output} ({len(table)}개 조합)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,460 @@
+import glob
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import date
+from decimal import Decimal
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from database.models import TurtlePosition
+
+try:
+    import fcntl
+except ImportError:  # Windows 개발 환경: 프로세스간 잠금 없이 자기 스풀만 복구
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# 쓰기 종류 (이 순서로 기록: 일봉 -> 신규 포지션 -> 트레일링 스탑)
+OP_CANDLE = 'candle'
+OP_POSITION = 'position'
+OP_TRAILING_STOP = 'trailing_stop'
+OPS = (OP_CANDLE, OP_POSITION, OP_TRAILING_STOP)
+
+# 스풀 줄 수가 이보다 많고 대기 건수의 2배를 넘으면 남은 쓰기로 다시 씀
+SPOOL_COMPACT_LINES = 50000
+
+_POSITION_DECIMALS = ('entry_price', 'entry_atr', 'fixed_stop_loss', 'current_trailing_stop', 'current_add_position')
+
+
+def _encode_position(position: TurtlePosition) -> Dict:
+    """신규 포지션 -> 스풀(JSON) 값"""
+    value = {name: getattr(position, name) for name in ('stock_code', 'signal_id', 'system_type', 'quantity')}
+    value['entry_date'] = position.entry_date.isoformat()
+    for name in _POSITION_DECIMALS:
+        price = getattr(position, name)
+        value[name] = str(price) if price is not None else None
+    return value
+
+
+def _decode_position(value: Dict) -> TurtlePosition:
+    fields = dict(value)
+    fields['entry_date'] = date.fromisoformat(fields['entry_date'])
+    for name in _POSITION_DECIMALS:
+        if fields.get(name) is not None:
+            fields[name] = Decimal(fields[name])
+    return TurtlePosition(**fields)
+
+
+class WriteBehindQueue:
+    """스케줄러 DB 쓰기 후행 기록 큐 (write-behind)
+
+    - 호출자는 쓰기를 넣고 바로 돌아간다. 같은 키(일봉: 종목+날짜, 트레일링 스탑: 포지션 ID,
+      신규 포지션: 종목)는 마지막 값만 남긴다.
+    - 백그라운드 스레드가 batch_size가 차거나 flush_interval이 지나면 모인 쓰기를 종류별 배치
+      트랜잭션으로 기록한다. 실패하면 지수 백오프로 재시도하고, 그 사이 들어온 같은 키는 새 값이 이긴다.
+    - 넣은 쓰기는 로컬 스풀 파일(JSON lines)에 먼저 추가되고, 대기 중인 쓰기가 모두 기록되면 지운다
+      (길어지면 남은 쓰기만으로 다시 씀). 스풀은 프로세스마다 따로 쓰고(spool_path.<pid>), 살아 있는 동안
+      소유 잠금(.lock)을 잡고 있다. 시작할 때 공용 잠금 안에서 소유 잠금이 풀린(죽은 프로세스의) 스풀을
+      가져와 이어서 기록한다 - 살아 있는 다른 워커의 스풀은 건드리지 않는다.
+    - 실행(run) 끝에 flush()를 한 번 기다려 모두 기록된 것을 확인한다.
+    모든 쓰기는 다시 적용해도 결과가 같다 (일봉 업서트, 값 덮어쓰기, 활성 포지션이 이미 있으면 생성 생략).
+    """
+
+    def __init__(self, db_handler=None, position_dao=None, spool_path: Optional[str] = None,
+                 batch_size: int = 1000, flush_interval: float = 1.0, max_pending: int = 100000,
+                 retry_delay: float = 1.0, max_retry_delay: float = 60.0):
+        """
+        :param db_handler: DatabaseHandler (일봉)
+        :param position_dao: PositionDAO (포지션)
+        :param spool_path: 스풀 파일 기준 경로 (실제 파일은 뒤에 .<pid>, None이면 메모리만 - 크래시시 유실)
+        :param batch_size: 이만큼 모이면 즉시 기록, 일봉은 트랜잭션당 최대 행 수
+        :param flush_interval: 첫 쓰기 후 이 시간(초)이 지나면 모인 만큼 기록
+        :param max_pending: 기록 대기 키가 이보다 많으면 넣는 쪽이 기다림 (backpressure)
+        :param retry_delay: 기록 실패시 첫 재시도 대기(초), 실패할 때마다 두 배
+        """
+        self.db_handler = db_handler
+        self.position_dao = position_dao
+        self.spool_base = spool_path
+        self.spool_path = f"{spool_path}.{os.getpid()}" if spool_path else None
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self.max_pending = max(self.batch_size, max_pending)
+        self.retry_delay = retry_delay
+        self.max_retry_delay = max_retry_delay
+        self.logger = logging.getLogger(__name__)
+
+        self._cond = threading.Condition()
+        self._pending: Dict[str, Dict[str, object]] = {op: {} for op in OPS}
+        self._size = 0
+        self._first_put = 0.0
+        self._inflight = False
+        self._flush_requested = False
+        self._stopping = False
+        self._failures = 0
+        self._retry_at = 0.0
+        self._spool = None
+        self._spool_lines = 0
+        self._owner = None
+        self._stats_lock = threading.Lock()
+        self.stats: Dict[str, float] = {}
+
+        if spool_path:
+            self._recover_spools()
+        self._thread = threading.Thread(target=self._run, name="db-write-behind", daemon=True)
+        self._thread.start()
+
+    # 쓰기 넣기
+
+    def upsert_candles(self, stock_code: str, records: np.ndarray):
+        """새 일봉 (CandleStore 레코드, 날짜는 'YYYY-MM-DD'로 보관)"""
+        if not len(records):
+            return
+        items = []
+        for row in zip(records['date'].tolist(), records['open'].tolist(), records['high'].tolist(),
+                       records['low'].tolist(), records['close'].tolist(),
+                       records['volume'].tolist(), records['amount'].tolist()):
+            day = f"{row[0] // 10000:04d}-{row[0] // 100 % 100:02d}-{row[0] % 100:02d}"
+            items.append((f"{stock_code}:{day}", {
+                'stock_code': stock_code, 'date': day, 'open': row[1], 'high': row[2],
+                'low': row[3], 'close': row[4], 'volume': row[5], 'amount': row[6],
+            }))
+        self._put(OP_CANDLE, items)
+
+    def update_trailing_stop(self, position_id: int, trailing_stop: Decimal, add_position: Decimal):
+        self._put(OP_TRAILING_STOP, [(str(position_id), [position_id, str(trailing_stop), str(add_position)])])
+
+    def create_position(self, position: TurtlePosition):
+        """신규 포지션 (ID는 기록 후 DB에서 부여)"""
+        self._put(OP_POSITION, [(position.stock_code, _encode_position(position))])
+
+    def _count(self, key: str, value: float = 1):
+        with self._stats_lock:
+            self.stats[key] = self.stats.get(key, 0) + value
+
+    def _put(self, op: str, items: List[Tuple[str, object]]):
+        """[(키, 값)] 넣기 (같은 키는 마지막 값, 스풀에는 호출당 한 번 추가)"""
+        with self._cond:
+            while self._size >= self.max_pending and not self._stopping:
+                self._cond.wait()
+            pending = self._pending[op]
+            if not self._size:
+                self._first_put = time.monotonic()
+            for key, value in items:
+                if key in pending:
+                    self._count('coalesced')
+                else:
+                    self._size += 1
+                pending[key] = value
+            self._count('queued', len(items))
+            if self.spool_path:
+                self._append_spool(op, items)
+            if self._size >= self.batch_size:
+                self._cond.notify_all()
+
+    # 스풀
+
+    @contextmanager
+    def _exclusive(self):
+        """스풀 복구/소유 정리 공용 잠금 (같은 기준 경로를 쓰는 모든 프로세스)"""
+        directory = os.path.dirname(self.spool_base)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(f"{self.spool_base}.lock", 'a') as lock_file:
+            if fcntl:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    @staticmethod
+    def _try_own(path: str):
+        """스풀 소유 잠금 시도 -> 잡았으면 잠금 파일, 살아 있는 다른 큐가 잡고 있으면 None"""
+        lock_file = open(f"{path}.lock", 'a')
+        if fcntl:
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                lock_file.close()
+                return None
+        return lock_file
+
+    def _orphan_spools(self) -> List[str]:
+        """복구할 스풀 (공용 잠금 안에서 호출): 이전 버전 공용 스풀 + 자기 pid 스풀 + 다른 pid 스풀"""
+        paths = [self.spool_base, self.spool_path]
+        if fcntl:
+            # 소유 잠금으로 생존을 판단할 수 있을 때만 다른 프로세스 스풀을 가져옴
+            prefix = f"{self.spool_base}."
+            for path in sorted(glob.glob(f"{glob.escape(self.spool_base)}.*")):
+                if path[len(prefix):].isdigit() and path not in paths:
+                    paths.append(path)
+        return [path for path in paths if os.path.exists(path)]
+
+    def _recover_spools(self):
+        """자기 스풀 소유 잠금을 잡고, 주인이 없는 스풀의 쓰기를 가져와 이어서 기록"""
+        with self._exclusive():
+            self._owner = self._try_own(self.spool_path)
+            if self._owner is None:
+                raise RuntimeError(f"DB 쓰기 스풀을 이 프로세스의 다른 큐가 사용 중: {self.spool_path}")
+            taken = []
+            for path in self._orphan_spools():
+                owner = None
+                if path not in (self.spool_base, self.spool_path):
+                    owner = self._try_own(path)
+                    if owner is None:
+                        continue  # 살아 있는 워커의 스풀
+                try:
+                    self._replay_spool(path)
+                    taken.append(path)
+                finally:
+                    if owner is not None:
+                        owner.close()
+            # 가져온 쓰기를 자기 스풀에 fsync로 먼저 남긴 뒤 원래 스풀 삭제 (도중에 죽어도 다시 적용될 뿐)
+            self._rewrite_spool()
+            for path in taken:
+                if path == self.spool_path:
+                    continue
+                for name in (path, f"{path}.lock"):
+                    try:
+                        os.remove(name)
+                    except FileNotFoundError:
+                        pass
+        if self._size:
+            self._first_put = time.monotonic()
+            self.logger.info(f"DB 쓰기 스풀 복구: {self._size}건 ({len(taken)}개 스풀) - 백그라운드 기록")
+
+    def _release_spool(self):
+        """소유 잠금 해제 (남은 스풀은 다음에 시작하는 워커가 복구)"""
+        if self._owner is None:
+            return
+        with self._exclusive():
+            self._owner.close()
+            self._owner = None
+            if not os.path.exists(self.spool_path):
+                try:
+                    os.remove(f"{self.spool_path}.lock")
+                except FileNotFoundError:
+                    pass
+
+    def _open_spool(self):
+        self._spool = open(self.spool_path, 'a', encoding='utf-8')
+
+    def _append_spool(self, op: str, items: List[Tuple[str, object]]):
+        # 호출마다 OS에 넘김 (프로세스 크래시에도 남음, fsync는 스풀 재작성시)
+        if self._spool is None:
+            self._open_spool()
+        self._spool.write(''.join(json.dumps([op, key, value]) + '\n' for key, value in items))
+        self._spool.flush()
+        self._spool_lines += len(items)
+
+    def _compact_spool(self):
+        """
+        기록이 끝난 쓰기를 스풀에서 정리 (잠금 안에서 호출)
+
+        대기 중인 쓰기가 없으면 스풀을 지우고, 스풀이 대기 건수보다 한참 길어졌을 때만 남은 쓰기로 다시 쓴다.
+        """
+        if not self.spool_path:
+            return
+        if self._size and self._spool_lines < max(SPOOL_COMPACT_LINES, 2 * self._size):
+            return
+        self._rewrite_spool()
+
+    def _rewrite_spool(self):
+        """기록 대기 중인 쓰기만 남기도록 스풀 교체 (잠금 안에서 호출)"""
+        if self._spool is not None:
+            self._spool.close()
+            self._spool = None
+        self._spool_lines = self._size
+        if not self._size:
+            try:
+                os.remove(self.spool_path)
+            except FileNotFoundError:
+                pass
+            return
+        tmp_path = f"{self.spool_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            for op in OPS:
+                for key, value in self._pending[op].items():
+                    f.write(json.dumps([op, key, value]) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.spool_path)
+
+    def _replay_spool(self, path: str):
+        """이전 실행에서 기록하지 못한 쓰기를 대기열에 합침 (같은 키는 나중 줄이 이김)"""
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                lines = f.readlines()
+        except FileNotFoundError:
+            return
+        for line in lines:
+            try:
+                op, key, value = json.loads(line)
+            except ValueError:
+                continue  # 크래시 중 잘린 마지막 줄
+            if op not in self._pending:
+                continue
+            if key not in self._pending[op]:
+                self._size += 1
+            self._pending[op][key] = value
+
+    # 기록
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while True:
+                    now = time.monotonic()
+                    if self._stopping and (not self._size or self._failures):
+                        # 남은 쓰기는 스풀에 두고 종료 (다음 시작시 복구)
+                        return
+                    if now < self._retry_at and not self._stopping:
+                        self._cond.wait(self._retry_at - now)
+                        continue
+                    if self._size and (self._stopping or self._flush_requested or self._size >= self.batch_size
+                                       or now >= self._first_put + self.flush_interval):
+                        break
+                    self._flush_requested = False
+                    self._cond.wait(self._first_put + self.flush_interval - now if self._size else None)
+
+                batch, self._pending = self._pending, {op: {} for op in OPS}
+                self._size = 0
+                self._inflight = True
+                self._flush_requested = False
+                self._cond.notify_all()
+
+            failed = self._write(batch)
+
+            with self._cond:
+                self._inflight = False
+                if failed:
+                    for op, items in failed.items():
+                        # 실패한 쓰기 되돌리기 - 그 사이 들어온 같은 키는 새 값 유지
+                        merged = dict(items)
+                        merged.update(self._pending[op])
+                        self._pending[op] = merged
+                    self._size = sum(len(items) for items in self._pending.values())
+                    self._first_put = time.monotonic()
+                    self._failures += 1
+                    delay = min(self.retry_delay * 2 ** (self._failures - 1), self.max_retry_delay)
+                    self._retry_at = time.monotonic() + delay
+                    self._count('retries')
+                    self.logger.warning(f"DB 쓰기 실패 - {self._size}건 {delay:.1f}초 후 재시도 ({self._failures}회째)")
+                else:
+                    self._failures = 0
+                    self._retry_at = 0.0
+                try:
+                    self._compact_spool()
+                except OSError as e:
+                    self.logger.error(f"DB 쓰기 스풀 갱신 실패: {e}")
+                self._cond.notify_all()
+
+    def _write(self, batch: Dict[str, Dict[str, object]]) -> Dict[str, Dict[str, object]]:
+        """종류별 배치 기록 -> 실패한 쓰기 {op: {key: value}}"""
+        failed: Dict[str, Dict[str, object]] = {}
+
+        candles = list(batch[OP_CANDLE].items())
+        for start in range(0, len(candles), self.batch_size):
+            chunk = candles[start:start + self.batch_size]
+            try:
+                rows = [{**row, 'date': date.fromisoformat(row['date'])} for _, row in chunk]
+                if self.db_handler is not None:
+                    self.db_handler.upsert_candle_data(rows)
+                self._count('candles_written', len(rows))
+            except Exception as e:
+                self.logger.warning(f"일봉 배치 기록 실패 ({len(chunk)}개): {e}")
+                self._count('write_failures')
+                failed.setdefault(OP_CANDLE, {}).update(chunk)
+
+        positions = batch[OP_POSITION]
+        if positions and self.position_dao is not None:
+            try:
+                # 재시도/스풀 복구로 다시 들어온 생성은 이미 활성 포지션이 있으면 생략
+                existing = self.position_dao.get_active_positions_by_stock(list(positions))
+                for stock_code, value in positions.items():
+                    if stock_code in existing:
+                        continue
+                    try:
+                        self.position_dao.create_position(_decode_position(value))
+                        self._count('positions_created')
+                    except Exception as e:
+                        self.logger.warning(f"{stock_code}: 포지션 생성 기록 실패 - {e}")
+                        self._count('write_failures')
+                        failed.setdefault(OP_POSITION, {})[stock_code] = value
+            except Exception as e:
+                self.logger.warning(f"포지션 생성 기록 실패 ({len(positions)}개): {e}")
+                self._count('write_failures')
+                failed[OP_POSITION] = dict(positions)
+
+        stops = batch[OP_TRAILING_STOP]
+        if stops and self.position_dao is not None:
+            try:
+                unmatched = self.position_dao.update_trailing_stops(
+                    [(position_id, Decimal(stop), Decimal(add)) for position_id, stop, add in stops.values()]
+                )
+                self._count('positions_written', len(stops) - len(unmatched))
+                self._count('positions_unmatched', len(unmatched))
+            except Exception as e:
+                self.logger.warning(f"포지션 일괄 갱신 실패 ({len(stops)}개): {e}")
+                self._count('write_failures')
+                failed[OP_TRAILING_STOP] = dict(stops)
+
+        self._count('flushes')
+        return failed
+
+    # 완료 대기
+
+    @property
+    def pending(self) -> int:
+        with self._cond:
+            return self._size + (1 if self._inflight else 0)
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        지금까지 넣은 쓰기를 즉시 기록하고 끝날 때까지 대기
+
+        :return: 모두 기록됐으면 True (시간 초과/기록 실패로 남아 있으면 False - 스풀에 보존)
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            self._flush_requested = True
+            self._cond.notify_all()
+            while self._size or self._inflight:
+                if self._failures and not self._inflight:
+                    # 재시도 대기 중 - 기다려도 이번 flush에서는 끝나지 않을 수 있음
+                    if deadline is None:
+                        deadline = time.monotonic() + self.max_retry_delay
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    self.logger.warning(f"DB 쓰기 flush 시간 초과 - {self._size}건 대기 중 (스풀 보존)")
+                    return False
+                self._cond.wait(remaining)
+            return True
+
+    def close(self, timeout: Optional[float] = None) -> bool:
+        """남은 쓰기 기록 후 스레드 종료 (못 쓴 쓰기는 스풀에 남음)"""
+        flushed = self.flush(timeout)
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+        self._thread.join(timeout)
+        with self._cond:
+            if self._spool is not None:
+                self._spool.close()
+                self._spool = None
+        self._release_spool()
+        return flushed
+
+    def summary(self) -> str:
+        return (f"일봉 {int(self.stats.get('candles_written', 0))}개, "
+                f"포지션 생성 {int(self.stats.get('positions_created', 0))}개, "
+                f"트레일링 {int(self.stats.get('positions_written', 0))}개 기록, "
+                f"병합 {int(self.stats.get('coalesced', 0))}건, "
+                f"재시도 {int(self.stats.get('retries', 0))}회")
@@ -0,0 +1,44 @@
+from datetime import date
+from decimal import Decimal
+
+import pytest
+
+from config import Config
+from database.backends import SQLiteBackend
+from database.models import TurtlePosition
+from services.kiwoom_service import KiwoomAPIService
+from tests.kiwoom_fake import FakeKiwoomServer
+
+
+@pytest.fixture
+def sqlite_backend(tmp_path):
+    """마이그레이션을 적용한 임시 SQLite 저장소 (테스트마다 새 파일)"""
+    return SQLiteBackend(str(tmp_path / 'turtle.db'))
+
+
+@pytest.fixture
+def connect(tmp_path, monkeypatch):
+    """가짜 서버를 띄우고 그 주소를 쓰는 KiwoomAPIService 생성"""
+    servers = []
+
+    def _connect(server: FakeKiwoomServer) -> KiwoomAPIService:
+        base_url, wss_url = server.start()
+        servers.append(server)
+        monkeypatch.setattr(Config, 'KIWOOM_BASE_URL', base_url)
+        monkeypatch.setattr(Config, 'KIWOOM_WSS_URL', wss_url)
+        monkeypatch.setattr(Config, 'KIWOOM_TOKEN_CACHE_FILE', str(tmp_path / f"token{len(servers)}.json"))
+        return KiwoomAPIService()
+
+    yield _connect
+    for server in servers:
+        server.stop()
+
+
+def make_position(stock_code: str, entry_date: date = date(2024, 3, 4), system_type: int = 1,
+                  entry_price: str = '10000') -> TurtlePosition:
+    price = Decimal(entry_price)
+    return TurtlePosition(
+        stock_code=stock_code, signal_id=0, entry_date=entry_date, entry_price=price,
+        entry_atr=Decimal('250.5'), fixed_stop_loss=price - Decimal('501'), system_type=system_type,
+        quantity=10, current_trailing_stop=price - Decimal('300'), current_add_position=price + Decimal('125.25')
+    )
@@ -0,0 +1,637 @@
+import argparse
+import asyncio
+import json
+import logging
+import random
+import threading
+import time
+import zlib
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+import requests
+import websockets
+
+logger = logging.getLogger(__name__)
+
+# 키움 응답 코드 (요청 한도 초과)
+RATE_LIMIT_CODE = 1700
+RATE_LIMIT_MSG = "허용된 요청 개수를 초과하였습니다"
+
+# 엔드포인트
+TOKEN_PATH = "/oauth2/token"
+CHART_PATH = "/api/dostk/chart"
+WS_PATH = "/api/dostk/websocket"
+
+
+@dataclass
+class FakeKiwoomConfig:
+    """가짜 키움 서버 설정"""
+    latency: float = 0.05                 # 응답 지연 (초)
+    latency_jitter: float = 0.0           # 지연 편차 (초, 균등분포 ±)
+    rate_limits: Dict[str, float] = field(default_factory=lambda: {'ka10081': 5.0, 'CNSRREQ': 5.0})  # 초당 요청 수 (0: 무제한)
+    chart_page_size: int = 600            # ka10081 페이지당 봉 수
+    condition_page_size: int = 100        # CNSRREQ 페이지당 종목 수
+    history_days: int = 750               # 종목별 합성 일봉 일수 (영업일)
+    universe: int = 200                   # 합성 종목 수 (000001 ~)
+    conditions: Dict[str, str] = field(default_factory=lambda: {'1': 'System 1', '2': 'System 2'})
+    condition_size: int = 40              # 조건식별 편입 종목 수
+    real_interval: float = 0.0            # 실시간 편입/이탈 이벤트 간격 (초, 0: 없음)
+    condition_delays: Dict[str, float] = field(default_factory=dict)  # seq별 CNSRREQ 추가 지연 (초, 다른 응답보다 늦게 도착)
+    ping_interval: float = 0.0            # 서버 PING 간격 (초, 0: 없음)
+    seed: int = 0
+
+    def delay(self, rng: random.Random) -> float:
+        return max(0.0, self.latency + rng.uniform(-self.latency_jitter, self.latency_jitter))
+
+
+class RateLimiter:
+    """키(api-id)별 토큰 버킷 - 초과시 False"""
+
+    def __init__(self, rates: Dict[str, float]):
+        self.rates = rates
+        self._buckets: Dict[str, Tuple[float, float]] = {}
+        self._lock = threading.Lock()
+
+    def try_acquire(self, key: str) -> bool:
+        rate = self.rates.get(key, 0)
+        if not rate:
+            return True
+        now = time.monotonic()
+        with self._lock:
+            tokens, last = self._buckets.get(key, (rate, now))
+            tokens = min(rate, tokens + (now - last) * rate)
+            if tokens < 1:
+                self._buckets[key] = (tokens, now)
+                return False
+            self._buckets[key] = (tokens - 1, now)
+            return True
+
+
+class Recording:
+    """요청 키별 응답 기록 (JSON 파일)
+
+    - rest: "api-id|body|next-key" -> {status, headers, body}
+    - ws: "trnm|seq|search_type|next_key" -> 응답 메시지
+    - real: [[등록 후 경과 초, REAL 메시지], ...]
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self.rest: Dict[str, Dict[str, Any]] = {}
+        self.ws: Dict[str, Dict[str, Any]] = {}
+        self.real: List[Tuple[float, Dict[str, Any]]] = []
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, path: str) -> 'Recording':
+        recording = cls(path)
+        with open(path, 'r', encoding='utf-8') as f:
+            raw = json.load(f)
+        recording.rest = raw.get('rest', {})
+        recording.ws = raw.get('ws', {})
+        recording.real = [tuple(item) for item in raw.get('real', [])]
+        logger.info(f"기록 로드: REST {len(recording.rest)}건, WS {len(recording.ws)}건, 실시간 {len(recording.real)}건")
+        return recording
+
+    def save(self):
+        if not self.path:
+            return
+        with self._lock:
+            payload = {'rest': self.rest, 'ws': self.ws, 'real': self.real}
+        with open(self.path, 'w', encoding='utf-8') as f:
+            json.dump(payload, f, ensure_ascii=False)
+        logger.info(f"기록 저장: {self.path}")
+
+    @staticmethod
+    def rest_key(api_id: str, body: Dict[str, Any], next_key: str) -> str:
+        return f"{api_id}|{json.dumps(body, sort_keys=True)}|{next_key}"
+
+    def find_rest(self, api_id: str, body: Dict[str, Any], next_key: str) -> Optional[Dict[str, Any]]:
+        """기록된 응답 조회 (정확히 일치하는 키가 없으면 base_dt만 다른 기록 사용 - 다른 날 재생용)"""
+        entry = self.rest.get(self.rest_key(api_id, body, next_key))
+        if entry is not None or 'base_dt' not in body:
+            return entry
+        loose = self.rest_key(api_id, {k: v for k, v in body.items() if k != 'base_dt'}, next_key)
+        for key, candidate in self.rest.items():
+            api, raw_body, page_key = key.split('|', 2)
+            recorded = json.loads(raw_body)
+            recorded.pop('base_dt', None)
+            if self.rest_key(api, recorded, page_key) == loose:
+                return candidate
+        return None
+
+    @staticmethod
+    def ws_key(msg: Dict[str, Any]) -> str:
+        return "|".join(str(msg.get(k, "")) for k in ("trnm", "seq", "search_type", "next_key"))
+
+
+def _signed(value: int) -> str:
+    return f"+{value}" if value > 0 else str(value)
+
+
+class SyntheticMarket:
+    """종목코드 시드 기반의 결정적 일봉/조건검색 데이터"""
+
+    def __init__(self, config: FakeKiwoomConfig):
+        self.config = config
+        self.codes = [f"{i:06d}" for i in range(1, config.universe + 1)]
+        self._candles: Dict[str, List[Dict[str, str]]] = {}
+        self._lock = threading.Lock()
+        end = pd.Timestamp(datetime.now().date())
+        self.dates = [d.strftime('%Y%m%d') for d in pd.bdate_range(end=end, periods=config.history_days)]
+
+    def candles(self, code: str) -> List[Dict[str, str]]:
+        """ka10081 형식 행 (최신순)"""
+        with self._lock:
+            if code not in self._candles:
+                self._candles[code] = self._generate(code)
+            return self._candles[code]
+
+    def _generate(self, code: str) -> List[Dict[str, str]]:
+        rng = np.random.default_rng(zlib.crc32(code.encode()) + self.config.seed)
+        n = len(self.dates)
+        close = np.maximum(np.round(10000 * np.exp(np.cumsum(rng.normal(0, 0.02, n)))), 100).astype(np.int64)
+        open_ = np.concatenate([[close[0]], close[:-1]])
+        spread = np.abs(rng.normal(0, 0.01, n)) * close
+        high = (np.maximum(open_, close) + spread).astype(np.int64)
+        low = np.maximum(np.minimum(open_, close) - spread, 1).astype(np.int64)
+        volume = rng.integers(10_000, 5_000_000, n)
+
+        rows = []
+        for i in range(n - 1, -1, -1):
+            prev = close[i - 1] if i else close[i]
+            rows.append({
+                'dt': self.dates[i],
+                'cur_prc': str(close[i]),
+                'open_pric': str(open_[i]),
+                'high_pric': str(high[i]),
+                'low_pric': str(low[i]),
+                'trde_qty': str(volume[i]),
+                'trde_prica': str(int(volume[i] * close[i] // 1_000_000)),
+                'pred_pre': _signed(int(close[i] - prev)),
+                'upd_stkpc_tp': '1',
+            })
+        return rows
+
+    def condition_codes(self, seq: str) -> List[str]:
+        rng = random.Random(f"{seq}-{self.config.seed}")
+        return sorted(rng.sample(self.codes, min(self.config.condition_size, len(self.codes))))
+
+    def condition_row(self, code: str) -> Dict[str, str]:
+        last = self.candles(code)[0]
+        return {
+            '9001': f"A{code}", '302': f"종목{code}", '10': last['cur_prc'], '25': '2',
+            '11': last['pred_pre'], '12': '+0.00', '13': last['trde_qty'],
+            '16': last['open_pric'], '17': last['high_pric'], '18': last['low_pric'],
+        }
+
+
+class FakeKiwoomServer:
+    """키움 REST(oauth2/token, ka10081)와 WebSocket(LOGIN/CNSRLST/CNSRREQ/CNSRCLR/PING) 대역 서버
+
+    - 합성 모드: 종목코드 시드로 만든 결정적 데이터 제공
+    - 기록 모드(upstream): 실제 서버로 중계하면서 응답을 Recording에 저장
+    - 재생 모드(replay): 기록된 응답을 같은 요청 키로 반환 (없으면 합성 데이터, strict면 오류)
+
+    사용 예:
+        server = FakeKiwoomServer(FakeKiwoomConfig(latency=0.02))
+        base_url, wss_url = server.start()
+        Config.KIWOOM_BASE_URL, Config.KIWOOM_WSS_URL = base_url, wss_url
+    """
+
+    def __init__(self, config: Optional[FakeKiwoomConfig] = None, host: str = '127.0.0.1',
+                 http_port: int = 0, ws_port: int = 0, replay: Optional[Recording] = None,
+                 record: Optional[Recording] = None, upstream_url: Optional[str] = None,
+                 upstream_wss_url: Optional[str] = None, strict: bool = False):
+        self.config = config or FakeKiwoomConfig()
+        self.host = host
+        self.http_port = http_port
+        self.ws_port = ws_port
+        self.replay = replay
+        self.record = record
+        self.upstream_url = upstream_url
+        self.upstream_wss_url = upstream_wss_url
+        self.strict = strict
+
+        self.market = SyntheticMarket(self.config)
+        self.limiter = RateLimiter(self.config.rate_limits)
+        self.stats: Dict[str, int] = {}
+        self._stats_lock = threading.Lock()
+        self._rng = random.Random(self.config.seed)
+        self._tokens: Dict[str, datetime] = {}
+
+        self._http: Optional[ThreadingHTTPServer] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._ws_server = None
+        self._threads: List[threading.Thread] = []
+
+    # ----- 수명 주기 -----
+
+    def start(self) -> Tuple[str, str]:
+        """서버 시작 -> (base_url, wss_url)"""
+        self._http = ThreadingHTTPServer((self.host, self.http_port), self._handler_class())
+        self._http.daemon_threads = True
+        self.http_port = self._http.server_address[1]
+        http_thread = threading.Thread(target=self._http.serve_forever, name="kiwoom-fake-http", daemon=True)
+        http_thread.start()
+
+        ready = threading.Event()
+        ws_thread = threading.Thread(target=self._run_ws_loop, args=(ready,), name="kiwoom-fake-ws", daemon=True)
+        ws_thread.start()
+        ready.wait()
+        self._threads = [http_thread, ws_thread]
+
+        base_url = f"http://{self.host}:{self.http_port}"
+        wss_url = f"ws://{self.host}:{self.ws_port}"
+        logger.info(f"가짜 키움 서버 시작: REST {base_url}, WS {wss_url}")
+        return base_url, wss_url
+
+    def stop(self):
+        if self._http is not None:
+            self._http.shutdown()
+            self._http.server_close()
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+        for thread in self._threads:
+            thread.join(timeout=5)
+        if self.record is not None:
+            self.record.save()
+
+    def _run_ws_loop(self, ready: threading.Event):
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+        self._ws_server = self._loop.run_until_complete(
+            websockets.serve(self._ws_handler, self.host, self.ws_port, ping_interval=None))
+        self.ws_port = self._ws_server.sockets[0].getsockname()[1]
+        ready.set()
+        try:
+            self._loop.run_forever()
+        finally:
+            self._ws_server.close()
+            self._loop.run_until_complete(self._ws_server.wait_closed())
+            self._loop.close()
+
+    def _count(self, key: str):
+        with self._stats_lock:
+            self.stats[key] = self.stats.get(key, 0) + 1
+
+    # ----- REST -----
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                if self.path == '/__stats':
+                    with server._stats_lock:
+                        self._reply(200, dict(server.stats))
+                else:
+                    self._reply(404, {'return_code': 404, 'return_msg': 'not found'})
+
+            def do_POST(self):
+                length = int(self.headers.get('Content-Length', 0))
+                try:
+                    body = json.loads(self.rfile.read(length) or b'{}')
+                except json.JSONDecodeError:
+                    self._reply(400, {'return_code': 400, 'return_msg': 'invalid json'})
+                    return
+                time.sleep(server.config.delay(server._rng))
+                status, payload, headers = server.handle_rest(self.path, dict(self.headers), body)
+                self._reply(status, payload, headers)
+
+            def _reply(self, status: int, payload: Dict[str, Any], headers: Optional[Dict[str, str]] = None):
+                data = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json;charset=UTF-8')
+                self.send_header('Content-Length', str(len(data)))
+                for key, value in (headers or {}).items():
+                    self.send_header(key, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+        return Handler
+
+    def handle_rest(self, path: str, headers: Dict[str, str], body: Dict[str, Any]
+                    ) -> Tuple[int, Dict[str, Any], Dict[str, str]]:
+        """REST 요청 처리 -> (상태코드, 본문, 응답 헤더)"""
+        headers = {k.lower(): v for k, v in headers.items()}
+        if path == TOKEN_PATH:
+            self._count('token')
+            if self.upstream_url:
+                return self._forward(path, headers, body, record_key=None)
+            return 200, self._issue_token(), {}
+
+        if path != CHART_PATH:
+            return 404, {'return_code': 404, 'return_msg': f'unknown path {path}'}, {}
+
+        api_id = headers.get('api-id', '')
+        self._count(api_id)
+        if not self.upstream_url and not self._authorized(headers.get('authorization', '')):
+            return 401, {'return_code': 8005, 'return_msg': '토큰이 유효하지 않습니다'}, {}
+        if not self.limiter.try_acquire(api_id):
+            self._count(f'{api_id}:throttled')
+            return 429, {'return_code': RATE_LIMIT_CODE,
+                         'return_msg': f'[{RATE_LIMIT_CODE}:{RATE_LIMIT_MSG}. API ID={api_id}]'}, {}
+
+        next_key = headers.get('next-key', '') if headers.get('cont-yn') == 'Y' else ''
+        key = Recording.rest_key(api_id, body, next_key)
+        if self.upstream_url:
+            return self._forward(path, headers, body, record_key=key)
+        entry = self.replay.find_rest(api_id, body, next_key) if self.replay is not None else None
+        if entry is not None:
+            return entry['status'], entry['body'], entry.get('headers', {})
+        if self.replay is not None and self.strict:
+            return 404, {'return_code': 404, 'return_msg': f'기록 없음: {key}'}, {}
+        if api_id != 'ka10081':
+            return 400, {'return_code': 2, 'return_msg': f'지원하지 않는 API ID: {api_id}'}, {}
+        return self._chart_page(body, next_key)
+
+    def _issue_token(self) -> Dict[str, Any]:
+        token = f"fake-{self._rng.getrandbits(64):016x}"
+        expires_at = datetime.now() + timedelta(hours=24)
+        self._tokens[token] = expires_at
+        return {'token': token, 'token_type': 'bearer', 'expires_dt': expires_at.strftime('%Y%m%d%H%M%S'),
+                'return_code': 0, 'return_msg': '정상적으로 처리되었습니다'}
+
+    def _authorized(self, authorization: str) -> bool:
+        token = authorization.replace('Bearer', '').strip()
+        expires_at = self._tokens.get(token)
+        return expires_at is not None and datetime.now() < expires_at
+
+    def _chart_page(self, body: Dict[str, Any], next_key: str) -> Tuple[int, Dict[str, Any], Dict[str, str]]:
+        code = str(body.get('stk_cd', ''))
+        base_dt = str(body.get('base_dt') or datetime.now().strftime('%Y%m%d'))
+        rows = [row for row in self.market.candles(code) if row['dt'] <= base_dt]
+        offset = int(next_key) if next_key.isdigit() else 0
+        page = rows[offset:offset + self.config.chart_page_size]
+        more = offset + self.config.chart_page_size < len(rows)
+        headers = {'cont-yn': 'Y' if more else 'N', 'next-key': str(offset + len(page)) if more else '',
+                   'api-id': 'ka10081'}
+        return 200, {'stk_cd': code, 'stk_dt_pole_chart_qry': page, 'return_code': 0,
+                     'return_msg': '정상적으로 처리되었습니다'}, headers
+
+    def _forward(self, path: str, headers: Dict[str, str], body: Dict[str, Any],
+                 record_key: Optional[str]) -> Tuple[int, Dict[str, Any], Dict[str, str]]:
+        """기록 모드: 실제 서버로 중계 후 응답 저장 (토큰 응답은 저장하지 않음)"""
+        forward_headers = {k: v for k, v in headers.items()
+                           if k in ('content-type', 'authorization', 'api-id', 'cont-yn', 'next-key')}
+        resp = requests.post(f"{self.upstream_url}{path}", headers=forward_headers, json=body, timeout=30)
+        try:
+            payload = resp.json()
+        except ValueError:
+            payload = {'return_code': resp.status_code, 'return_msg': resp.text[:200]}
+        reply_headers = {k: resp.headers[k] for k in ('cont-yn', 'next-key', 'api-id') if k in resp.headers}
+        if record_key and self.record is not None and resp.status_code == 200:
+            with self.record._lock:
+                self.record.rest[record_key] = {'status': resp.status_code, 'body': payload,
+                                                'headers': reply_headers}
+        return resp.status_code, payload, reply_headers
+
+    # ----- WebSocket -----
+
+    async def _ws_handler(self, ws):
+        if self.upstream_wss_url:
+            await self._ws_proxy(ws)
+            return
+
+        self._count('ws_connect')
+        state = {'login': False, 'real': {}}
+        tasks = []
+        if self.config.ping_interval:
+            tasks.append(asyncio.create_task(self._ping_loop(ws)))
+        try:
+            async for raw in ws:
+                try:
+                    msg = json.loads(raw)
+                except json.JSONDecodeError:
+                    continue
+                await asyncio.sleep(self.config.delay(self._rng))
+                reply = await self._handle_ws(ws, msg, state, tasks)
+                if reply is None:
+                    continue
+                extra = self.config.condition_delays.get(str(msg.get('seq'))) if msg.get('trnm') == 'CNSRREQ' else None
+                if extra:
+                    # 뒤에 온 요청의 응답이 먼저 나가도록 따로 늦게 보냄
+                    tasks.append(asyncio.create_task(self._send_later(ws, reply, extra)))
+                    continue
+                await ws.send(json.dumps(reply, ensure_ascii=False))
+        except websockets.exceptions.ConnectionClosed:
+            pass
+        finally:
+            for task in tasks + list(state['real'].values()):
+                task.cancel()
+
+    async def _handle_ws(self, ws, msg: Dict[str, Any], state: Dict[str, Any], tasks: List[asyncio.Task]
+                         ) -> Optional[Dict[str, Any]]:
+        trnm = msg.get('trnm')
+        self._count(f'ws:{trnm}')
+        if trnm == 'PING':
+            return None
+        if trnm == 'LOGIN':
+            state['login'] = self._authorized(str(msg.get('token', '')))
+            return {'trnm': 'LOGIN', 'return_code': 0 if state['login'] else 100013,
+                    'return_msg': '' if state['login'] else '토큰이 유효하지 않습니다'}
+        if not state['login']:
+            return {'trnm': trnm, 'return_code': 100013, 'return_msg': '로그인이 필요합니다'}
+
+        if self.replay is not None:
+            key = Recording.ws_key(msg)
+            if key in self.replay.ws:
+                if trnm == 'CNSRREQ' and str(msg.get('search_type')) == '1' and self.replay.real:
+                    seq = str(msg.get('seq'))
+                    state['real'][seq] = asyncio.create_task(self._replay_real(ws, seq))
+                return self.replay.ws[key]
+            if self.strict:
+                return {'trnm': trnm, 'return_code': 404, 'return_msg': f'기록 없음: {key}'}
+
+        if trnm == 'CNSRLST':
+            return {'trnm': 'CNSRLST', 'return_code': 0, 'return_msg': '',
+                    'data': [[seq, name] for seq, name in self.config.conditions.items()]}
+        if trnm == 'CNSRCLR':
+            task = state['real'].pop(str(msg.get('seq')), None)
+            if task is not None:
+                task.cancel()
+            return {'trnm': 'CNSRCLR', 'seq': msg.get('seq'), 'return_code': 0, 'return_msg': ''}
+        if trnm == 'CNSRREQ':
+            return self._condition_reply(ws, msg, state)
+        return {'trnm': trnm, 'return_code': 2, 'return_msg': f'지원하지 않는 요청: {trnm}'}
+
+    def _condition_reply(self, ws, msg: Dict[str, Any], state: Dict[str, Any]) -> Dict[str, Any]:
+        seq = str(msg.get('seq', ''))
+        if not self.limiter.try_acquire('CNSRREQ'):
+            self._count('CNSRREQ:throttled')
+            return {'trnm': 'CNSRREQ', 'seq': seq, 'return_code': RATE_LIMIT_CODE,
+                    'return_msg': f'[{RATE_LIMIT_CODE}:{RATE_LIMIT_MSG}]'}
+        if seq not in self.config.conditions:
+            return {'trnm': 'CNSRREQ', 'seq': seq, 'return_code': 1, 'return_msg': f'조건식 없음: {seq}'}
+
+        codes = self.market.condition_codes(seq)
+        if str(msg.get('search_type')) == '1':
+            if self.config.real_interval and seq not in state['real']:
+                state['real'][seq] = asyncio.create_task(self._synthetic_real(ws, seq, set(codes)))
+            return {'trnm': 'CNSRREQ', 'seq': seq, 'return_code': 0, 'return_msg': '',
+                    'data': [{'jmcode': f"A{code}"} for code in codes]}
+
+        next_key = str(msg.get('next_key') or '') if msg.get('cont_yn') == 'Y' else ''
+        offset = int(next_key) if next_key.isdigit() else 0
+        page = codes[offset:offset + self.config.condition_page_size]
+        more = offset + self.config.condition_page_size < len(codes)
+        return {'trnm': 'CNSRREQ', 'seq': seq, 'return_code': 0, 'return_msg': '',
+                'cont_yn': 'Y' if more else 'N', 'next_key': str(offset + len(page)) if more else '',
+                'data': [self.market.condition_row(code) for code in page]}
+
+    @staticmethod
+    async def _send_later(ws, reply: Dict[str, Any], delay: float):
+        await asyncio.sleep(delay)
+        try:
+            await ws.send(json.dumps(reply, ensure_ascii=False))
+        except websockets.exceptions.ConnectionClosed:
+            pass
+
+    async def _ping_loop(self, ws):
+        while True:
+            await asyncio.sleep(self.config.ping_interval)
+            await ws.send(json.dumps({'trnm': 'PING'}))
+
+    @staticmethod
+    def _real_message(seq: str, code: str, action: str) -> Dict[str, Any]:
+        return {'trnm': 'REAL', 'data': [{
+            'type': '02', 'name': '조건검색', 'item': f"A{code}",
+            'values': {'841': seq, '9001': f"A{code}", '843': action,
+                       '20': datetime.now().strftime('%H%M%S'), '907': '2'}}]}
+
+    async def _synthetic_real(self, ws, seq: str, members: set):
+        """real_interval마다 편입 또는 이탈 이벤트 1건 발생"""
+        rng = random.Random(f"real-{seq}-{self.config.seed}")
+        while True:
+            await asyncio.sleep(self.config.real_interval)
+            if members and rng.random() < 0.5:
+                code = rng.choice(sorted(members))
+                members.discard(code)
+                action = 'D'
+            else:
+                code = rng.choice(self.market.codes)
+                if code in members:
+                    continue
+                members.add(code)
+                action = 'I'
+            await ws.send(json.dumps(self._real_message(seq, code, action), ensure_ascii=False))
+
+    @staticmethod
+    def _real_seq(msg: Dict[str, Any]) -> str:
+        """REAL 메시지의 조건식 번호 (첫 항목 기준)"""
+        for item in msg.get('data', []):
+            return str(item.get('values', {}).get('841', ''))
+        return ''
+
+    async def _replay_real(self, ws, seq: str):
+        """기록된 실시간 이벤트를 등록(CNSRREQ search_type=1) 시점부터 같은 간격으로 재생"""
+        started = time.monotonic()
+        for offset, msg in self.replay.real:
+            values = [item.get('values', {}) for item in msg.get('data', [])]
+            if values and all(str(v.get('841')) != seq for v in values):
+                continue
+            await asyncio.sleep(max(0.0, offset - (time.monotonic() - started)))
+            await ws.send(json.dumps(msg, ensure_ascii=False))
+
+    async def _ws_proxy(self, client):
+        """기록 모드: 실제 WebSocket으로 중계하며 응답/실시간 이벤트 저장"""
+        self._count('ws_connect')
+        pending: Dict[Tuple[str, str], str] = {}
+        registered: Dict[str, float] = {}  # 조건식별 실시간 등록 시각 (REAL 경과 시간 기준)
+        connected = time.monotonic()
+        async with websockets.connect(f"{self.upstream_wss_url}{WS_PATH}", ping_interval=None,
+                                      max_size=10**7) as upstream:
+            async def client_to_upstream():
+                async for raw in client:
+                    msg = json.loads(raw)
+                    if msg.get('trnm') in ('CNSRLST', 'CNSRREQ'):
+                        pending[(msg['trnm'], str(msg.get('seq', '')))] = Recording.ws_key(msg)
+                    if msg.get('trnm') == 'CNSRREQ' and str(msg.get('search_type')) == '1':
+                        registered[str(msg.get('seq', ''))] = time.monotonic()
+                    await upstream.send(raw)
+
+            async def upstream_to_client():
+                async for raw in upstream:
+                    msg = json.loads(raw)
+                    trnm = msg.get('trnm')
+                    key = pending.pop((trnm, str(msg.get('seq', ''))), None) or pending.pop((trnm, ''), None)
+                    if key and self.record is not None:
+                        self.record.ws[key] = msg
+                    elif trnm == 'REAL' and self.record is not None:
+                        started = registered.get(self._real_seq(msg), connected)
+                        self.record.real.append((time.monotonic() - started, msg))
+                    await client.send(raw)
+
+            tasks = [asyncio.create_task(client_to_upstream()), asyncio.create_task(upstream_to_client())]
+            try:
+                await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+            finally:
+                for task in tasks:
+                    task.cancel()
+
+
+def _parse_rates(items: List[str]) -> Dict[str, float]:
+    rates = {}
+    for item in items:
+        key, _, value = item.partition('=')
+        rates[key] = float(value)
+    return rates
+
+
+def main():
+    """벤치마크/회귀 테스트용 가짜 키움 서버 실행 (python -m tests.kiwoom_fake)"""
+    parser = argparse.ArgumentParser(description='가짜 키움 REST/WebSocket 서버')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--http-port', type=int, default=18080)
+    parser.add_argument('--ws-port', type=int, default=18081)
+    parser.add_argument('--latency', type=float, default=0.05, help='응답 지연 (초)')
+    parser.add_argument('--jitter', type=float, default=0.0, help='지연 편차 (초)')
+    parser.add_argument('--rate', action='append', default=[], metavar='API_ID=N',
+                        help='초당 요청 한도 (예: ka10081=5, CNSRREQ=5, 0이면 무제한)')
+    parser.add_argument('--page-size', type=int, default=600, help='ka10081 페이지당 봉 수')
+    parser.add_argument('--days', type=int, default=750, help='종목별 합성 일봉 일수')
+    parser.add_argument('--real-interval', type=float, default=0.0, help='합성 실시간 이벤트 간격 (초)')
+    parser.add_argument('--ping-interval', type=float, default=0.0, help='서버 PING 간격 (초)')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--replay', help='재생할 기록 파일')
+    parser.add_argument('--strict', action='store_true', help='재생시 기록에 없는 요청은 오류 응답')
+    parser.add_argument('--record', help='기록 파일 (--upstream과 함께 사용)')
+    parser.add_argument('--upstream', help='기록 모드 REST 주소 (예: https://api.kiwoom.com)')
+    parser.add_argument('--upstream-wss', help='기록 모드 WebSocket 주소 (예: wss://api.kiwoom.com:10000)')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s [%(levelname)s] %(name)s - %(message)s')
+    config = FakeKiwoomConfig(latency=args.latency, latency_jitter=args.jitter, chart_page_size=args.page_size,
+                              history_days=args.days, real_interval=args.real_interval,
+                              ping_interval=args.ping_interval, seed=args.seed)
+    config.rate_limits.update(_parse_rates(args.rate))
+
+    server = FakeKiwoomServer(
+        config, host=args.host, http_port=args.http_port, ws_port=args.ws_port,
+        replay=Recording.load(args.replay) if args.replay else None,
+        record=Recording(args.record) if args.record else None,
+        upstream_url=args.upstream, upstream_wss_url=args.upstream_wss, strict=args.strict)
+    base_url, wss_url = server.start()
+    logger.info(f"KIWOOM_BASE_URL={base_url} KIWOOM_WSS_URL={wss_url} 로 실행하세요 (Ctrl+C 종료)")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+import numpy as np
+import pytest
+
+from database.backfill import CandleBackfill
+from services.candle_store import CANDLE_DTYPE
+
+
+def records(days: int, start_close: int) -> np.ndarray:
+    out = np.zeros(days, dtype=CANDLE_DTYPE)
+    out['date'] = [20240102 + i for i in range(days)]
+    out['close'] = out['open'] = np.arange(start_close, start_close + days)
+    out['high'] = out['close'] + 10
+    out['low'] = out['close'] - 10
+    out['volume'] = 100
+    out['amount'] = out['close'] * 100
+    return out
+
+
+def count_rows(backend):
+    conn = backend.get_connection(read_only=True)
+    cursor = conn.cursor()
+    try:
+        cursor.execute("SELECT stock_code, COUNT(*), MAX(close_price) FROM daily_candle GROUP BY stock_code")
+        return {code: (count, int(close)) for code, count, close in cursor.fetchall()}
+    finally:
+        cursor.close()
+        conn.close()
+
+
+@pytest.fixture
+def backfill(sqlite_backend, tmp_path):
+    return CandleBackfill(sqlite_backend, progress_path=str(tmp_path / 'progress.json'), chunk_rows=5)
+
+
+def test_interrupted_run_resumes_from_progress(backfill, sqlite_backend):
+    codes = ['000010', '000020', '000030', '000040']
+    loaded = []
+
+    def load(code):
+        # 종목 조회 중에는 연결을 빌리고 있지 않아야 함
+        assert sqlite_backend.pool_stats()['in_use'] == 0
+        loaded.append(code)
+        if code == '000030' and loaded.count(code) == 1:
+            raise RuntimeError("조회 실패")
+        return records(5, int(code))
+
+    with pytest.raises(RuntimeError):
+        backfill.run(codes, load)
+    assert backfill.load_progress()['done'] == ['000010', '000020']
+    assert count_rows(sqlite_backend) == {'000010': (5, 14), '000020': (5, 24)}
+
+    result = backfill.run(codes, load)
+
+    assert loaded == ['000010', '000020', '000030', '000030', '000040']
+    assert (result['symbols'], result['skipped'], result['rows']) == (2, 2, 10)
+    assert count_rows(sqlite_backend) == {code: (5, int(code) + 4) for code in codes}
+    assert backfill.load_progress()['done'] == []
+    assert sqlite_backend.pool_stats()['in_use'] == 0
+
+
+def test_reloading_overwrites_and_restores_indexes(backfill, sqlite_backend):
+    conn = sqlite_backend.get_connection()
+    cursor = conn.cursor()
+    cursor.execute("CREATE INDEX idx_daily_candle_date ON daily_candle (date)")
+    conn.commit()
+    indexes_before = sqlite_backend.secondary_indexes(cursor, 'daily_candle')
+    cursor.close()
+    conn.close()
+
+    backfill.run(['000010'], lambda code: records(8, 100))
+    backfill.run(['000010'], lambda code: records(8, 200))
+
+    conn = sqlite_backend.get_connection()
+    cursor = conn.cursor()
+    try:
+        assert [name for name, _ in indexes_before] == ['idx_daily_candle_date']
+        assert sqlite_backend.secondary_indexes(cursor, 'daily_candle') == indexes_before
+    finally:
+        cursor.close()
+        conn.close()
+    assert count_rows(sqlite_backend) == {'000010': (8, 207)}
@@ -0,0 +1,70 @@
+import pytest
+
+from services.candle_store import CandleStore
+from tests.kiwoom_fake import FakeKiwoomConfig, FakeKiwoomServer
+
+CODE = '000005'
+
+
+class FakeDB:
+    def __init__(self):
+        self.upserts = []
+
+    def upsert_candle_data(self, rows):
+        self.upserts.append(rows)
+
+
+@pytest.fixture
+def server():
+    return FakeKiwoomServer(FakeKiwoomConfig(latency=0, rate_limits={}, chart_page_size=100, history_days=300))
+
+
+def chart_requests(server: FakeKiwoomServer) -> int:
+    return server.stats.get('ka10081', 0)
+
+
+def adjust_prices(server: FakeKiwoomServer, code: str):
+    """액면분할처럼 과거 가격 전체를 절반으로 (수정주가 반영)"""
+    for row in server.market.candles(code):
+        for key in ('cur_prc', 'open_pric', 'high_pric', 'low_pric'):
+            row[key] = str(int(row[key]) // 2)
+
+
+def test_second_sync_fetches_only_the_gap(connect, server, tmp_path):
+    service = connect(server)
+    store = CandleStore(str(tmp_path / 'candles'))
+    db = FakeDB()
+
+    first = store.sync(service, [CODE], days=60, db_handler=db)[CODE]
+    requests_after_first = chart_requests(server)
+    second = store.sync(service, [CODE], days=60, db_handler=db)[CODE]
+
+    assert len(first) == 60
+    assert chart_requests(server) - requests_after_first == 1
+    assert second.equals(first)
+    # 변경 없는 겹침 봉은 다시 기록하지 않음
+    assert len(db.upserts) == 1
+
+
+@pytest.mark.parametrize('sync_one', [False, True])
+def test_overlap_mismatch_triggers_full_refetch(connect, server, tmp_path, sync_one):
+    service = connect(server)
+    store = CandleStore(str(tmp_path / 'candles'))
+    store.sync(service, [CODE], days=60)
+    before = store.load(CODE, mmap=False)
+    adjust_prices(server, CODE)
+    requests_before = chart_requests(server)
+
+    if sync_one:
+        frame, rows = store.sync_one(service, CODE, days=60)
+    else:
+        frame = store.sync(service, [CODE], days=60)[CODE]
+        rows = store.load(CODE)
+
+    # 증분 조회 1페이지 + 전체 재수집 1페이지
+    assert chart_requests(server) - requests_before == 2
+    stored = store.load(CODE)
+    assert (stored['date'] == before['date']).all()
+    assert (stored['close'] == before['close'] // 2).all()
+    assert len(rows) == len(stored)
+    assert frame['close'].iloc[0] == stored['close'][-1]
@@ -0,0 +1,151 @@
+import threading
+import time
+
+import mysql.connector
+import pytest
+from mysql.connector.errors import PoolError
+
+from database.connection import ConnectionPool
+
+
+class FakeConnection:
+    """mysql.connector 연결 대역 (풀이 부르는 메서드만)"""
+
+    def __init__(self, number: int):
+        self.number = number
+        self.closed = False
+        self.ping_ok = True
+        self.reset_ok = True
+        self.resets = 0
+        self.rollbacks = 0
+
+    def ping(self, reconnect: bool = False):
+        if not self.ping_ok:
+            raise mysql.connector.errors.InterfaceError("gone away")
+
+    def reset_session(self):
+        if not self.reset_ok:
+            raise mysql.connector.errors.OperationalError("lost")
+        self.resets += 1
+
+    def rollback(self):
+        self.rollbacks += 1
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def connections(monkeypatch):
+    """mysql.connector.connect가 만든 가짜 연결 목록"""
+    created = []
+
+    def connect(**kwargs):
+        conn = FakeConnection(len(created))
+        created.append(conn)
+        return conn
+
+    monkeypatch.setattr(mysql.connector, 'connect', connect)
+    return created
+
+
+def make_pool(**kwargs) -> ConnectionPool:
+    options = dict(pool_size=1, max_overflow=0, timeout=1.0, recycle=0, pre_ping=False)
+    options.update(kwargs)
+    return ConnectionPool({'host': 'fake'}, **options)
+
+
+def test_released_connection_is_reused(connections):
+    pool = make_pool()
+
+    first = pool.get_connection()
+    assert first.number == 0
+    first.close()
+    with pytest.raises(PoolError):
+        first.cursor()
+    pool.get_connection(read_only=True).close()
+
+    assert len(connections) == 1
+    assert (connections[0].resets, connections[0].rollbacks) == (1, 1)
+    stats = pool.stats()
+    assert (stats['checkouts'], stats['created'], stats['in_use'], stats['idle']) == (2, 1, 0, 1)
+
+
+def test_full_pool_blocks_until_release(connections):
+    pool = make_pool()
+    held = pool.get_connection()
+    acquired = []
+    waiter = threading.Thread(target=lambda: acquired.append(pool.get_connection(timeout=2.0)))
+    waiter.start()
+
+    time.sleep(0.1)
+    assert not acquired
+    held.close()
+    waiter.join(2.0)
+
+    assert acquired and acquired[0].number == 0
+    assert pool.stats()['wait_time_max'] >= 0.1
+
+
+def test_full_pool_times_out(connections):
+    pool = make_pool(timeout=0.1)
+    pool.get_connection()
+
+    started = time.monotonic()
+    with pytest.raises(PoolError):
+        pool.get_connection()
+
+    assert time.monotonic() - started >= 0.1
+    stats = pool.stats()
+    assert (stats['timeouts'], stats['in_use']) == (1, 1)
+
+
+def test_overflow_connections_are_discarded_on_release(connections):
+    pool = make_pool(max_overflow=1)
+    first, second = pool.get_connection(), pool.get_connection()
+    with pytest.raises(PoolError):
+        pool.get_connection(timeout=0)
+
+    first.close()
+    second.close()
+
+    assert [conn.closed for conn in connections] == [False, True]
+    stats = pool.stats()
+    assert (stats['in_use'], stats['idle']) == (0, 1)
+
+
+def test_old_connection_is_recycled(connections):
+    pool = make_pool(recycle=0.05)
+    pool.get_connection().close()
+    time.sleep(0.1)
+
+    conn = pool.get_connection()
+
+    assert conn.number == 1 and connections[0].closed
+    assert pool.stats()['recycled'] == 1
+
+
+def test_pre_ping_replaces_dead_idle_connection(connections):
+    pool = make_pool(pre_ping=True, ping_interval=0)
+    pool.get_connection().close()
+    reused = pool.get_connection()
+    assert reused.number == 0  # ping 성공 -> 그대로 재사용
+    reused.close()
+    connections[0].ping_ok = False
+
+    conn = pool.get_connection()
+
+    assert conn.number == 1 and connections[0].closed
+    assert pool.stats()['failures'] == 1
+
+
+def test_failed_session_reset_discards_connection(connections):
+    pool = make_pool()
+    conn = pool.get_connection()
+    connections[0].reset_ok = False
+
+    conn.close()
+
+    assert connections[0].closed
+    assert pool.stats()['idle'] == 0
+    assert pool.get_connection().number == 1
@@ -0,0 +1,97 @@
+import asyncio
+import time
+
+import pytest
+
+from services.condition_stream import ConditionStream
+from services.kiwoom_service import KiwoomAPIService
+from services.kiwoom_ws import KiwoomWebSocketSession
+from tests.kiwoom_fake import FakeKiwoomConfig, FakeKiwoomServer, Recording
+
+
+def test_daily_candles_follow_pages(connect):
+    service = connect(FakeKiwoomServer(FakeKiwoomConfig(latency=0, rate_limits={}, chart_page_size=100,
+                                                        history_days=300)))
+
+    df = service.get_daily_candles('000005', count=250)
+
+    assert len(df) == 250
+    assert df['date'].is_monotonic_decreasing
+    assert (df['low'] > 0).all() and (df['high'] >= df['low']).all()
+
+
+def test_condition_search_over_websocket(connect):
+    service = connect(FakeKiwoomServer(FakeKiwoomConfig(latency=0, rate_limits={}, condition_size=30,
+                                                        condition_page_size=10)))
+
+    async def request():
+        async with KiwoomWebSocketSession(service) as session:
+            return await session.request_conditions(['1', '2'])
+
+    results = asyncio.run(request())
+
+    assert {seq: len(rows) for seq, rows in results.items()} == {'1': 30, '2': 30}
+    assert all(row['code'] and row['name'] for row in results['1'])
+
+
+def test_late_reply_for_timed_out_seq_is_not_given_to_another_seq(connect):
+    # seq 1 응답은 타임아웃 뒤, seq 2 응답보다 먼저 도착
+    service = connect(FakeKiwoomServer(FakeKiwoomConfig(latency=0, rate_limits={},
+                                                        condition_delays={'1': 0.4, '2': 0.3})))
+
+    async def request():
+        async with KiwoomWebSocketSession(service) as session:
+            with pytest.raises(asyncio.TimeoutError):
+                await session.send_request({'trnm': 'CNSRREQ', 'seq': '1', 'search_type': '0'}, timeout=0.2)
+            await asyncio.sleep(0.05)
+            return await session.send_request({'trnm': 'CNSRREQ', 'seq': '2', 'search_type': '0'}, timeout=2.0)
+
+    reply = asyncio.run(request())
+
+    assert reply['seq'] == '2'
+
+
+async def _first_event_delay(service: KiwoomAPIService, idle: float, wait: float) -> float:
+    """연결 후 idle초 쉬었다가 실시간 등록, 첫 편입/이탈 이벤트까지 걸린 시간"""
+    events = []
+
+    async def on_event(seq, row):
+        events.append(time.monotonic())
+
+    session = KiwoomWebSocketSession(service)
+    stream = ConditionStream(session, on_remove=on_event)
+    try:
+        await session.connect()
+        await asyncio.sleep(idle)
+        registered = time.monotonic()
+        await stream.subscribe(['1'])
+        # 최초 응답 편입은 무시하고 REAL 이벤트만 기다림
+        stream.on_insert = on_event
+        deadline = registered + wait
+        while not events and time.monotonic() < deadline:
+            await asyncio.sleep(0.01)
+        return events[0] - registered if events else wait
+    finally:
+        await session.close()
+
+
+def test_recorded_real_events_replay_from_registration(connect, tmp_path):
+    upstream = FakeKiwoomServer(FakeKiwoomConfig(latency=0, rate_limits={}, real_interval=0.2))
+    upstream_url, upstream_wss_url = upstream.start()
+    recording = Recording(str(tmp_path / 'kiwoom.json'))
+    try:
+        recorder = FakeKiwoomServer(FakeKiwoomConfig(latency=0), record=recording,
+                                    upstream_url=upstream_url, upstream_wss_url=upstream_wss_url)
+        service = connect(recorder)
+        # 등록 전에 쉰 시간은 기록되는 경과 시간에 들어가면 안 됨
+        asyncio.run(_first_event_delay(service, idle=0.6, wait=2.0))
+        time.sleep(0.1)
+    finally:
+        upstream.stop()
+
+    assert recording.real
+    assert recording.real[0][0] < 0.5
+
+    replayer = FakeKiwoomServer(FakeKiwoomConfig(latency=0), replay=recording)
+    delay = asyncio.run(_first_event_delay(connect(replayer), idle=0.6, wait=2.0))
+    assert abs(delay - recording.real[0][0]) < 0.3
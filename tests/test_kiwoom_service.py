@@ -0,0 +1,30 @@
+from services.kiwoom_service import parse_chart_rows
+
+
+def _row(dt, open_, high, low, close, volume='100'):
+    return {'dt': dt, 'open_pric': open_, 'high_pric': high, 'low_pric': low, 'cur_prc': close,
+            'trde_qty': volume, 'trde_prica': '1'}
+
+
+def test_parse_chart_rows_orders_ascending_and_strips_signs():
+    columns = parse_chart_rows([_row('20240103', '+110', '+120', '-100', '+115'),
+                                _row('20240102', '100', '105', '95', '-101')])
+
+    assert columns['date'].tolist() == [20240102, 20240103]
+    assert columns['low'].tolist() == [95, 100]
+    assert columns['close'].tolist() == [101, 115]
+
+
+def test_parse_chart_rows_drops_rows_with_missing_fields():
+    rows = [
+        _row('20240105', '100', '110', '', '105'),      # 저가 없음
+        _row('', '100', '110', '90', '105'),            # 날짜 없음
+        _row('20240103', '0', '110', '90', '105'),      # 시가 0
+        _row('20240102', '100', None, '90', '105'),     # 고가 없음
+        _row('20240101', '100', '110', '90', '105'),
+    ]
+
+    columns = parse_chart_rows(rows)
+
+    assert columns['date'].tolist() == [20240101]
+    assert all(len(column) == 1 for column in columns.values())
@@ -0,0 +1,99 @@
+from datetime import date
+from decimal import Decimal
+
+import pytest
+
+from database import position_dao
+from database.models import PRICE_SCALE
+from database.position_dao import PositionDAO
+from tests.conftest import make_position
+
+
+@pytest.fixture
+def dao(sqlite_backend):
+    # 요약 캐시는 프로세스 전역이므로 테스트마다 비움
+    position_dao._invalidate_summary()
+    yield PositionDAO(sqlite_backend)
+    position_dao._invalidate_summary()
+
+
+def assert_summary_matches_rebuild(dao: PositionDAO) -> dict:
+    maintained = dao.get_positions_summary()
+    assert maintained == dao.rebuild_summary()
+    return maintained
+
+
+def test_summary_deltas_match_full_rebuild(dao):
+    ids = [dao.create_position(make_position(code)) for code in ('005930', '000660', '035720', '051910')]
+    assert assert_summary_matches_rebuild(dao)['active_positions'] == 4
+
+    assert dao.close_position(ids[0], date(2024, 4, 1), Decimal('11000'), 'TRAILING', Decimal('10000.50'))
+    assert dao.close_position(ids[1], date(2024, 4, 2), Decimal('9500'), 'STOP_LOSS', Decimal('-5000'))
+    # 손익 없이 종료된 포지션은 청산 집계에서 빠짐
+    assert dao.close_position(ids[2], date(2024, 4, 3), Decimal('10000'), 'MANUAL', None)
+    summary = assert_summary_matches_rebuild(dao)
+
+    assert summary == {
+        'active_positions': 1, 'total_positions': 4, 'closed_positions': 2,
+        'total_pnl': 5000.5, 'avg_pnl': 2500.25, 'win_count': 1, 'win_rate': 50.0,
+    }
+
+
+def test_double_close_does_not_count_twice(dao):
+    position_id = dao.create_position(make_position('005930'))
+    assert dao.close_position(position_id, date(2024, 4, 1), Decimal('11000'), 'TRAILING', Decimal('1000'))
+
+    assert not dao.close_position(position_id, date(2024, 4, 2), Decimal('12000'), 'TRAILING', Decimal('2000'))
+    assert not dao.close_position(position_id + 100, date(2024, 4, 2), Decimal('12000'), 'MANUAL', Decimal('1'))
+
+    summary = assert_summary_matches_rebuild(dao)
+    assert (summary['closed_positions'], summary['total_pnl']) == (1, 1000.0)
+
+
+def test_missing_summary_row_is_rebuilt_in_the_write_transaction(dao, sqlite_backend):
+    dao.create_position(make_position('005930'))
+    conn = sqlite_backend.get_connection()
+    cursor = conn.cursor()
+    cursor.execute("DELETE FROM turtle_position_summary")
+    conn.commit()
+    cursor.close()
+    conn.close()
+
+    dao.create_position(make_position('000660'))
+
+    assert assert_summary_matches_rebuild(dao)['total_positions'] == 2
+
+
+def test_bulk_trailing_stop_update_returns_unmatched_ids(dao):
+    ids = [dao.create_position(make_position(code)) for code in ('005930', '000660', '035720')]
+    dao.close_position(ids[2], date(2024, 4, 1), Decimal('11000'), 'TRAILING', Decimal('1000'))
+
+    unmatched = dao.update_trailing_stops([
+        (ids[0], Decimal('9800'), Decimal('10300')),
+        (ids[1], Decimal('9700'), Decimal('10200')),
+        (ids[0], Decimal('9900'), Decimal('10400')),  # 같은 ID는 마지막 값
+        (ids[2], Decimal('1'), Decimal('1')),         # 청산된 포지션
+        (ids[2] + 100, Decimal('1'), Decimal('1')),   # 없는 포지션
+    ])
+
+    assert unmatched == [ids[2], ids[2] + 100]
+    positions = dao.get_active_positions_by_stock(['005930', '000660'])
+    assert (positions['005930'].current_trailing_stop, positions['005930'].current_add_position) == \
+        (Decimal('9900'), Decimal('10400'))
+    assert (positions['000660'].current_trailing_stop, positions['000660'].current_add_position) == \
+        (Decimal('9700'), Decimal('10200'))
+    # 청산된 포지션 값은 그대로
+    frame = dao.get_positions_frame(['035720'], include_closed=True)
+    assert frame.current_trailing_stop.tolist() == [9700 * PRICE_SCALE]
+
+
+def test_bulk_trailing_stop_update_spans_chunks(dao, monkeypatch):
+    monkeypatch.setattr(position_dao, 'LOOKUP_CHUNK_SIZE', 2)
+    codes = [f"{i:06d}" for i in range(1, 6)]
+    ids = [dao.create_position(make_position(code)) for code in codes]
+
+    unmatched = dao.update_trailing_stops([(pid, Decimal(9000 + pid), Decimal(11000 + pid)) for pid in ids])
+
+    assert unmatched == []
+    positions = dao.get_active_positions_by_stock(codes)
+    assert {p.id: p.current_trailing_stop for p in positions.values()} == {pid: Decimal(9000 + pid) for pid in ids}
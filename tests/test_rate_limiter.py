@@ -0,0 +1,92 @@
+import pytest
+
+from services import rate_limiter
+from services.rate_limiter import AdaptiveRateLimiter, parse_rate_limits
+
+
+class FakeClock:
+    """rate_limiter 모듈이 쓰는 time 대역 (sleep하면 시간만 흐름)"""
+
+    def __init__(self):
+        self.now = 1000.0
+        self.slept = []
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float):
+        self.slept.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(rate_limiter, 'time', fake)
+    return fake
+
+
+def test_parse_rate_limits():
+    assert parse_rate_limits('ka10081=5, CNSRREQ=2.5,*=10,broken') == {'ka10081': 5.0, 'CNSRREQ': 2.5, '*': 10.0}
+
+
+def test_bucket_waits_for_refill_and_global_budget(clock):
+    limiter = AdaptiveRateLimiter({'ka10081': 2, '*': 1})
+
+    waits = [limiter._reserve('ka10081') for _ in range(3)]
+
+    # 전체 예산(초당 1개)이 키 예산보다 먼저 바닥남
+    assert waits == [0.0, pytest.approx(1.0), pytest.approx(2.0)]
+    assert limiter._reserve('unlimited') == pytest.approx(3.0)
+
+
+def test_throttled_halves_rate_and_blocks(clock):
+    limiter = AdaptiveRateLimiter({'ka10081': 10})
+    limiter.acquire('ka10081')
+
+    limiter.on_throttled('ka10081')
+
+    assert limiter.rate('ka10081') == 5
+    assert limiter._buckets['ka10081'].ceiling == 9
+    assert limiter._buckets['ka10081'].blocked_until == pytest.approx(clock.now + 0.2)
+    limiter.acquire('ka10081')
+    assert clock.slept == [pytest.approx(0.2)]
+
+    limiter.on_throttled('ka10081', retry_after=3.0)
+    assert limiter.rate('ka10081') == 2.5
+    assert limiter._reserve('ka10081') == pytest.approx(3.0)
+    assert limiter.stats['ka10081:throttled'] == 2
+
+
+def test_success_recovers_to_learned_ceiling(clock):
+    limiter = AdaptiveRateLimiter({'ka10081': 10}, probe=0.0)
+    limiter.on_throttled('ka10081')
+
+    for _ in range(5):
+        limiter.on_success('ka10081')
+    assert limiter.rate('ka10081') == pytest.approx(7.5)
+
+    for _ in range(100):
+        limiter.on_success('ka10081')
+    assert limiter.rate('ka10081') == pytest.approx(9.0)
+
+
+def test_ceiling_probes_back_up_to_max_rate(clock):
+    limiter = AdaptiveRateLimiter({'ka10081': 10}, probe=0.01)
+    limiter.on_throttled('ka10081')
+
+    for _ in range(1000):
+        limiter.on_success('ka10081')
+
+    assert limiter.rate('ka10081') == 10
+    assert limiter._buckets['ka10081'].ceiling == 10
+
+
+def test_unknown_key_is_managed_after_throttle(clock):
+    limiter = AdaptiveRateLimiter({})
+    assert limiter.rate('CNSRREQ') is None
+
+    limiter.on_throttled('CNSRREQ')
+
+    assert limiter.rate('CNSRREQ') == 0.5  # 1/초에서 시작해 절반
+    assert limiter._reserve('CNSRREQ') > 0
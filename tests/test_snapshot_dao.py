@@ -0,0 +1,46 @@
+from datetime import datetime
+
+from database.snapshot_dao import ConditionSnapshotDAO
+
+
+def stock(code: str, **levels) -> dict:
+    row = {'code': code, 'name': f"종목{code}", 'current': '+70500', 'sign': '2', 'change': '+500',
+           'rate': '+0.71', 'volume': '1234567', 'open': '70000', 'high': '71000', 'low': '69800'}
+    row.update(levels)
+    return row
+
+
+def test_snapshot_round_trip(sqlite_backend):
+    dao = ConditionSnapshotDAO(sqlite_backend)
+    held = stock('005930', stop_loss=68999.995, trailing_stop=69500.0, add_position=70625.13,
+                 atr_20=250.1234, entry_price=70000.0, entry_date='2024-03-04', position_id=7)
+    candidate = stock('000660', stop_loss=148000.5, trailing_stop=None, add_position=151000.0,
+                      atr_20=1000.0)
+    unquoted = {'code': '035720', 'name': None, 'current': None, 'stop_loss': 'N/A'}
+
+    first = dao.save_snapshot(datetime(2024, 3, 4, 16, 0), {'1': [held, candidate], '2': [unquoted]})
+    second = dao.save_snapshot(datetime(2024, 3, 5, 16, 0), {'1': [], '2': []})
+
+    assert dao.get_latest_snapshot_id() == second
+    snapshot = dao.get_snapshot(first)
+    assert snapshot.taken_at == datetime(2024, 3, 4, 16, 0)
+    assert [row['code'] for row in snapshot.system1] == ['005930', '000660']
+
+    saved = snapshot.system1[0]
+    assert {key: saved[key] for key in ('name', 'current', 'sign', 'rate', 'volume')} == \
+        {key: held[key] for key in ('name', 'current', 'sign', 'rate', 'volume')}
+    # 가격은 고정소수점으로 저장 (가격 소수 2자리, ATR 4자리)
+    assert (saved['stop_loss'], saved['trailing_stop'], saved['add_position']) == (69000.0, 69500.0, 70625.13)
+    assert (saved['atr_20'], saved['entry_price']) == (250.1234, 70000.0)
+    assert (saved['entry_date'], saved['position_id']) == ('2024-03-04', 7)
+
+    assert snapshot.system1[1]['trailing_stop'] is None
+    assert (snapshot.system1[1]['entry_date'], snapshot.system1[1]['position_id']) == (None, None)
+    assert snapshot.system2 == [{
+        'code': '035720', 'name': None, 'current': None, 'sign': None, 'change': None, 'rate': None,
+        'volume': None, 'open': None, 'high': None, 'low': None, 'stop_loss': None, 'trailing_stop': None,
+        'add_position': None, 'atr_20': None, 'entry_price': None, 'entry_date': None, 'position_id': None,
+    }]
+
+    latest = dao.get_snapshot()
+    assert latest.id == second and latest.system1 == [] and latest.system2 == []
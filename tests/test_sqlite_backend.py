@@ -0,0 +1,61 @@
+import subprocess
+import sys
+from datetime import date
+from decimal import Decimal
+
+import numpy as np
+
+from database.handler import DatabaseHandler
+from database.position_dao import PositionDAO
+from tests.conftest import make_position
+
+
+def candle(stock_code: str, day: date, close: int) -> dict:
+    return {'stock_code': stock_code, 'date': day, 'open': close, 'high': close + 50,
+            'low': close - 50, 'close': close, 'volume': 1000, 'amount': close * 1000}
+
+
+def test_import_does_not_register_sqlite_types():
+    # MySQL만 쓰는 프로세스에서는 sqlite3 전역 변환이 바뀌지 않아야 함
+    code = ("import sqlite3, decimal, database.backends; "
+            "print((decimal.Decimal, sqlite3.PrepareProtocol) in sqlite3.adapters)")
+    result = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == 'False'
+
+
+def test_candle_upsert_overwrites_same_day(sqlite_backend):
+    handler = DatabaseHandler(sqlite_backend)
+    handler.upsert_candle_data([candle('005930', date(2024, 3, d), 70000 + d) for d in (4, 5, 6)])
+    handler.upsert_candle_data([candle('005930', date(2024, 3, 6), 71000)])
+
+    df = handler.get_candle_data_for_turtle('005930', days=2)
+
+    assert list(df['date']) == [date(2024, 3, 5), date(2024, 3, 6)]
+    assert [float(v) for v in df['close_price']] == [70005.0, 71000.0]
+
+
+def test_recent_candle_block_pads_short_history(sqlite_backend):
+    handler = DatabaseHandler(sqlite_backend)
+    handler.upsert_candle_data([candle('005930', date(2024, 3, d), 70000 + d) for d in range(4, 9)]
+                               + [candle('000660', date(2024, 3, 8), 150000)])
+
+    codes, block, mask = handler.get_recent_candle_block(['005930', '000660'], days=3, end_date='2024-03-08')
+
+    assert codes == ['005930', '000660']
+    assert block['date'][0].tolist() == [20240306, 20240307, 20240308]
+    assert mask[1].tolist() == [False, False, True]
+    assert np.isnan(block['close'][1, 0]) and block['close'][1, 2] == 150000
+
+
+def test_position_round_trip_keeps_decimal_and_date_types(sqlite_backend):
+    dao = PositionDAO(sqlite_backend)
+    position_id = dao.create_position(make_position('005930'))
+
+    loaded = dao.get_active_positions_by_stock(['005930', '000660'])
+
+    assert list(loaded) == ['005930']
+    position = loaded['005930']
+    assert position.id == position_id
+    assert position.entry_date == date(2024, 3, 4)
+    assert position.entry_atr == Decimal('250.5')
+    assert position.current_add_position == Decimal('10125.25')
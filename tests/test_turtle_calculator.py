@@ -0,0 +1,62 @@
+import math
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from services.turtle_calculator import TurtleCalculator, _round_half
+
+
+def daily_candles(days: int, seed: int) -> pd.DataFrame:
+    """최신순 일봉 (get_daily_candles와 같은 형식)"""
+    rng = np.random.default_rng(seed)
+    close = np.round(5000 * np.exp(np.cumsum(rng.normal(0, 0.02, days))), 1)
+    high = close + np.round(rng.uniform(0, 80, days), 1)
+    low = close - np.round(rng.uniform(0, 80, days), 1)
+    df = pd.DataFrame({'date': pd.bdate_range('2024-01-02', periods=days),
+                       'open': close, 'high': high, 'low': low, 'close': close})
+    return df.iloc[::-1].reset_index(drop=True)
+
+
+@pytest.mark.parametrize('ndigits', [2, 4])
+def test_round_half_matches_builtin_round(ndigits):
+    rng = np.random.default_rng(ndigits)
+    values = np.concatenate([
+        rng.uniform(-1e6, 1e6, 20000),
+        rng.integers(0, 10 ** 7, 20000) / 10 ** (ndigits + 1),  # x.xx5 경계값
+        [0.125, 2.675, -2.5, 0.0, 1e-9, np.nan, np.inf],
+    ])
+
+    rounded = _round_half(values, ndigits)
+    expected = [round(value, ndigits) for value in values.tolist()]
+
+    assert all(a == b or (math.isnan(a) and math.isnan(b)) for a, b in zip(rounded.tolist(), expected))
+
+
+@pytest.mark.parametrize('system_type', [1, 2])
+def test_universe_levels_match_calculate_current_levels(system_type):
+    calculator = TurtleCalculator()
+    # 60일 미만 종목은 계산 불가로 표시
+    frames = [daily_candles(days, seed) for seed, days in enumerate([60, 61, 75, 59, 20, 90] * 5)]
+
+    block = calculator.stack_candles(frames, days=60)
+    levels = calculator.calculate_universe_levels(block['high'], block['low'], block['close'], system_type)
+
+    for row, df in enumerate(frames):
+        expected = calculator.calculate_current_levels(df.head(60), system_type)
+        assert bool(levels['valid'][row]) == bool(expected)
+        if expected:
+            assert {key: levels[key][row].item() for key in expected} == expected
+
+
+def test_universe_levels_accept_per_symbol_system():
+    calculator = TurtleCalculator()
+    frames = [daily_candles(70, seed) for seed in range(6)]
+    systems = np.array([1, 2, 1, 2, 2, 1])
+
+    block = calculator.stack_candles(frames, days=60)
+    levels = calculator.calculate_universe_levels(block['high'], block['low'], block['close'], systems)
+
+    for row, (df, system_type) in enumerate(zip(frames, systems)):
+        expected = calculator.calculate_current_levels(df.head(60), int(system_type))
+        assert {key: levels[key][row].item() for key in expected} == expected
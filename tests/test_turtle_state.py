@@ -0,0 +1,81 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from services.turtle_calculator import TurtleCalculator
+from services.turtle_state import IndicatorStateStore, SymbolIndicatorState
+
+
+def daily_candles(days: int = 120, seed: int = 0) -> pd.DataFrame:
+    """10원 단위 랜덤워크 일봉 (오름차순)"""
+    rng = np.random.default_rng(seed)
+    close = 10000 + np.cumsum(rng.integers(-30, 31, days)) * 10
+    high = close + rng.integers(0, 20, days) * 10
+    low = close - rng.integers(0, 20, days) * 10
+    return pd.DataFrame({
+        'date': pd.bdate_range('2024-01-02', periods=days),
+        'open': close, 'high': high, 'low': low, 'close': close,
+        'volume': rng.integers(1000, 5000, days),
+    })
+
+
+# 모든 봉이 확정된 것으로 보는 기준일
+CONFIRMED = '99991231'
+
+
+@pytest.fixture
+def store(tmp_path):
+    return IndicatorStateStore(str(tmp_path / 'state.json'))
+
+
+@pytest.mark.parametrize('system_type', [1, 2])
+def test_seed_and_advance_match_calculate_current_levels(store, system_type):
+    df = daily_candles()
+    calculator = TurtleCalculator()
+
+    seeded = store.seed('005930', df.iloc[:100], cutoff=CONFIRMED)
+    assert seeded.levels(system_type) == calculator.calculate_current_levels(df.iloc[:100], system_type)
+
+    # 겹치는 구간을 포함한 최근 봉으로 하루씩 전진
+    for end in range(101, len(df) + 1):
+        state = store.advance('005930', df.iloc[end - 5:end], cutoff=CONFIRMED)
+        assert state.levels(system_type) == calculator.calculate_current_levels(df.iloc[:end], system_type)
+
+
+def test_state_round_trips_through_dict(store):
+    state = store.seed('005930', daily_candles(), cutoff=CONFIRMED)
+
+    restored = SymbolIndicatorState.from_dict(state.to_dict())
+
+    assert restored.to_dict() == state.to_dict()
+    assert restored.levels(1) == state.levels(1) and restored.levels(2) == state.levels(2)
+
+
+def test_advance_returns_none_on_gap(store):
+    df = daily_candles()
+    store.seed('005930', df.iloc[:80], cutoff=CONFIRMED)
+
+    # 81번째 봉이 빠진 최근 봉
+    assert store.advance('005930', df.iloc[81:90], cutoff=CONFIRMED) is None
+    assert store.advance('000660', df.iloc[80:90], cutoff=CONFIRMED) is None
+    assert store.get('005930').last_date == df['date'].iloc[79].strftime('%Y%m%d')
+
+
+def test_intraday_bar_is_not_persisted(store, tmp_path):
+    df = daily_candles()
+    today = df['date'].iloc[-1].strftime('%Y%m%d')
+    intraday = df.copy()
+    intraday.loc[intraday.index[-1], ['high', 'close']] += 500
+
+    view = store.seed('005930', intraday, cutoff=today)
+    store.save()
+
+    # 반환된 상태는 장중 봉까지, 저장된 상태는 전일까지
+    assert view.last_date == today
+    assert view.levels(1) == TurtleCalculator().calculate_current_levels(intraday, 1)
+    reloaded = IndicatorStateStore(str(tmp_path / 'state.json'))
+    assert reloaded.get('005930').last_date == df['date'].iloc[-2].strftime('%Y%m%d')
+
+    # 장 마감 후 확정된 당일 봉은 장중 값이 아닌 확정 값으로 반영
+    state = reloaded.advance('005930', df.tail(5), cutoff=CONFIRMED)
+    assert state.levels(1) == TurtleCalculator().calculate_current_levels(df, 1)
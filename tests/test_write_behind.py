@@ -0,0 +1,155 @@
+import glob
+import shutil
+import threading
+from decimal import Decimal
+
+import numpy as np
+import pytest
+
+from services.candle_store import CANDLE_DTYPE
+from services.write_behind import WriteBehindQueue
+
+# pid_max(2^22)보다 커서 실제 프로세스가 가질 수 없는 pid
+DEAD_PID = 4194305
+
+
+class FakeDB:
+    """일봉 업서트만 흉내내는 DatabaseHandler (gate가 열릴 때까지 기록을 붙잡아 둠)"""
+
+    def __init__(self, fail: bool = False):
+        self.fail = fail
+        self.gate = threading.Event()
+        self.gate.set()
+        self.entered = threading.Event()
+        self.rows = {}
+        self.batches = 0
+
+    def upsert_candle_data(self, rows):
+        self.entered.set()
+        self.gate.wait(5)
+        if self.fail:
+            raise ConnectionError("db down")
+        self.batches += 1
+        for row in rows:
+            self.rows[(row['stock_code'], row['date'].isoformat())] = row['close']
+
+
+class FakeDAO:
+    def __init__(self):
+        self.stops = {}
+
+    def update_trailing_stops(self, updates):
+        for position_id, stop, add in updates:
+            self.stops[position_id] = (stop, add)
+        return []
+
+
+def candles(closes, start=20240102):
+    records = np.zeros(len(closes), dtype=CANDLE_DTYPE)
+    records['date'] = np.arange(start, start + len(closes))
+    records['open'] = records['high'] = records['low'] = records['close'] = closes
+    return records
+
+
+def spool_files(base):
+    return sorted(path for path in glob.glob(f"{base}*") if not path.endswith('.lock'))
+
+
+@pytest.fixture
+def spool(tmp_path):
+    return str(tmp_path / 'spool.jsonl')
+
+
+def test_same_key_writes_coalesce_to_last_value(spool):
+    db, dao = FakeDB(), FakeDAO()
+    queue = WriteBehindQueue(db, dao, spool_path=spool, batch_size=1000, flush_interval=60)
+    try:
+        for close in (100, 110, 120):
+            queue.upsert_candles('005930', candles([close, close + 1]))
+        for stop in ('90', '95'):
+            queue.update_trailing_stop(7, Decimal(stop), Decimal('130'))
+        assert queue.pending == 3
+        assert queue.flush(5)
+    finally:
+        queue.close(5)
+
+    assert db.batches == 1
+    assert db.rows == {('005930', '2024-01-02'): 120, ('005930', '2024-01-03'): 121}
+    assert dao.stops == {7: (Decimal('95'), Decimal('130'))}
+    assert queue.stats['coalesced'] == 5
+    assert spool_files(spool) == []
+
+
+def test_failed_write_is_retried_and_newer_value_wins(spool):
+    db = FakeDB(fail=True)
+    db.gate.clear()
+    queue = WriteBehindQueue(db, spool_path=spool, batch_size=1, flush_interval=0,
+                             retry_delay=0.05, max_retry_delay=0.05)
+    try:
+        queue.upsert_candles('000660', candles([50]))
+        assert db.entered.wait(5)
+        # 첫 기록이 진행 중일 때 같은 키의 새 값이 들어옴 -> 실패해 되돌아온 옛 값보다 우선
+        queue.upsert_candles('000660', candles([55]))
+        db.gate.set()
+        assert not queue.flush(0.2)
+        assert queue.stats['retries'] >= 1
+
+        db.fail = False
+        assert queue.flush(5)
+    finally:
+        queue.close(5)
+
+    assert db.rows == {('000660', '2024-01-02'): 55}
+    assert spool_files(spool) == []
+
+
+def test_spool_of_dead_process_is_replayed(spool):
+    db = FakeDB()
+    db.gate.clear()
+    queue = WriteBehindQueue(db, spool_path=spool, batch_size=1000, flush_interval=60)
+    queue.upsert_candles('035720', candles([10, 11]))
+    queue.upsert_candles('035720', candles([12], start=20240103))
+    # 기록 전에 죽은 워커의 스풀 (마지막 줄은 크래시로 잘림)
+    dead_spool = f"{spool}.{DEAD_PID}"
+    shutil.copy(queue.spool_path, dead_spool)
+    with open(dead_spool, 'a', encoding='utf-8') as f:
+        f.write('["candle", "035720:2024-01-0')
+    db.gate.set()
+    queue.close(5)
+
+    recovered_db = FakeDB()
+    recovered = WriteBehindQueue(recovered_db, spool_path=spool, batch_size=1000, flush_interval=60)
+    try:
+        assert recovered.pending == 2
+        assert spool_files(spool) == [recovered.spool_path]
+        assert recovered.flush(5)
+    finally:
+        recovered.close(5)
+
+    assert recovered_db.rows == {('035720', '2024-01-02'): 10, ('035720', '2024-01-03'): 12}
+    assert spool_files(spool) == []
+
+
+def test_spool_of_live_worker_is_left_alone(spool):
+    other_spool = f"{spool}.{DEAD_PID}"
+    with open(other_spool, 'w', encoding='utf-8') as f:
+        f.write('["candle", "000270:2024-01-02", {}]\n')
+    # 다른 워커가 살아 있는 것처럼 그 스풀의 소유 잠금을 잡고 있음
+    owner = WriteBehindQueue._try_own(other_spool)
+    try:
+        queue = WriteBehindQueue(FakeDB(), spool_path=spool, batch_size=1000, flush_interval=60)
+        assert queue.pending == 0
+        queue.close(5)
+    finally:
+        owner.close()
+
+    assert spool_files(spool) == [other_spool]
+
+
+def test_second_queue_in_same_process_is_refused(spool):
+    queue = WriteBehindQueue(FakeDB(), spool_path=spool)
+    try:
+        with pytest.raises(RuntimeError):
+            WriteBehindQueue(FakeDB(), spool_path=spool)
+    finally:
+        queue.close(5)